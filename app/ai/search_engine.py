@@ -1,29 +1,72 @@
 import logging
 from typing import Dict, List, Optional, Tuple
 import asyncio
+import heapq
+import itertools
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
 from database.models import DatabaseManager
 from vector.faiss_manager import FAISSVectorManager
+from vector.search_filter import normalize_filters, filter_documents
 from processing.document_processor import DocumentProcessor
 
 logger = logging.getLogger(__name__)
 
+# 전체 강의 검색용 프로세스 전역 스레드 풀 (동시 실행 수별로 하나씩)
+_course_search_pools: Dict[int, ThreadPoolExecutor] = {}
+_course_search_pools_lock = threading.Lock()
+
+
+def get_course_search_thread_pool(workers: int) -> ThreadPoolExecutor:
+    """
+    프로세스 전역 강의 검색 스레드 풀 (같은 동시 실행 수를 쓰는 모든 검색 엔진이 공유)
+    Args:
+        workers: 작업자 스레드 수
+    Returns:
+        스레드 풀
+    """
+    with _course_search_pools_lock:
+        if workers not in _course_search_pools:
+            _course_search_pools[workers] = ThreadPoolExecutor(max_workers=workers,
+                                                               thread_name_prefix=f"course-search-{workers}")
+        return _course_search_pools[workers]
+
+
+def shutdown_course_search_thread_pools():
+    """전역 강의 검색 스레드 풀 종료 (다음 검색 때 다시 생성)"""
+    with _course_search_pools_lock:
+        pools = list(_course_search_pools.values())
+        _course_search_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
+
+
 class AISearchEngine:
     """AI 기반 검색 엔진"""
     
-    def __init__(self, db_manager: DatabaseManager = None, vector_manager: FAISSVectorManager = None):
+    # 전체 강의 검색 동시 실행 수
+    FEDERATED_SEARCH_WORKERS = 8
+    
+    def __init__(self, db_manager: DatabaseManager = None, vector_manager: FAISSVectorManager = None,
+                 search_workers: int = None):
         """
         초기화
         Args:
             db_manager: 데이터베이스 매니저
             vector_manager: 벡터 매니저
+            search_workers: 전체 강의 검색 동시 실행 수 (같은 수를 쓰는 검색 엔진끼리 스레드 풀 공유)
         """
         self.db_manager = db_manager or DatabaseManager()
         self.vector_manager = vector_manager or FAISSVectorManager()
         self.document_processor = DocumentProcessor()
         
+        self.search_workers = search_workers or self.FEDERATED_SEARCH_WORKERS
+        if self.search_workers <= 0:
+            raise ValueError(f"잘못된 검색 작업자 수: {self.search_workers}")
+        
         logger.info("AI 검색 엔진 초기화 완료")
     
     async def index_course_documents(self, course_id: str, force_reindex: bool = False) -> Dict:
@@ -90,10 +133,21 @@ class AISearchEngine:
             
             # 벡터 인덱싱
             if documents_to_process:
+                # 이미 벡터화된 문서를 다시 인덱싱하는 경우 기존 벡터를 먼저 삭제 (중복 방지)
+                vectorized_ids = {doc['id'] for doc in documents if doc['is_vectorized']}
+                for doc in documents_to_process:
+                    if doc['id'] in vectorized_ids:
+                        self.vector_manager.remove_document(course_id, doc['id'])
+                
+                # 인덱스와 document_chunks가 같은 청크를 쓰도록 미리 분할
+                for doc in documents_to_process:
+                    doc['chunks'] = list(self.vector_manager.chunker.iter_chunks(doc['text'], doc['id']))
+                
                 chunk_count = self.vector_manager.add_documents_to_index(course_id, documents_to_process)
                 
-                # 문서 벡터화 완료 표시
+                # 청크를 인덱스의 청크 ID와 함께 저장하고 문서 벡터화 완료 표시
                 for doc in documents_to_process:
+                    self.db_manager.create_document_chunks(course_id, doc['id'], doc['chunks'])
                     self.db_manager.mark_document_vectorized(doc['id'])
                 
                 logger.info(f"인덱싱 완료: {course_id}, 문서 수: {processed_count}, 청크 수: {chunk_count}")
@@ -122,28 +176,32 @@ class AISearchEngine:
     
     def search_documents(self, course_id: str, query: str, user_id: str = None, 
                         search_type: str = 'vector', top_k: int = 5,
-                        min_similarity: float = 0.5) -> Dict:
+                        min_similarity: float = 0.5, filters: Dict = None) -> Dict:
         """
         문서 검색
         Args:
             course_id: 강의 ID
             query: 검색 쿼리
             user_id: 사용자 ID (검색 로그용)
-            search_type: 검색 타입 ('vector', 'keyword', 'hybrid')
-            top_k: 반환할 결과 수
+            search_type: 검색 타입 ('vector', 'keyword', 'hybrid', 'range')
+            top_k: 반환할 결과 수 ('range'는 최소 유사도 이상인 결과의 최대 개수)
             min_similarity: 최소 유사도 점수
+            filters: 문서 메타데이터 필터 (file_type, uploader, uploaded_after, uploaded_before)
         Returns:
             검색 결과
         """
         try:
             start_time = time.time()
+            filters = normalize_filters(filters)
             
             if search_type == 'vector':
-                results = self._vector_search(course_id, query, top_k, min_similarity)
+                results = self._vector_search(course_id, query, top_k, min_similarity, filters)
             elif search_type == 'keyword':
-                results = self._keyword_search(course_id, query, top_k)
+                results = self._keyword_search(course_id, query, top_k, filters)
             elif search_type == 'hybrid':
-                results = self._hybrid_search(course_id, query, top_k, min_similarity)
+                results = self._hybrid_search(course_id, query, top_k, min_similarity, filters)
+            elif search_type == 'range':
+                results = self._range_search(course_id, query, top_k, min_similarity, filters)
             else:
                 raise ValueError(f"지원되지 않는 검색 타입: {search_type}")
             
@@ -173,48 +231,271 @@ class AISearchEngine:
                 'error': str(e)
             }
     
-    def _vector_search(self, course_id: str, query: str, top_k: int, min_similarity: float) -> List[Dict]:
-        """벡터 기반 검색"""
+    def _vector_search(self, course_id: str, query: str, top_k: int, min_similarity: float,
+                       filters: Dict = None) -> List[Dict]:
+        """벡터 기반 검색 (필터는 검색 후가 아니라 FAISS 검색 안에서 적용)"""
         try:
             # FAISS 벡터 검색
             vector_results = self.vector_manager.search_course_documents(
-                course_id, query, top_k, min_similarity
+                course_id, query, top_k, min_similarity, filters
             )
             
-            # 문서 메타데이터 추가
-            enriched_results = []
-            for result in vector_results:
-                doc_id = result['document_id']
+            return self._enrich_vector_results(course_id, vector_results)
+            
+        except Exception as e:
+            logger.error(f"벡터 검색 중 오류: {str(e)}")
+            return []
+    
+    def _range_search(self, course_id: str, query: str, max_results: int, min_similarity: float,
+                      filters: Dict = None) -> List[Dict]:
+        """유사도 기준 벡터 검색 (min_similarity 이상인 청크를 모두, 최대 max_results개)"""
+        try:
+            vector_results = self.vector_manager.search_course_documents_range(
+                course_id, query, min_similarity, max_results, filters
+            )
+            
+            # 관련 자료가 없으면 문서 정보도 조회하지 않음
+            if not vector_results:
+                return []
+            return self._enrich_vector_results(course_id, vector_results)
+            
+        except Exception as e:
+            logger.error(f"유사도 기준 검색 중 오류: {str(e)}")
+            return []
+    
+    def _enrich_vector_results(self, course_id: str, vector_results: List[Dict],
+                               documents: List[Dict] = None) -> List[Dict]:
+        """벡터 검색 결과에 문서 메타데이터 추가"""
+        # 데이터베이스에서 문서 정보를 한 번만 조회
+        if documents is None:
+            documents = self.db_manager.get_course_documents(course_id)
+        documents_by_id = {doc['id']: doc for doc in documents}
+        generation = self.vector_manager.index_generation(course_id) if vector_results else None
+        
+        enriched_results = []
+        for result in vector_results:
+            doc_id = result['document_id']
+            doc_info = documents_by_id.get(doc_id)
+            
+            if doc_info:
+                enriched_results.append({
+                    'document_id': doc_id,
+                    'filename': doc_info['filename'],
+                    'file_type': doc_info['file_type'],
+                    'uploaded_at': doc_info['uploaded_at'],
+                    'uploader': doc_info['uploader_name'],
+                    'similarity': result['similarity'],
+                    'chunk_index': result['chunk_index'],
+                    'chunk_id': self.db_manager.document_chunk_id(course_id, result['vector_id'], generation),
+                    'text_preview': result['text'],
+                    'content': result.get('full_text', result['text']),  # 채팅 서비스에서 사용할 청크 전체 텍스트
+                    'search_type': 'vector'
+                })
+        
+        return enriched_results
+    
+    def search_documents_batch(self, course_id: str, queries: List[str], user_id: str = None,
+                               top_k: int = 5, min_similarity: float = 0.5, filters: Dict = None) -> Dict:
+        """
+        여러 쿼리 일괄 벡터 검색 (평가, FAQ 사전 검색, 다중 질문용)
+        Args:
+            course_id: 강의 ID
+            queries: 검색 쿼리 리스트
+            user_id: 사용자 ID (검색 로그용)
+            top_k: 쿼리별 반환할 결과 수
+            min_similarity: 최소 유사도 점수
+            filters: 문서 메타데이터 필터 (file_type, uploader, uploaded_after, uploaded_before)
+        Returns:
+            쿼리 순서대로의 검색 결과
+        """
+        try:
+            start_time = time.time()
+            
+            batch_results = self.vector_manager.search_course_documents_batch(
+                course_id, queries, top_k, min_similarity, filters
+            )
+            
+            documents = self.db_manager.get_course_documents(course_id)
+            results = [
+                self._enrich_vector_results(course_id, vector_results, documents)
+                for vector_results in batch_results
+            ]
+            
+            # 검색 로그 저장
+            if user_id:
+                for query, query_results in zip(queries, results):
+                    self.db_manager.log_search(user_id, query, 'vector', len(query_results), course_id)
+            
+            end_time = time.time()
+            
+            return {
+                'success': True,
+                'queries': queries,
+                'search_type': 'vector',
+                'results': results,
+                'result_counts': [len(query_results) for query_results in results],
+                'search_time': end_time - start_time
+            }
+            
+        except Exception as e:
+            logger.error(f"일괄 검색 중 오류 발생: {str(e)}")
+            return {
+                'success': False,
+                'queries': queries,
+                'search_type': 'vector',
+                'results': [[] for _ in queries],
+                'result_counts': [0 for _ in queries],
+                'error': str(e)
+            }
+    
+    def search_student_courses(self, student_id: str, query: str, top_k: int = 5,
+                               min_similarity: float = 0.5, course_timeout: float = 2.0) -> Dict:
+        """
+        학생이 수강 중인 모든 강의에서 검색
+        Args:
+            student_id: 학생 ID
+            query: 검색 쿼리
+            top_k: 전체에서 반환할 결과 수
+            min_similarity: 최소 유사도 점수
+            course_timeout: 강의별 검색 제한 시간 (초)
+        Returns:
+            검색 결과
+        """
+        courses = self.db_manager.get_student_courses(student_id)
+        return self.search_across_courses(courses, query, student_id, top_k, min_similarity, course_timeout)
+    
+    def search_across_courses(self, courses: List[Dict], query: str, user_id: str = None,
+                              top_k: int = 5, min_similarity: float = 0.5,
+                              course_timeout: float = 2.0) -> Dict:
+        """
+        여러 강의 인덱스를 동시에 검색하고 전체 상위 결과 병합
+        Args:
+            courses: 강의 정보 리스트 ('id', 'name' 포함)
+            query: 검색 쿼리
+            user_id: 사용자 ID (검색 로그용)
+            top_k: 전체에서 반환할 결과 수
+            min_similarity: 최소 유사도 점수
+            course_timeout: 강의별 검색 제한 시간 (초), 넘으면 해당 강의 결과 제외
+                            (검색이 시작된 때부터 계산하고, 그 시간 안에 시작하지 못한 강의도 제외)
+        Returns:
+            검색 결과
+        """
+        try:
+            start_time = time.time()
+            
+            if not courses:
+                return {
+                    'success': True,
+                    'query': query,
+                    'search_type': 'vector',
+                    'results': [],
+                    'result_count': 0,
+                    'timed_out_courses': [],
+                    'search_time': 0
+                }
+            
+            # 쿼리 임베딩은 한 번만 생성해서 모든 강의에 재사용
+            query_embedding = self.vector_manager.encode_queries([query])
+            
+            # 강의마다 검색을 시작한 시각을 기록해서 그때부터 제한 시간 적용
+            started = {}
+            
+            def search_course(position: int, course: Dict) -> List[Dict]:
+                started[position] = time.monotonic()
+                return self._search_single_course(course, query_embedding, top_k, min_similarity)
+            
+            executor = get_course_search_thread_pool(self.search_workers)
+            submitted_at = time.monotonic()
+            futures = {executor.submit(search_course, position, course): position
+                       for position, course in enumerate(courses)}
+            
+            done = set()
+            pending = set(futures)
+            timed_out_courses = []
+            while pending:
+                now = time.monotonic()
+                deadlines = {future: started.get(futures[future], submitted_at) + course_timeout
+                             for future in pending}
+                
+                # 제한 시간을 넘긴 강의는 결과에서 제외 (아직 시작 전이면 취소, 취소 직전에 시작했으면 계속 대기)
+                for future in [future for future in pending if deadlines[future] <= now and not future.done()]:
+                    if futures[future] in started or future.cancel():
+                        pending.discard(future)
+                        course_id = courses[futures[future]]['id']
+                        timed_out_courses.append(course_id)
+                        logger.warning(f"강의 검색 시간 초과: {course_id}")
+                if not pending:
+                    break
                 
-                # 데이터베이스에서 문서 정보 조회
-                documents = self.db_manager.get_course_documents(course_id)
-                doc_info = next((doc for doc in documents if doc['id'] == doc_id), None)
+                finished, pending = wait(pending, timeout=max(0.0, min(deadlines[future] for future in pending) - now),
+                                         return_when=FIRST_COMPLETED)
+                done |= finished
+            
+            # 강의별 결과를 전체 상위 top_k 힙으로 병합
+            top_results = []
+            tie_breaker = itertools.count()
+            for future in done:
+                try:
+                    course_results = future.result()
+                except Exception as e:
+                    logger.error(f"강의 검색 중 오류: {courses[futures[future]]['id']} - {str(e)}")
+                    continue
                 
-                if doc_info:
-                    enriched_results.append({
-                        'document_id': doc_id,
-                        'filename': doc_info['filename'],
-                        'file_type': doc_info['file_type'],
-                        'uploaded_at': doc_info['uploaded_at'],
-                        'uploader': doc_info['uploader_name'],
-                        'similarity': result['similarity'],
-                        'chunk_index': result['chunk_index'],
-                        'text_preview': result['text'],
-                        'content': result['text'],  # 채팅 서비스에서 사용할 content 필드 추가
-                        'search_type': 'vector'
-                    })
+                for result in course_results:
+                    item = (result['similarity'], next(tie_breaker), result)
+                    if len(top_results) < top_k:
+                        heapq.heappush(top_results, item)
+                    else:
+                        heapq.heappushpop(top_results, item)
+            
+            results = [item[2] for item in sorted(top_results, key=lambda item: item[0], reverse=True)]
             
-            return enriched_results
+            # 검색 로그 저장
+            if user_id:
+                self.db_manager.log_search(user_id, query, 'vector', len(results))
+            
+            end_time = time.time()
+            
+            return {
+                'success': True,
+                'query': query,
+                'search_type': 'vector',
+                'results': results,
+                'result_count': len(results),
+                'timed_out_courses': timed_out_courses,
+                'search_time': end_time - start_time
+            }
             
         except Exception as e:
-            logger.error(f"벡터 검색 중 오류: {str(e)}")
-            return []
+            logger.error(f"전체 강의 검색 중 오류 발생: {str(e)}")
+            return {
+                'success': False,
+                'query': query,
+                'search_type': 'vector',
+                'results': [],
+                'result_count': 0,
+                'error': str(e)
+            }
     
-    def _keyword_search(self, course_id: str, query: str, top_k: int) -> List[Dict]:
+    def _search_single_course(self, course: Dict, query_embedding, top_k: int,
+                              min_similarity: float) -> List[Dict]:
+        """한 강의 인덱스 검색 (스레드 풀에서 실행)"""
+        vector_results = self.vector_manager.search_course_embeddings(
+            course['id'], query_embedding, top_k, min_similarity
+        )[0]
+        
+        results = self._enrich_vector_results(course['id'], vector_results)
+        for result in results:
+            result['course_id'] = course['id']
+            result['course_name'] = course.get('name', '')
+        
+        return results
+    
+    def _keyword_search(self, course_id: str, query: str, top_k: int, filters: Dict = None) -> List[Dict]:
         """키워드 기반 검색"""
         try:
             # 강의 문서 목록 조회
-            documents = self.db_manager.get_course_documents(course_id)
+            documents = filter_documents(self.db_manager.get_course_documents(course_id), filters)
             
             results = []
             query_lower = query.lower()
@@ -258,14 +539,15 @@ class AISearchEngine:
             logger.error(f"키워드 검색 중 오류: {str(e)}")
             return []
     
-    def _hybrid_search(self, course_id: str, query: str, top_k: int, min_similarity: float) -> List[Dict]:
+    def _hybrid_search(self, course_id: str, query: str, top_k: int, min_similarity: float,
+                       filters: Dict = None) -> List[Dict]:
         """하이브리드 검색 (벡터 + 키워드)"""
         try:
             # 벡터 검색 결과
-            vector_results = self._vector_search(course_id, query, top_k, min_similarity)
+            vector_results = self._vector_search(course_id, query, top_k, min_similarity, filters)
             
             # 키워드 검색 결과
-            keyword_results = self._keyword_search(course_id, query, top_k)
+            keyword_results = self._keyword_search(course_id, query, top_k, filters)
             
             # 결과 병합 및 중복 제거
             combined_results = {}
@@ -366,6 +648,7 @@ class AISearchEngine:
                 'processed_documents': processed_docs,
                 'vectorized_documents': vectorized_docs,
                 'vector_stats': vector_stats,
+                'query_cache_stats': self.vector_manager.query_cache.get_stats(),
                 'processing_rate': (processed_docs / len(documents) * 100) if documents else 0,
                 'vectorization_rate': (vectorized_docs / len(documents) * 100) if documents else 0
             }
@@ -377,6 +660,7 @@ class AISearchEngine:
                 'processed_documents': 0,
                 'vectorized_documents': 0,
                 'vector_stats': {},
+                'query_cache_stats': {},
                 'processing_rate': 0,
                 'vectorization_rate': 0
             }
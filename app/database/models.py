@@ -103,12 +103,20 @@ class DatabaseManager:
                 embedding_model TEXT NOT NULL,
                 dimension INTEGER NOT NULL,
                 document_count INTEGER DEFAULT 0,
+                index_type TEXT DEFAULT 'flat',
+                index_params TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (course_id) REFERENCES courses (id)
             )
         ''')
         
+        # 기존 DB에 추가된 컬럼 반영
+        self._ensure_columns(cursor, 'vector_indexes', {
+            'index_type': "TEXT DEFAULT 'flat'",
+            'index_params': 'TEXT'
+        })
+        
         # 문서 청크 테이블 (벡터 검색용)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS document_chunks (
@@ -178,6 +186,15 @@ class DatabaseManager:
         conn.commit()
         conn.close()
     
+    def _ensure_columns(self, cursor, table: str, columns: Dict[str, str]):
+        """기존 테이블에 없는 컬럼 추가"""
+        cursor.execute(f'PRAGMA table_info({table})')
+        existing = {row['name'] for row in cursor.fetchall()}
+        
+        for name, definition in columns.items():
+            if name not in existing:
+                cursor.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+    
     # 사용자 관리
     def create_user(self, name: str, role: str, email: str = None) -> str:
         """사용자 생성"""
@@ -531,7 +548,8 @@ class DatabaseManager:
         
         return dict(index) if index else None
     
-    def update_vector_index_stats(self, index_id: str, document_count: int):
+    def update_vector_index_stats(self, index_id: str, document_count: int,
+                                  index_type: str = None, index_params: Dict = None):
         """벡터 인덱스 통계 업데이트"""
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -542,6 +560,13 @@ class DatabaseManager:
             WHERE id = ?
         ''', (document_count, index_id))
         
+        if index_type is not None:
+            cursor.execute('''
+                UPDATE vector_indexes 
+                SET index_type = ?, index_params = ?
+                WHERE id = ?
+            ''', (index_type, json.dumps(index_params or {}), index_id))
+        
         conn.commit()
         conn.close()
     
@@ -561,6 +586,65 @@ class DatabaseManager:
         conn.close()
         return chunk_id
     
+    @staticmethod
+    def document_chunk_id(course_id: str, vector_index: int, generation: str = None) -> str:
+        """
+        벡터 인덱스에 들어간 청크의 기본 키 (검색 결과의 청크 ID로 바로 조회)
+        인덱스를 다시 만들면 청크 ID가 0부터 다시 시작하므로 인덱스의 청크 ID 세대를 키에 포함한다.
+        (세대를 기록하기 전에 만든 인덱스는 강의 ID + 청크 ID)
+        """
+        if generation is None:
+            return f"{course_id}:{vector_index}"
+        return f"{course_id}:{generation}:{vector_index}"
+    
+    def create_document_chunks(self, course_id: str, document_id: str, chunks: List[Dict]) -> int:
+        """
+        문서 청크 일괄 저장 (문서의 기존 청크는 교체, 한 트랜잭션)
+        Args:
+            course_id: 강의 ID
+            document_id: 문서 ID
+            chunks: 청크 레코드 리스트 (chunk_index, text, 인덱스에 들어간 청크는 vector_id와 index_generation)
+        Returns:
+            저장한 청크 수
+        Raises:
+            sqlite3.IntegrityError: 다른 문서가 같은 키를 쓰고 있는 경우 (덮어쓰지 않음)
+        """
+        rows = []
+        for chunk in chunks:
+            vector_index = chunk.get('vector_id')
+            # 인덱스에 들어가지 않은 청크는 벡터 ID가 없으므로 임의 키 사용
+            chunk_id = (self.document_chunk_id(course_id, vector_index, chunk.get('index_generation'))
+                        if vector_index is not None else str(uuid.uuid4()))
+            rows.append((chunk_id, document_id, chunk['chunk_index'], chunk['text'], len(chunk['text']), vector_index))
+        
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('DELETE FROM document_chunks WHERE document_id = ?', (document_id,))
+            cursor.executemany('''
+                INSERT INTO document_chunks (id, document_id, chunk_index, chunk_text, chunk_size, vector_index)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return len(rows)
+    
+    def get_document_chunk(self, chunk_id: str) -> Optional[Dict]:
+        """문서 청크 조회 (기본 키)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM document_chunks WHERE id = ?', (chunk_id,))
+        chunk = cursor.fetchone()
+        conn.close()
+        
+        return dict(chunk) if chunk else None
+    
     def get_document_chunks(self, document_id: str) -> List[Dict]:
         """문서 청크 목록 조회"""
         conn = self.get_connection()
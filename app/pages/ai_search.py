@@ -1,6 +1,7 @@
 import streamlit as st
 import asyncio
 import time
+from datetime import date, timedelta
 from typing import Dict, List
 import sys
 from pathlib import Path
@@ -14,6 +15,7 @@ from vector.faiss_manager import FAISSVectorManager
 from processing.document_processor import DocumentProcessor
 from ai.search_engine import AISearchEngine
 from utils.session_utils import get_user_name, get_user_role
+from vector.search_filter import document_file_type
 
 # 전역 변수로 AI 검색 엔진 초기화
 @st.cache_resource
@@ -67,14 +69,16 @@ def show_search_tab(search_engine: AISearchEngine, courses: List[Dict], user_nam
     """검색 탭"""
     st.markdown("#### 강의 자료 검색")
     
-    # 강의 선택
+    # 강의 선택 (전체 강의 검색 포함)
+    all_courses_label = "📚 전체 강의"
     course_options = {f"{course['name']} ({course['code']})": course['id'] for course in courses}
-    selected_course_name = st.selectbox("강의 선택", list(course_options.keys()))
+    selected_course_name = st.selectbox("강의 선택", [all_courses_label] + list(course_options.keys()))
     
     if not selected_course_name:
         return
     
-    selected_course_id = course_options[selected_course_name]
+    search_all_courses = selected_course_name == all_courses_label
+    selected_course_id = None if search_all_courses else course_options[selected_course_name]
     
     # 검색 설정
     col1, col2 = st.columns([3, 1])
@@ -98,17 +102,35 @@ def show_search_tab(search_engine: AISearchEngine, courses: List[Dict], user_nam
         with col2:
             min_similarity = st.slider("최소 유사도", min_value=0.0, max_value=1.0, value=0.5, step=0.1)
     
+    # 문서 필터 (파일 형식, 업로더, 업로드 기간)
+    filters = None
+    if not search_all_courses:
+        filters = show_search_filters(search_engine, selected_course_id)
+    
     # 검색 실행
     if st.button("🔍 검색", type="primary", use_container_width=True):
         if search_query.strip():
             with st.spinner("검색 중..."):
+                if search_all_courses:
+                    # 전체 강의 검색은 벡터 검색만 지원
+                    results = search_engine.search_across_courses(
+                        courses=courses,
+                        query=search_query.strip(),
+                        user_id=user_name,
+                        top_k=top_k,
+                        min_similarity=min_similarity
+                    )
+                    display_search_results(results, 'vector')
+                    return
+                
                 results = search_engine.search_documents(
                     course_id=selected_course_id,
                     query=search_query.strip(),
                     user_id=user_name,
                     search_type=search_type,
                     top_k=top_k,
-                    min_similarity=min_similarity
+                    min_similarity=min_similarity,
+                    filters=filters
                 )
                 
                 display_search_results(results, search_type)
@@ -116,7 +138,7 @@ def show_search_tab(search_engine: AISearchEngine, courses: List[Dict], user_nam
             st.warning("검색어를 입력해주세요.")
     
     # 검색 제안어
-    if search_query and len(search_query) > 1:
+    if search_query and len(search_query) > 1 and not search_all_courses:
         suggestions = search_engine.get_search_suggestions(selected_course_id, search_query)
         if suggestions:
             st.markdown("**💡 검색 제안어:**")
@@ -130,6 +152,38 @@ def show_search_tab(search_engine: AISearchEngine, courses: List[Dict], user_nam
     # 최근 검색 기록
     show_recent_searches(search_engine, user_name)
 
+def show_search_filters(search_engine: AISearchEngine, course_id: str) -> Dict:
+    """검색 필터 설정 (조건이 없으면 None 반환)"""
+    with st.expander("🗂️ 문서 필터"):
+        documents = search_engine.db_manager.get_course_documents(course_id)
+        file_types = sorted({document_file_type(doc) for doc in documents} - {None})
+        uploaders = sorted({doc['uploader_name'] for doc in documents if doc.get('uploader_name')})
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            selected_types = st.multiselect("파일 형식", file_types, format_func=lambda x: x.upper())
+        
+        with col2:
+            selected_uploaders = st.multiselect("업로더", uploaders)
+        
+        use_period = st.checkbox("업로드 기간 지정")
+        period = None
+        if use_period:
+            period = st.date_input("업로드 기간", value=(date.today() - timedelta(days=7), date.today()))
+    
+    filters = {}
+    if selected_types:
+        filters['file_type'] = selected_types
+    if selected_uploaders:
+        filters['uploader'] = selected_uploaders
+    if period and len(period) == 2:
+        # 종료일 당일 업로드까지 포함
+        filters['uploaded_after'] = period[0].isoformat()
+        filters['uploaded_before'] = (period[1] + timedelta(days=1)).isoformat()
+    
+    return filters or None
+
 def display_search_results(results: Dict, search_type: str):
     """검색 결과 표시"""
     if not results['success']:
@@ -146,7 +200,8 @@ def display_search_results(results: Dict, search_type: str):
     
     # 검색 결과 표시
     for i, result in enumerate(results['results']):
-        with st.expander(f"📄 {result['filename']} ({result['file_type']})", expanded=i < 3):
+        course_label = f"[{result['course_name']}] " if result.get('course_name') else ""
+        with st.expander(f"📄 {course_label}{result['filename']} ({result['file_type']})", expanded=i < 3):
             col1, col2 = st.columns([3, 1])
             
             with col1:
@@ -202,6 +257,9 @@ def show_statistics_tab(search_engine: AISearchEngine, courses: List[Dict]):
                 st.write(f"• 임베딩 모델: {vector_stats.get('embedding_model', 'N/A')}")
                 st.write(f"• 벡터 차원: {vector_stats.get('dimension', 'N/A')}")
                 st.write(f"• 인덱스 크기: {vector_stats.get('index_size_mb', 0):.2f} MB")
+                if vector_stats.get('dedup_skipped_chunks', 0) > 0:
+                    st.write(f"• 중복 제외 청크: {vector_stats['dedup_skipped_chunks']}개 "
+                             f"(약 {vector_stats.get('dedup_saved_mb', 0):.2f} MB 절약)")
 
 def show_management_tab(search_engine: AISearchEngine, courses: List[Dict]):
     """관리 탭 (교수자 전용)"""
@@ -259,6 +317,11 @@ def show_management_tab(search_engine: AISearchEngine, courses: List[Dict]):
         if stats['vector_stats']:
             st.write(f"• 검색 청크: {stats['vector_stats'].get('chunk_count', 0)}개")
             st.write(f"• 인덱스 크기: {stats['vector_stats'].get('index_size_mb', 0):.2f} MB")
+        
+        if stats['query_cache_stats']:
+            query_cache_stats = stats['query_cache_stats']
+            st.write(f"• 쿼리 임베딩 캐시: {query_cache_stats['entries']}/{query_cache_stats['max_entries']}개, "
+                     f"적중률 {query_cache_stats['hit_rate'] * 100:.1f}%")
     else:
         st.info("아직 업로드된 문서가 없습니다.")
 
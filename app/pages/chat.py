@@ -5,6 +5,11 @@ import uuid
 from services.chat_service import ChatService
 from utils.session_utils import get_user_id, get_selected_course_id
 
+@st.cache_resource
+def get_chat_service():
+    """채팅 서비스 인스턴스 반환 (캐시됨, 리런마다 새로 만들지 않음)"""
+    return ChatService()
+
 def show_chat_page():
     """AI 채팅 페이지 (강의실 내부에 표시)"""
     
@@ -15,7 +20,7 @@ def show_chat_page():
         st.error("사용자 또는 강의 정보를 찾을 수 없습니다. 다시 시도해 주세요.")
         return
         
-    chat_service = ChatService()
+    chat_service = get_chat_service()
     
     # 강의별 채팅방 ID를 세션에서 관리
     room_key = f"current_chat_room_{course_id}"
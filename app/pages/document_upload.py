@@ -149,9 +149,12 @@ def show_document_upload():
                 for i, file in enumerate(uploaded_files):
                     status_text.text(f"처리 중: {file.name}")
                     
+                    def report_progress(done: int, total: int, name: str = file.name):
+                        status_text.text(f"처리 중: {name} (임베딩 {done}/{total} 청크)")
+                    
                     with st.spinner(f"'{file.name}' 처리 중..."):
                         result = service.process_uploaded_file(
-                            file, selected_course_id, user_id
+                            file, selected_course_id, user_id, progress_callback=report_progress
                         )
                         results.append(result)
                     
@@ -191,12 +191,12 @@ class ChatService:
             AI 응답
         """
         try:
-            # 강의자료에서 관련 문서 검색
+            # 강의자료에서 관련 문서 검색 (고정 개수 대신 유사도 기준을 넘는 청크를 모두, 최대 10개)
             search_result = self.search_engine.search_documents(
                 course_id=course_id,
                 query=user_message,
-                search_type='vector',
-                top_k=3,
+                search_type='range',
+                top_k=10,
                 min_similarity=0.3
             )
             
@@ -1,8 +1,9 @@
 import logging
 import asyncio
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 import sys
+from datetime import datetime
 
 # 현재 디렉토리를 sys.path에 추가
 current_dir = Path(__file__).parent.parent
@@ -27,13 +28,15 @@ class DocumentService:
         
         logger.info("문서 서비스 초기화 완료")
     
-    def process_uploaded_file(self, uploaded_file, course_id: str, user_id: str) -> Dict:
+    def process_uploaded_file(self, uploaded_file, course_id: str, user_id: str,
+                              progress_callback: Callable[[int, int], None] = None) -> Dict:
         """
         업로드된 파일 전체 처리 워크플로우
         Args:
             uploaded_file: Streamlit 업로드 파일 객체
             course_id: 강의 ID
             user_id: 업로드 사용자 ID
+            progress_callback: 벡터화 진행 상황 (임베딩 완료 청크 수, 전체 청크 수) 콜백
         Returns:
             처리 결과 딕셔너리
         """
@@ -69,9 +72,17 @@ class DocumentService:
             # Phase 4: 텍스트 내용 업데이트
             self.db_manager.update_document_content(doc_id, extraction_result['text'])
             
-            # Phase 5: 벡터화 및 인덱스 추가
+            # Phase 5: 벡터화 및 인덱스 추가 (필터 검색용 문서 메타데이터를 청크에 함께 저장)
+            uploader = self.db_manager.get_user(user_id)
+            chunk_metadata = {
+                'course_id': course_id,
+                'filename': metadata['original_filename'],
+                'file_type': metadata['file_type'],
+                'uploaded_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+                'uploader': uploader['name'] if uploader else user_id
+            }
             vectorization_result = self._vectorize_document(
-                doc_id, extraction_result['text'], course_id
+                doc_id, extraction_result['text'], course_id, progress_callback, chunk_metadata
             )
             
             if vectorization_result['success']:
@@ -101,29 +112,39 @@ class DocumentService:
                 'file_path': file_path if 'file_path' in locals() else None
             }
     
-    def _vectorize_document(self, doc_id: str, text: str, course_id: str) -> Dict:
+    def _vectorize_document(self, doc_id: str, text: str, course_id: str,
+                            progress_callback: Callable[[int, int], None] = None,
+                            metadata: Dict = None) -> Dict:
         """
         문서 벡터화 처리
         Args:
             doc_id: 문서 ID
             text: 문서 텍스트
             course_id: 강의 ID
+            progress_callback: 배치마다 (임베딩 완료 청크 수, 전체 청크 수)로 호출되는 함수
+            metadata: 청크에 저장할 문서 메타데이터 (파일명, 파일 형식, 업로드 시각, 업로더)
         Returns:
             벡터화 결과
         """
         try:
+            # 인덱스와 document_chunks 테이블이 같은 청크를 쓰도록 한 번만 분할
+            chunks = list(self.vector_manager.chunker.iter_chunks(text, doc_id))
+            
             # 문서 리스트 형태로 변환
             documents = [{
                 'id': doc_id,
                 'text': text,
-                'metadata': {'course_id': course_id}
+                'metadata': metadata or {'course_id': course_id},
+                'chunks': chunks
             }]
             
             # FAISS 인덱스에 추가
-            chunk_count = self.vector_manager.add_documents_to_index(course_id, documents)
+            chunk_count = self.vector_manager.add_documents_to_index(
+                course_id, documents, progress_callback=progress_callback
+            )
             
-            # 생성된 청크들을 데이터베이스에 저장
-            self._save_document_chunks(doc_id, text)
+            # 인덱스에 넣은 청크들을 청크 ID와 함께 데이터베이스에 저장
+            self._save_document_chunks(course_id, doc_id, chunks)
             
             logger.info(f"문서 벡터화 완료: {doc_id}, 청크 수: {chunk_count}")
             
@@ -141,63 +162,22 @@ class DocumentService:
                 'chunk_count': 0
             }
     
-    def _save_document_chunks(self, doc_id: str, text: str, chunk_size: int = 1000):
+    def _save_document_chunks(self, course_id: str, doc_id: str, chunks: List[Dict]):
         """
-        문서 청크를 데이터베이스에 저장
+        문서 청크를 데이터베이스에 일괄 저장 (기본 키는 강의 ID + 인덱스의 청크 ID)
         Args:
+            course_id: 강의 ID
             doc_id: 문서 ID
-            text: 전체 텍스트
-            chunk_size: 청크 크기
+            chunks: 인덱스에 추가한 청크 레코드 리스트 (vector_id 포함)
         """
         try:
-            # 텍스트를 청크로 분할
-            chunks = self._split_text_into_chunks(text, chunk_size)
-            
-            # 데이터베이스에 청크 저장
-            for i, chunk in enumerate(chunks):
-                self.db_manager.create_document_chunk(
-                    document_id=doc_id,
-                    chunk_index=i,
-                    chunk_text=chunk,
-                    vector_index=i
-                )
+            self.db_manager.create_document_chunks(course_id, doc_id, chunks)
             
             logger.info(f"문서 청크 저장 완료: {doc_id}, 청크 수: {len(chunks)}")
             
         except Exception as e:
             logger.error(f"청크 저장 중 오류 발생: {str(e)}")
     
-    def _split_text_into_chunks(self, text: str, chunk_size: int = 1000) -> List[str]:
-        """
-        텍스트를 청크로 분할
-        Args:
-            text: 분할할 텍스트
-            chunk_size: 청크 크기
-        Returns:
-            청크 리스트
-        """
-        if not text:
-            return []
-        
-        chunks = []
-        sentences = text.split('. ')
-        
-        current_chunk = ""
-        for sentence in sentences:
-            test_chunk = current_chunk + ". " + sentence if current_chunk else sentence
-            
-            if len(test_chunk) <= chunk_size:
-                current_chunk = test_chunk
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
-        
-        return [chunk for chunk in chunks if len(chunk) > 50]
-    
     def _update_vector_index_info(self, course_id: str):
         """
         벡터 인덱스 정보 업데이트
@@ -217,18 +197,45 @@ class DocumentService:
                     embedding_model=self.vector_manager.embedding_model_name,
                     dimension=self.vector_manager.dimension
                 )
+                existing_index = self.db_manager.get_vector_index(course_id)
             
-            # 벡터 인덱스 통계 업데이트
+            # 벡터 인덱스 통계 및 인덱스 타입 업데이트
             stats = self.vector_manager.get_course_index_stats(course_id)
             if existing_index:
                 self.db_manager.update_vector_index_stats(
                     existing_index['id'], 
-                    stats['document_count']
+                    stats['document_count'],
+                    index_type=stats['index_type'],
+                    index_params=stats['index_params']
                 )
             
         except Exception as e:
             logger.error(f"벡터 인덱스 정보 업데이트 중 오류: {str(e)}")
     
+    def delete_document(self, doc_id: str, course_id: str) -> bool:
+        """
+        문서 삭제 (벡터 인덱스의 해당 문서 벡터도 함께 삭제)
+        Args:
+            doc_id: 문서 ID
+            course_id: 강의 ID
+        Returns:
+            삭제 성공 여부
+        """
+        try:
+            removed_count = self.vector_manager.remove_document(course_id, doc_id)
+            
+            if not self.db_manager.delete_document(doc_id):
+                return False
+            
+            self._update_vector_index_info(course_id)
+            
+            logger.info(f"문서 삭제 완료: {doc_id}, 삭제된 청크 수: {removed_count}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"문서 삭제 중 오류 발생: {str(e)}")
+            return False
+    
     def get_documents_for_course(self, course_id: str) -> List[Dict]:
         """
         특정 강의의 모든 문서 목록을 가져옵니다.
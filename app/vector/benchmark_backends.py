@@ -0,0 +1,168 @@
+"""
+임베딩 백엔드(torch / onnx-int8) 일치도 검사 및 처리량 벤치마크 스크립트
+
+같은 텍스트를 두 백엔드로 인코딩해서 임베딩 간 코사인 유사도(일치도)와
+초당 처리 텍스트 수를 비교한다. 최소 코사인이 기준보다 낮으면 종료 코드 1.
+
+사용법 (저장소 루트에서 실행):
+    python app/vector/benchmark_backends.py
+    python app/vector/benchmark_backends.py --course-id <강의 ID> --samples 512
+    python app/vector/benchmark_backends.py --texts-file samples.txt --min-cosine 0.98
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# 현재 디렉토리를 sys.path에 추가
+current_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(current_dir))
+
+from vector.faiss_manager import FAISSVectorManager
+from vector.model_registry import EmbeddingModelRegistry, get_model_registry, ONNX_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+# 강의 데이터가 없을 때 사용할 기본 문장
+DEFAULT_TEXTS = [
+    "중간고사 범위는 1장부터 6장까지입니다.",
+    "과제는 LMS를 통해 금요일 자정까지 제출하세요.",
+    "벡터 검색은 임베딩 간 내적으로 유사도를 계산합니다.",
+    "Gradient descent updates parameters in the direction of the negative gradient.",
+    "기말 프로젝트 발표는 팀별로 10분씩 진행합니다.",
+    "The midterm exam covers chapters one through six.",
+    "출석은 전자출결 시스템으로 확인합니다.",
+    "Transformer 모델은 self-attention으로 문맥을 학습합니다.",
+]
+
+
+def load_texts(args, manager: FAISSVectorManager) -> List[str]:
+    """벤치마크용 텍스트 로드 (파일, 강의 청크, 기본 문장 순)"""
+    if args.texts_file:
+        with open(args.texts_file, encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+    elif args.course_id:
+        chunk_store = manager._chunk_store(args.course_id)
+        chunk_ids = chunk_store.live_ids()[:args.samples]
+        texts = [info['text'] for info in chunk_store.get_many(chunk_ids) if info]
+    else:
+        texts = DEFAULT_TEXTS
+
+    if not texts:
+        raise ValueError("벤치마크할 텍스트가 없습니다.")
+
+    # 샘플 수만큼 반복해서 채움
+    repeat = -(-args.samples // len(texts))
+    return (texts * repeat)[:args.samples]
+
+
+def encode_normalized(registry: EmbeddingModelRegistry, model_name: str, backend: str,
+                      texts: List[str], batch_size: int) -> np.ndarray:
+    """정규화된 임베딩 생성"""
+    embeddings = registry.encode(model_name, texts, backend, batch_size=batch_size)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def measure_throughput(registry: EmbeddingModelRegistry, model_name: str, backend: str,
+                       texts: List[str], batch_size: int, rounds: int = 3) -> Dict:
+    """
+    백엔드 처리량 측정
+    Args:
+        registry: 모델 레지스트리
+        model_name: 임베딩 모델명
+        backend: 임베딩 백엔드
+        texts: 인코딩할 텍스트
+        batch_size: 인코딩 배치 크기
+        rounds: 측정 반복 횟수 (가장 빠른 값 사용)
+    Returns:
+        처리량 통계
+    """
+    # 모델 로드와 첫 호출 비용은 제외
+    registry.encode(model_name, texts[:batch_size], backend, batch_size=batch_size)
+
+    timings = []
+    for _ in range(rounds):
+        start_time = time.perf_counter()
+        registry.encode(model_name, texts, backend, batch_size=batch_size)
+        timings.append(time.perf_counter() - start_time)
+
+    best = min(timings)
+    return {
+        'backend': backend,
+        'texts': len(texts),
+        'best_seconds': best,
+        'texts_per_second': len(texts) / best if best > 0 else 0,
+        'load_time': registry.get_stats(registry.model_key(model_name, backend)).get('load_time', 0),
+        'memory_mb': registry.get_stats(registry.model_key(model_name, backend)).get('memory_mb', 0)
+    }
+
+
+def check_parity(reference: np.ndarray, candidate: np.ndarray) -> Dict:
+    """
+    두 백엔드 임베딩의 코사인 일치도
+    Args:
+        reference: 기준(torch) 정규화 임베딩
+        candidate: 비교 대상 정규화 임베딩
+    Returns:
+        코사인 유사도 통계
+    """
+    cosines = np.sum(reference * candidate, axis=1)
+    return {
+        'mean_cosine': float(cosines.mean()),
+        'min_cosine': float(cosines.min()),
+        'p01_cosine': float(np.percentile(cosines, 1))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 백엔드 일치도 검사 및 벤치마크")
+    parser.add_argument('--model', default="paraphrase-multilingual-MiniLM-L12-v2", help="임베딩 모델명")
+    parser.add_argument('--backend', default='onnx-int8', help="비교할 백엔드")
+    parser.add_argument('--course-id', help="청크 텍스트를 샘플링할 강의 ID")
+    parser.add_argument('--texts-file', help="한 줄에 텍스트 하나씩 담긴 파일")
+    parser.add_argument('--samples', type=int, default=256, help="샘플 텍스트 수")
+    parser.add_argument('--batch-size', type=int, default=32, help="인코딩 배치 크기")
+    parser.add_argument('--min-cosine', type=float, default=0.99, help="허용 최소 코사인 유사도")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.backend == 'onnx-int8' and not ONNX_AVAILABLE:
+        logger.error("ONNX 백엔드 라이브러리가 설치되지 않았습니다. (pip install 'sentence-transformers[onnx]')")
+        sys.exit(2)
+
+    manager = FAISSVectorManager(embedding_model=args.model)
+    registry = get_model_registry()
+    texts = load_texts(args, manager)
+
+    reference = encode_normalized(registry, args.model, 'torch', texts, args.batch_size)
+    candidate = encode_normalized(registry, args.model, args.backend, texts, args.batch_size)
+    parity = check_parity(reference, candidate)
+
+    report = {
+        'model': args.model,
+        'samples': len(texts),
+        'parity': parity,
+        'throughput': [
+            measure_throughput(registry, args.model, 'torch', texts, args.batch_size),
+            measure_throughput(registry, args.model, args.backend, texts, args.batch_size)
+        ]
+    }
+    report['speedup'] = (report['throughput'][1]['texts_per_second']
+                         / max(report['throughput'][0]['texts_per_second'], 1e-9))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if parity['min_cosine'] < args.min_cosine:
+        logger.error(f"백엔드 일치도 기준 미달: 최소 코사인 {parity['min_cosine']:.4f} < {args.min_cosine}")
+        sys.exit(1)
+
+    logger.info(f"백엔드 일치도 통과: 평균 코사인 {parity['mean_cosine']:.4f}, 속도 {report['speedup']:.2f}배")
+
+
+if __name__ == "__main__":
+    main()
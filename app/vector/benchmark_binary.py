@@ -0,0 +1,197 @@
+"""
+이진 1단계 검색 + float16 재정렬과 IndexFlatIP 전수 검색의 재현율/지연 시간 비교 스크립트
+
+IndexFlatIP 결과를 정답으로 보고, 부호 이진화 인덱스(IndexBinaryFlat 또는 IndexBinaryIVF)에서
+top_k * rerank_factor개 후보를 뽑아 float16 벡터로 재정렬한 결과의 recall@k를 잰다.
+결과는 JSON으로 출력한다.
+
+사용법 (저장소 루트에서 실행):
+    python app/vector/benchmark_binary.py
+    python app/vector/benchmark_binary.py --vectors 200000 --nlist 1024 --nprobe 32
+    python app/vector/benchmark_binary.py --course-id <강의 ID> --rerank-factors 4 10 20
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import faiss
+import numpy as np
+
+# 현재 디렉토리를 sys.path에 추가
+current_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(current_dir))
+
+from vector.binary_index import BinaryQuantizedIndex
+
+logger = logging.getLogger(__name__)
+
+
+def synthetic_vectors(count: int, dimension: int, clusters: int = 256, seed: int = 0) -> np.ndarray:
+    """군집 구조가 있는 정규화된 임의 벡터 (실제 임베딩처럼 주제별로 모여 있도록)"""
+    rng = np.random.RandomState(seed)
+    centers = rng.randn(clusters, dimension).astype(np.float32)
+    vectors = centers[rng.randint(clusters, size=count)] + 0.6 * rng.randn(count, dimension).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def load_course_vectors(course_id: str) -> np.ndarray:
+    """강의 인덱스의 (삭제되지 않은) 벡터 전체"""
+    from vector.faiss_manager import FAISSVectorManager
+
+    manager = FAISSVectorManager(use_embedding_cache=False)
+    index, metadata = manager.load_course_index(course_id)
+    vectors, _ = manager._reconstruct_vectors(course_id, index, metadata)
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def make_queries(vectors: np.ndarray, count: int, seed: int = 1) -> np.ndarray:
+    """코퍼스 벡터에 잡음을 더한 쿼리 (정규화)"""
+    rng = np.random.RandomState(seed)
+    queries = vectors[rng.randint(len(vectors), size=count)]
+    queries = queries + 0.3 * rng.randn(*queries.shape).astype(np.float32) / np.sqrt(vectors.shape[1])
+    return np.ascontiguousarray(queries / np.linalg.norm(queries, axis=1, keepdims=True), dtype=np.float32)
+
+
+def rescore(queries: np.ndarray, candidates: np.ndarray, vectors_f16: np.ndarray,
+            top_k: int) -> np.ndarray:
+    """후보를 float16 벡터와의 내적으로 재정렬해서 상위 top_k ID 반환"""
+    results = np.full((len(queries), top_k), -1, dtype=np.int64)
+    for row, (query, ids) in enumerate(zip(queries, candidates)):
+        ids = ids[ids >= 0]
+        scores = vectors_f16[ids].astype(np.float32) @ query
+        order = np.argsort(-scores)[:top_k]
+        results[row, :len(order)] = ids[order]
+    return results
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    """쿼리별 정답 상위 k개 중 찾은 비율의 평균"""
+    return float(np.mean([len(set(f[f >= 0]) & set(t[t >= 0])) / max(1, (t >= 0).sum())
+                          for f, t in zip(found, truth)]))
+
+
+def latency_percentiles(search_fn, queries: np.ndarray) -> Tuple[Dict, np.ndarray]:
+    """쿼리를 하나씩 검색해서 지연 시간(ms) 분위수와 결과 ID 반환"""
+    timings = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search_fn(query[None, :])[0])
+        timings.append((time.perf_counter() - start) * 1000)
+    timings = np.array(timings)
+    return {
+        'p50_ms': float(np.percentile(timings, 50)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'p99_ms': float(np.percentile(timings, 99))
+    }, np.array(results)
+
+
+def run_benchmark(vectors: np.ndarray, queries: np.ndarray, top_k: int, rerank_factors: List[int],
+                  nlist: int, nprobe: int) -> Dict:
+    """
+    IndexFlatIP와 이진 1단계 + float16 재정렬 비교
+    Args:
+        vectors: 정규화된 코퍼스 벡터
+        queries: 정규화된 쿼리 벡터
+        top_k: 결과 수
+        rerank_factors: 비교할 재정렬 후보 배수
+        nlist: 이진 IVF 클러스터 수 (0이면 IndexBinaryFlat)
+        nprobe: 이진 IVF 검색 클러스터 수
+    Returns:
+        비교 결과
+    """
+    count, dimension = vectors.shape
+    ids = np.arange(count, dtype=np.int64)
+
+    start = time.time()
+    flat = faiss.IndexFlatIP(dimension)
+    flat.add(vectors)
+    flat_build = time.time() - start
+    flat_latency, truth = latency_percentiles(lambda q: flat.search(q, top_k)[1], queries)
+
+    start = time.time()
+    binary = BinaryQuantizedIndex.build(dimension, vectors, nlist)
+    binary.add_with_ids(vectors, ids)
+    binary.nprobe = nprobe
+    vectors_f16 = vectors.astype(np.float16)
+    binary_build = time.time() - start
+
+    report = {
+        'vectors': count,
+        'dimension': dimension,
+        'queries': len(queries),
+        'top_k': top_k,
+        'flat_ip': {
+            'build_s': flat_build,
+            'memory_mb': count * dimension * 4 / (1024 * 1024),
+            **flat_latency
+        },
+        'binary': {
+            'index': 'IndexBinaryIVF' if nlist else 'IndexBinaryFlat',
+            'nlist': nlist,
+            'nprobe': nprobe if nlist else None,
+            'build_s': binary_build,
+            # 1단계 인덱스는 메모리, 재정렬용 float16 벡터는 메모리 맵 파일
+            'first_stage_memory_mb': count * binary.d / 8 / (1024 * 1024),
+            'rescore_vectors_mb': vectors_f16.nbytes / (1024 * 1024),
+            'memory_reduction': (count * dimension * 4) / (count * binary.d / 8),
+            'runs': []
+        }
+    }
+
+    for factor in rerank_factors:
+        def search(query, factor=factor):
+            _, candidates = binary.search(query, top_k * factor)
+            return rescore(query, candidates, vectors_f16, top_k)
+
+        latency, found = latency_percentiles(search, queries)
+        _, first_stage = binary.search(queries, top_k)
+        report['binary']['runs'].append({
+            'rerank_factor': factor,
+            'recall_at_k': recall_at_k(found, truth),
+            'first_stage_recall_at_k': recall_at_k(first_stage, truth),
+            **latency
+        })
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이진 1단계 검색과 IndexFlatIP 비교")
+    parser.add_argument('--course-id', help="벡터를 가져올 강의 ID (생략하면 합성 벡터)")
+    parser.add_argument('--vectors', type=int, default=50000, help="합성 벡터 수")
+    parser.add_argument('--dimension', type=int, default=384, help="합성 벡터 차원")
+    parser.add_argument('--queries', type=int, default=200, help="쿼리 수")
+    parser.add_argument('--top-k', type=int, default=10, help="결과 수")
+    parser.add_argument('--rerank-factors', type=int, nargs='+', default=[4, 10, 20], help="재정렬 후보 배수")
+    parser.add_argument('--nlist', type=int, default=0, help="이진 IVF 클러스터 수 (0이면 전수 비교)")
+    parser.add_argument('--nprobe', type=int, default=16, help="이진 IVF 검색 클러스터 수")
+    parser.add_argument('--output', help="결과 JSON 파일 경로 (생략하면 표준 출력)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.course_id:
+        vectors = load_course_vectors(args.course_id)
+    else:
+        vectors = synthetic_vectors(args.vectors, args.dimension)
+    if len(vectors) == 0:
+        raise ValueError("비교할 벡터가 없습니다.")
+
+    queries = make_queries(vectors, args.queries)
+    report = run_benchmark(vectors, queries, args.top_k, args.rerank_factors, args.nlist, args.nprobe)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+        logger.info(f"결과 저장: {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+인덱스 타입별 벤치마크 및 재현율 측정 스크립트
+
+코퍼스(합성 벡터, 텍스트 파일, 강의 인덱스)를 준비한 뒤 FAISSVectorManager가 지원하는 인덱스 구성마다
+매니저의 인덱스 생성/검색/재정렬 코드로 인덱스를 만들고, 생성 시간, 메모리(인덱스 파일 크기),
+단일 쿼리 지연 시간 p50/p95/p99, 전수 검색(IndexFlatIP) 대비 recall@k를 측정해서 JSON으로 출력한다.
+--reduced-dimensions를 주면 같은 구성을 PCA(또는 Matryoshka)로 축소한 벡터로도 측정한다
+(정답은 항상 원래 차원의 전수 검색).
+--baseline으로 이전 결과를 넘기면 재현율 하락이나 지연 시간 증가가 기준을 넘을 때 종료 코드 1.
+
+사용법 (저장소 루트에서 실행):
+    python app/vector/benchmark_indexes.py --output bench.json
+    python app/vector/benchmark_indexes.py --vectors 200000 --configs flat ivf hnsw binary
+    python app/vector/benchmark_indexes.py --texts-file corpus.txt --top-k 5
+    python app/vector/benchmark_indexes.py --texts-file corpus.txt --configs flat hnsw --reduced-dimensions 128 192
+    python app/vector/benchmark_indexes.py --course-id <강의 ID> --baseline bench.json
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import faiss
+import numpy as np
+
+# 현재 디렉토리를 sys.path에 추가
+current_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(current_dir))
+
+from vector.faiss_manager import FAISSVectorManager
+from vector.segmented_index import SegmentedIndex
+from vector.projection import DimensionProjection
+from vector.benchmark_binary import (synthetic_vectors, load_course_vectors, make_queries,
+                                     recall_at_k, latency_percentiles)
+
+logger = logging.getLogger(__name__)
+
+# 벤치마크할 인덱스 구성 (이름 -> 인덱스 타입)
+INDEX_CONFIGS = {
+    'flat': 'flat',
+    'ivf': 'ivf',
+    'hnsw': 'hnsw',
+    'ivfpq': 'ivfpq',
+    'opq': 'opq',
+    'binary': 'binary',
+    'binary_ivf': 'binary_ivf'
+}
+
+# PQ 코드북 학습에 필요한 최소 벡터 수 (중심점당 39개)
+PQ_MIN_VECTORS_PER_CENTROID = 39
+
+
+class BenchmarkVectorManager(FAISSVectorManager):
+    """코퍼스 차원을 그대로 쓰는 매니저 (합성 벡터 벤치마크에서 임베딩 모델을 로드하지 않음)"""
+
+    def __init__(self, dimension: int, base_path: Path, **kwargs):
+        """
+        초기화
+        Args:
+            dimension: 벡터 차원
+            base_path: 재정렬용 원본 벡터 파일을 쓸 임시 디렉토리
+            kwargs: FAISSVectorManager 인자
+        """
+        super().__init__(use_embedding_cache=False, **kwargs)
+        self._benchmark_dimension = dimension
+        self.base_path = Path(base_path)
+
+    @property
+    def dimension(self) -> int:
+        return self._benchmark_dimension
+
+
+def load_corpus(args) -> np.ndarray:
+    """벤치마크 코퍼스 벡터 (강의 인덱스, 텍스트 파일, 합성 벡터 순)"""
+    if args.course_id:
+        return load_course_vectors(args.course_id)
+
+    if args.texts_file:
+        with open(args.texts_file, encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+        if not texts:
+            raise ValueError("벤치마크할 텍스트가 없습니다.")
+        manager = FAISSVectorManager(use_embedding_cache=False)
+        return manager.embed_texts(texts)
+
+    return synthetic_vectors(args.vectors, args.dimension)
+
+
+def benchmark_config(manager: BenchmarkVectorManager, name: str, index_type: str, vectors: np.ndarray,
+                     queries: np.ndarray, truth: np.ndarray, top_k: int) -> Dict:
+    """
+    한 인덱스 구성의 생성 시간, 메모리, 지연 시간, 재현율 측정
+    Args:
+        manager: 벤치마크용 매니저
+        name: 구성 이름
+        index_type: 인덱스 타입
+        vectors: 정규화된 코퍼스 벡터
+        queries: 정규화된 쿼리 벡터
+        truth: 전수 검색 상위 top_k ID
+        top_k: 결과 수
+    Returns:
+        측정 결과
+    """
+    course_id = f"benchmark_{name}"
+    ids = np.arange(len(vectors), dtype=np.int64)
+    metadata = {'index_type': index_type}
+
+    start = time.time()
+    index, params = manager._build_index(index_type, vectors, ids)
+    metadata['index_params'] = params
+    manager._apply_search_params(index, metadata)
+    build_seconds = time.time() - start
+
+    # 메모리는 매니저 캐시와 같은 기준(인덱스 파일 크기)으로 계산
+    index_path = manager.base_path / f"{course_id}.faiss"
+    manager._write_index(index, index_path)
+    index_bytes = index_path.stat().st_size
+
+    result = {
+        'index_type': index_type,
+        'index_params': params,
+        'build_s': build_seconds,
+        'index_mb': index_bytes / (1024 * 1024),
+        'bytes_per_vector': index_bytes / len(vectors)
+    }
+
+    # 실제 검색 경로와 같게 기본 세그먼트로 감싸 검색 (압축 인덱스는 원본 벡터 파일로 재정렬)
+    segments = SegmentedIndex(index, vectors.shape[1])
+    if manager._is_compressed(metadata):
+        raw_dtype = manager._raw_vectors_dtype(index_type)
+        manager._write_raw_vectors(course_id, vectors, ids, len(vectors), raw_dtype)
+        result['rerank_factor'] = manager._rerank_factor(metadata)
+        result['rerank_vectors_mb'] = manager._raw_vectors_path(course_id, raw_dtype).stat().st_size / (1024 * 1024)
+
+        def search(query):
+            _, candidates = segments.search(query, top_k * manager._rerank_factor(metadata))
+            return manager._rerank_exact(course_id, query, candidates, top_k, raw_dtype)[1]
+    else:
+        def search(query):
+            return segments.search(query, top_k)[1]
+
+    latency, found = latency_percentiles(search, queries)
+    result.update(latency)
+    result['recall_at_k'] = recall_at_k(found, truth)
+    return result
+
+
+def compare_with_baseline(report: Dict, baseline: Dict, max_recall_drop: float,
+                          max_latency_increase: float) -> List[str]:
+    """
+    이전 결과와 비교해서 기준을 넘은 항목 목록 반환
+    Args:
+        report: 이번 결과
+        baseline: 이전 결과
+        max_recall_drop: 허용하는 recall@k 하락 폭
+        max_latency_increase: 허용하는 p95 지연 시간 증가 비율 (0.5 = 50%)
+    Returns:
+        회귀 설명 문자열 리스트
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or 'recall_at_k' not in previous or 'recall_at_k' not in result:
+            continue
+        if result['recall_at_k'] < previous['recall_at_k'] - max_recall_drop:
+            regressions.append(f"{name}: recall@k {previous['recall_at_k']:.4f} -> {result['recall_at_k']:.4f}")
+        if result['p95_ms'] > previous['p95_ms'] * (1 + max_latency_increase):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.3f}ms -> {result['p95_ms']:.3f}ms")
+    return regressions
+
+
+def run_benchmark(vectors: np.ndarray, configs: List[str], queries: int, top_k: int,
+                  manager_kwargs: Dict, source: str, reduced_dimensions: List[int] = None,
+                  reduction_method: str = 'pca') -> Dict:
+    """
+    인덱스 구성별 벤치마크 실행
+    Args:
+        vectors: 정규화된 코퍼스 벡터
+        configs: 측정할 구성 이름
+        queries: 쿼리 수
+        top_k: 결과 수
+        manager_kwargs: 매니저 인자 (nprobe, efSearch, PQ 설정, 재정렬 배수)
+        source: 코퍼스 출처 설명
+        reduced_dimensions: 추가로 측정할 축소 차원 목록
+        reduction_method: 차원 축소 방식 ('pca' 또는 'matryoshka')
+    Returns:
+        JSON으로 쓸 결과
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    query_vectors = make_queries(vectors, queries)
+
+    # 정답: 전수 검색 상위 top_k
+    exact = faiss.IndexFlatIP(vectors.shape[1])
+    exact.add(vectors)
+    _, truth = exact.search(query_vectors, top_k)
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'faiss': faiss.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine()
+        },
+        'corpus': {
+            'source': source,
+            'vectors': len(vectors),
+            'dimension': vectors.shape[1],
+            'queries': queries,
+            'top_k': top_k
+        },
+        'manager_params': manager_kwargs,
+        'results': {}
+    }
+
+    # (이름 접미사, 코퍼스 벡터, 쿼리 벡터, 투영 정보) - 축소 차원은 투영한 벡터로 같은 구성을 다시 측정
+    variants = [('', vectors, query_vectors, None)]
+    for dimension in reduced_dimensions or []:
+        start = time.time()
+        projection = DimensionProjection.train(vectors, dimension, reduction_method)
+        info = {
+            'method': reduction_method,
+            'dimension': dimension,
+            'explained_variance': projection.explained_variance,
+            'train_s': time.time() - start
+        }
+        variants.append((f"@{reduction_method}{dimension}", projection.apply(vectors),
+                         projection.apply(query_vectors), info))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = BenchmarkVectorManager(vectors.shape[1], Path(tmp_dir), **manager_kwargs)
+        min_pq_vectors = PQ_MIN_VECTORS_PER_CENTROID * 2 ** manager.pq_nbits
+
+        for suffix, variant_vectors, variant_queries, projection_info in variants:
+            for config in configs:
+                name = config + suffix
+                index_type = INDEX_CONFIGS[config]
+                if index_type in ('ivfpq', 'opq') and len(vectors) < min_pq_vectors:
+                    logger.warning(f"PQ 학습에 벡터 수가 부족해 건너뜁니다: {name} ({len(vectors)} < {min_pq_vectors})")
+                    report['results'][name] = {'index_type': index_type, 'skipped': 'not enough vectors'}
+                    continue
+
+                logger.info(f"인덱스 벤치마크: {name}")
+                result = benchmark_config(manager, name, index_type, variant_vectors, variant_queries, truth, top_k)
+                if projection_info:
+                    result['projection'] = projection_info
+                report['results'][name] = result
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인덱스 타입별 벤치마크 및 재현율 측정")
+    parser.add_argument('--course-id', help="벡터를 가져올 강의 ID")
+    parser.add_argument('--texts-file', help="한 줄에 한 청크씩 들어 있는 텍스트 파일 (임베딩 모델로 인코딩)")
+    parser.add_argument('--vectors', type=int, default=50000, help="합성 벡터 수")
+    parser.add_argument('--dimension', type=int, default=384, help="합성 벡터 차원")
+    parser.add_argument('--queries', type=int, default=200, help="쿼리 수")
+    parser.add_argument('--top-k', type=int, default=10, help="결과 수")
+    parser.add_argument('--configs', nargs='+', choices=list(INDEX_CONFIGS), default=list(INDEX_CONFIGS),
+                        help="측정할 인덱스 구성")
+    parser.add_argument('--ivf-nprobe', type=int, default=16, help="IVF 검색 클러스터 수")
+    parser.add_argument('--hnsw-m', type=int, default=32, help="HNSW 그래프 이웃 수")
+    parser.add_argument('--hnsw-ef-search', type=int, default=64, help="HNSW 검색 후보 수")
+    parser.add_argument('--pq-m', type=int, default=48, help="PQ 서브 벡터 수")
+    parser.add_argument('--rerank-factor', type=int, default=4, help="PQ 재정렬 후보 배수")
+    parser.add_argument('--reduced-dimensions', type=int, nargs='+', default=[],
+                        help="추가로 측정할 축소 차원 (예: 128 192)")
+    parser.add_argument('--reduction-method', choices=list(DimensionProjection.METHODS), default='pca',
+                        help="차원 축소 방식")
+    parser.add_argument('--binary-rerank-factor', type=int, default=10, help="이진 인덱스 재정렬 후보 배수")
+    parser.add_argument('--output', help="결과 JSON 파일 경로 (생략하면 표준 출력)")
+    parser.add_argument('--baseline', help="비교할 이전 결과 JSON")
+    parser.add_argument('--max-recall-drop', type=float, default=0.02, help="허용하는 recall@k 하락 폭")
+    parser.add_argument('--max-latency-increase', type=float, default=0.5, help="허용하는 p95 증가 비율")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    vectors = load_corpus(args)
+    if len(vectors) == 0:
+        raise ValueError("벤치마크할 벡터가 없습니다.")
+
+    source = (f"course:{args.course_id}" if args.course_id
+              else f"texts:{args.texts_file}" if args.texts_file else "synthetic")
+    manager_kwargs = {
+        'ivf_nprobe': args.ivf_nprobe,
+        'hnsw_m': args.hnsw_m,
+        'hnsw_ef_search': args.hnsw_ef_search,
+        'pq_m': args.pq_m,
+        'rerank_factor': args.rerank_factor,
+        'binary_rerank_factor': args.binary_rerank_factor
+    }
+    report = run_benchmark(vectors, args.configs, args.queries, args.top_k, manager_kwargs, source,
+                           args.reduced_dimensions, args.reduction_method)
+
+    regressions: Optional[List[str]] = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_with_baseline(report, json.load(f), args.max_recall_drop,
+                                                args.max_latency_increase)
+        report['regressions'] = regressions
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding='utf-8')
+        logger.info(f"결과 저장: {args.output}")
+    else:
+        print(output)
+
+    if regressions:
+        for regression in regressions:
+            logger.error(f"성능 회귀: {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
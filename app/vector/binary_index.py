@@ -0,0 +1,128 @@
+from pathlib import Path
+from typing import Optional, Tuple
+
+import faiss
+import numpy as np
+
+
+class BinaryQuantizedIndex:
+    """
+    부호 이진화 1단계 검색 인덱스 (IndexBinaryFlat / IndexBinaryIVF)
+
+    정규화된 float 임베딩의 각 차원을 부호(>0) 1비트로 줄여 저장하므로 1단계 인덱스 메모리는
+    float32 대비 1/32이다. 해밍 거리로 후보를 뽑고, 최종 점수는 매니저가 float16 원본 벡터로
+    다시 계산한다. 검색 결과 점수는 해밍 거리를 코사인 근사값(1 - 2 * 해밍 / 차원)으로 바꾼 값이다.
+    세그먼트 인덱스와 매니저가 쓰는 faiss.Index 메서드(add_with_ids, remove_ids, search, ntotal)만 제공한다.
+    """
+
+    # 이진 IVF는 ID 선택자를 지원하지 않으므로 선택자가 있으면 더 많이 뽑아 거름
+    SELECTOR_OVERFETCH = 8
+
+    def __init__(self, index: faiss.IndexBinary):
+        """
+        초기화
+        Args:
+            index: 청크 ID 매핑 이진 인덱스 (IndexBinaryIDMap2)
+        """
+        self.index = index
+        self.d = index.d
+        self.ivf = faiss.downcast_IndexBinary(index.index)
+        if not isinstance(self.ivf, faiss.IndexBinaryIVF):
+            self.ivf = None
+
+    @classmethod
+    def build(cls, dimension: int, vectors: np.ndarray, nlist: int = 0) -> "BinaryQuantizedIndex":
+        """
+        빈 이진 인덱스 생성 (nlist가 0이면 전수 비교, 아니면 IVF)
+        Args:
+            dimension: float 벡터 차원
+            vectors: IVF 학습용 정규화된 임베딩
+            nlist: IVF 클러스터 수
+        Returns:
+            이진 인덱스
+        """
+        # 이진 인덱스 차원은 8의 배수여야 하므로 남는 비트는 0으로 채움
+        bits = -(-dimension // 8) * 8
+        if nlist:
+            inner = faiss.IndexBinaryIVF(faiss.IndexBinaryFlat(bits), bits, nlist)
+            inner.train(cls.binarize(vectors))
+        else:
+            inner = faiss.IndexBinaryFlat(bits)
+
+        return cls(faiss.IndexBinaryIDMap2(inner))
+
+    @staticmethod
+    def binarize(vectors: np.ndarray) -> np.ndarray:
+        """float 벡터를 부호 비트로 압축 ((N, ceil(d/8)) uint8)"""
+        return np.packbits(np.asarray(vectors) > 0, axis=1)
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal
+
+    @property
+    def id_map(self):
+        return self.index.id_map
+
+    @property
+    def nprobe(self) -> Optional[int]:
+        return self.ivf.nprobe if self.ivf is not None else None
+
+    @nprobe.setter
+    def nprobe(self, value: int):
+        if self.ivf is not None:
+            self.ivf.nprobe = value
+
+    def add_with_ids(self, vectors: np.ndarray, ids: np.ndarray):
+        self.index.add_with_ids(self.binarize(vectors), np.ascontiguousarray(ids, dtype=np.int64))
+
+    def remove_ids(self, ids: np.ndarray) -> int:
+        return self.index.remove_ids(np.ascontiguousarray(ids, dtype=np.int64))
+
+    def reconstruct_batch(self, ids: np.ndarray) -> np.ndarray:
+        raise RuntimeError("이진 인덱스는 float 벡터를 복원할 수 없습니다.")
+
+    def search_params(self, selector: faiss.IDSelector) -> faiss.SearchParameters:
+        """선택자 검색 파라미터 (이진 IVF는 search에서 직접 거름)"""
+        return faiss.SearchParameters(sel=selector)
+
+    def search(self, queries: np.ndarray, k: int,
+               params: faiss.SearchParameters = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        해밍 거리 검색
+        Args:
+            queries: (쿼리 수, dimension) 정규화된 임베딩
+            k: 쿼리별 후보 수
+            params: 검색 파라미터 (선택자만 사용)
+        Returns:
+            (코사인 근사값, 청크 ID) 배열, 결과가 모자라면 ID는 -1
+        """
+        codes = self.binarize(queries)
+        selector = params.sel if params is not None else None
+
+        if selector is None:
+            distances, ids = self.index.search(codes, k)
+        elif self.ivf is None:
+            distances, ids = self.index.search(codes, k, params=params)
+        else:
+            fetch = min(self.ntotal, k * self.SELECTOR_OVERFETCH)
+            distances, ids = self.index.search(codes, fetch)
+            keep = np.zeros(ids.shape, dtype=bool)
+            for position in np.flatnonzero(ids.ravel() >= 0):
+                keep.flat[position] = selector.is_member(int(ids.flat[position]))
+            order = np.argsort(~keep, axis=1, kind='stable')[:, :k]
+            ids = np.where(np.take_along_axis(keep, order, axis=1), np.take_along_axis(ids, order, axis=1), -1)
+            distances = np.take_along_axis(distances, order, axis=1)
+
+        similarities = 1 - 2 * distances.astype(np.float32) / self.d
+        similarities[ids < 0] = -np.inf
+        return similarities, ids
+
+    def write(self, path: Path):
+        """인덱스 파일 저장"""
+        faiss.write_index_binary(self.index, str(path))
+
+    @classmethod
+    def read(cls, path: Path) -> "BinaryQuantizedIndex":
+        """인덱스 파일 읽기 (1단계 인덱스는 작으므로 메모리 맵을 쓰지 않음)"""
+        return cls(faiss.read_index_binary(str(path)))
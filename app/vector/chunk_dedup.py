@@ -0,0 +1,182 @@
+import os
+import logging
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MinHashDeduplicator:
+    """
+    강의별 근사 중복 청크 검출 (MinHash + LSH)
+
+    청크 텍스트의 문자 n-gram 집합으로 MinHash 시그니처를 만들고, 시그니처를 밴드로 나눈
+    LSH 키가 하나라도 같은 청크만 후보로 비교한다. 시그니처 일치 비율(자카드 유사도 추정치)이
+    기준 이상이면 중복으로 본다. 문자 n-gram을 쓰므로 띄어쓰기가 불규칙한 한국어에도 동작한다.
+    시그니처는 청크 ID 순서로 저장소 디렉토리의 minhash.bin (uint32 x num_perm)에 추가한다.
+    """
+
+    PRIME = (1 << 31) - 1
+    # 시그니처가 없는 행 (중복 검사 도입 이전 청크)
+    EMPTY = np.iinfo(np.uint32).max
+    # 같은 LSH 키를 가진 기존 청크 중 비교할 최대 개수
+    MAX_CANDIDATES = 8
+
+    def __init__(self, store_dir: Path, threshold: float = 0.9, num_perm: int = 64,
+                 bands: int = 16, shingle_size: int = 5, seed: int = 1):
+        """
+        초기화
+        Args:
+            store_dir: 청크 저장소 디렉토리 (course_{id}_chunks)
+            threshold: 중복으로 볼 최소 자카드 유사도 추정치
+            num_perm: MinHash 해시 함수 수
+            bands: LSH 밴드 수 (num_perm의 약수)
+            shingle_size: 문자 n-gram 길이
+            seed: 해시 함수 계수 시드 (저장된 시그니처와 같아야 함)
+        """
+        if num_perm % bands != 0:
+            raise ValueError(f"밴드 수가 해시 함수 수의 약수가 아닙니다: {num_perm} / {bands}")
+
+        self.path = Path(store_dir) / "minhash.bin"
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, self.PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, self.PRIME, size=num_perm).astype(np.uint64)
+        self._band_weights = rng.randint(1, 1 << 62, size=num_perm // bands, dtype=np.int64).astype(np.uint64)
+
+    def _shingle_hashes(self, text: str) -> np.ndarray:
+        """정규화한 텍스트의 문자 n-gram 해시 (PRIME 미만)"""
+        text = ' '.join(text.lower().split())
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        if len(codes) == 0:
+            return np.zeros(1, dtype=np.uint64)
+
+        k = min(self.shingle_size, len(codes))
+        windows = np.lib.stride_tricks.sliding_window_view(codes, k)
+        powers = np.uint64(1000003) ** np.arange(k, dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            hashes = windows @ powers
+            hashes ^= hashes >> np.uint64(29)
+        return np.unique(hashes % np.uint64(self.PRIME))
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        """
+        MinHash 시그니처 계산
+        Args:
+            texts: 청크 텍스트 리스트
+        Returns:
+            (텍스트 수, num_perm) uint32 시그니처
+        """
+        signatures = np.zeros((len(texts), self.num_perm), dtype=np.uint32)
+        for i, text in enumerate(texts):
+            hashes = self._shingle_hashes(text)
+            # a < 2^31, h < 2^31 이므로 uint64 범위에서 넘치지 않음
+            signatures[i] = ((np.outer(self._a, hashes) + self._b[:, None]) % np.uint64(self.PRIME)).min(axis=1)
+        return signatures
+
+    def _band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """밴드별 LSH 키 (행 수, bands) uint64"""
+        rows = signatures.reshape(len(signatures), self.bands, -1).astype(np.uint64)
+        with np.errstate(over='ignore'):
+            return rows @ self._band_weights
+
+    def _similarity(self, left: np.ndarray, right: np.ndarray) -> float:
+        """시그니처 일치 비율 (자카드 유사도 추정치)"""
+        return float(np.mean(left == right))
+
+    def load(self, chunk_ids: np.ndarray) -> np.ndarray:
+        """
+        저장된 시그니처 읽기
+        Args:
+            chunk_ids: 청크 ID 배열
+        Returns:
+            (ID 수, num_perm) 시그니처 (저장된 적 없는 행은 EMPTY)
+        """
+        signatures = np.full((len(chunk_ids), self.num_perm), self.EMPTY, dtype=np.uint32)
+        if not self.path.exists() or len(chunk_ids) == 0:
+            return signatures
+
+        stored = np.memmap(self.path, dtype=np.uint32, mode='r').reshape(-1, self.num_perm)
+        present = chunk_ids < len(stored)
+        signatures[present] = stored[chunk_ids[present]]
+        return signatures
+
+    def find_duplicates(self, signatures: np.ndarray, existing_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        근사 중복 청크 찾기 (기존 청크 또는 같은 배치의 앞선 청크와 비교)
+        Args:
+            signatures: 새 청크 시그니처
+            existing_ids: 비교할 기존 청크 ID (보통 인덱스에 남아 있는 벡터의 청크)
+        Returns:
+            (청크별로 같은 내용의 기존 청크 ID, 청크별로 같은 내용의 앞선 새 청크 위치) int64 배열 (없으면 -1)
+        """
+        existing_matches = np.full(len(signatures), -1, dtype=np.int64)
+        batch_matches = np.full(len(signatures), -1, dtype=np.int64)
+        duplicate = np.zeros(len(signatures), dtype=bool)
+        if len(signatures) == 0:
+            return existing_matches, batch_matches
+
+        new_keys = self._band_keys(signatures)
+
+        # 기존 청크: 밴드별로 정렬한 키에서 이진 탐색
+        existing_ids = np.asarray(existing_ids, dtype=np.int64)
+        existing = self.load(existing_ids)
+        present = existing[:, 0] != self.EMPTY
+        existing, existing_ids = existing[present], existing_ids[present]
+        if len(existing):
+            existing_keys = self._band_keys(existing)
+            for band in range(self.bands):
+                order = np.argsort(existing_keys[:, band], kind='stable')
+                sorted_keys = existing_keys[order, band]
+                left = np.searchsorted(sorted_keys, new_keys[:, band], side='left')
+                right = np.searchsorted(sorted_keys, new_keys[:, band], side='right')
+                for i in np.flatnonzero((right > left) & ~duplicate):
+                    for j in order[left[i]:min(right[i], left[i] + self.MAX_CANDIDATES)]:
+                        if self._similarity(signatures[i], existing[j]) >= self.threshold:
+                            duplicate[i] = True
+                            existing_matches[i] = existing_ids[j]
+                            break
+
+        # 같은 배치 안의 중복: 앞에서 남긴 청크와 비교
+        buckets = [{} for _ in range(self.bands)]
+        for i in range(len(signatures)):
+            if not duplicate[i]:
+                for band in range(self.bands):
+                    for j in buckets[band].get(new_keys[i, band], ())[:self.MAX_CANDIDATES]:
+                        if self._similarity(signatures[i], signatures[j]) >= self.threshold:
+                            duplicate[i] = True
+                            batch_matches[i] = j
+                            break
+                    if duplicate[i]:
+                        break
+            if not duplicate[i]:
+                for band in range(self.bands):
+                    buckets[band].setdefault(new_keys[i, band], []).append(i)
+
+        return existing_matches, batch_matches
+
+    def append(self, signatures: np.ndarray, offset: int):
+        """
+        시그니처 추가 (청크 저장소와 같은 행 번호)
+        Args:
+            signatures: 추가할 시그니처
+            offset: 첫 행의 청크 ID (이전 행이 모자라면 EMPTY로 채우고, 이후 내용은 잘라냄)
+        """
+        row_bytes = self.num_perm * np.dtype(np.uint32).itemsize
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(self.path, 'ab') as f:
+            rows = f.tell() // row_bytes
+            if rows < offset:
+                f.write(np.full((offset - rows, self.num_perm), self.EMPTY, dtype=np.uint32).tobytes())
+            else:
+                f.truncate(offset * row_bytes)
+            f.write(np.ascontiguousarray(signatures, dtype=np.uint32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,523 @@
+import json
+import os
+import shutil
+import zlib
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# zstd 압축은 선택 사항
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 청크 텍스트 압축 방식
+TEXT_CODECS = {None: 0, 'zlib': 1, 'zstd': 2}
+
+
+class ChunkMetadataStore:
+    """
+    강의별 청크 메타데이터 컬럼 저장소
+
+    청크 ID(행 번호) 순서로 컬럼 파일에 추가만 하고, 검색 시에는
+    메모리 맵으로 결과 ID의 행만 읽는다. 청크 ID는 재사용하지 않는다.
+        document_ids.bin   : 문서 ID (고정 길이 바이트 문자열)
+        chunk_indices.bin  : 문서 내 청크 번호 (int32)
+        meta_refs.bin      : 메타데이터 테이블 행 번호 (int32)
+        deleted.bin        : 삭제 표시 (uint8)
+        previews.bin       : 텍스트 미리보기 (UTF-8), preview_offsets.bin (int64)
+        texts.bin          : 청크 전체 텍스트 (압축 방식 1바이트 + UTF-8 또는 압축 데이터), text_offsets.bin (int64)
+        meta_table.jsonl   : 문서 메타데이터 (JSON 한 줄씩), meta_offsets.bin (int64)
+        labels.bin         : 강의 라벨 (int32, 공유 버킷 저장소만)
+        local_ids.bin      : 강의 안에서의 청크 ID (int64, 공유 버킷 저장소만)
+        aliases.bin        : 근사 중복으로 임베딩을 건너뛴 청크가 함께 쓰는 벡터의 청크 ID (int64, 자기 벡터면 -1)
+        successors.bin     : 벡터를 가진 청크가 삭제된 뒤 그 벡터의 검색 결과로 보여줄 청크 ID (int64, 없으면 -1)
+
+    근사 중복 청크는 인덱스에 벡터를 넣지 않고 기존 청크의 벡터를 별칭으로 가리킨다.
+    벡터는 그 벡터를 쓰는 청크가 하나라도 남아 있는 동안 인덱스에 유지한다.
+    """
+
+    DOC_ID_DTYPE = np.dtype('S64')
+
+    def __init__(self, store_dir: Path, text_compression: str = None):
+        """
+        초기화
+        Args:
+            store_dir: 저장소 디렉토리 (course_{id}_chunks)
+            text_compression: 새로 추가하는 전체 텍스트의 압축 방식 (None, 'zlib', 'zstd')
+        """
+        if text_compression not in TEXT_CODECS:
+            raise ValueError(f"지원되지 않는 텍스트 압축 방식: {text_compression}")
+        if text_compression == 'zstd' and not ZSTD_AVAILABLE:
+            logger.warning("zstandard 라이브러리가 설치되지 않아 zlib으로 압축합니다.")
+            text_compression = 'zlib'
+
+        self.store_dir = Path(store_dir)
+        self.text_compression = text_compression
+
+    def _path(self, name: str) -> Path:
+        return self.store_dir / name
+
+    def _column(self, name: str, dtype) -> np.ndarray:
+        """컬럼 파일을 읽기 전용 메모리 맵으로 열기"""
+        path = self._path(name)
+        if not path.exists() or path.stat().st_size == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r')
+
+    def _ends(self, name: str) -> np.ndarray:
+        """끝 오프셋 컬럼 (메모리 맵, 행의 시작은 앞 행의 끝이고 첫 행은 0)"""
+        return self._column(name, np.int64)
+
+    def __len__(self) -> int:
+        path = self._path('chunk_indices.bin')
+        if not path.exists():
+            return 0
+        return path.stat().st_size // np.dtype(np.int32).itemsize
+
+    def exists(self) -> bool:
+        return self.store_dir.exists()
+
+    def append(self, rows: List[Dict], offset: int):
+        """
+        청크 메타데이터 추가
+        Args:
+            rows: [{'document_id', 'chunk_index', 'text', 'full_text', 'original_metadata', 'alias'}]
+                  (full_text가 없으면 text를 전체 텍스트로 저장, alias는 함께 쓰는 벡터의 청크 ID (선택),
+                   공유 버킷 저장소는 모든 행에 'label'과 'local_id'가 있어야 함)
+            offset: 첫 행의 청크 ID (이후 내용은 잘라냄)
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+        # 같은 메타데이터는 테이블에 한 번만 저장
+        meta_count = self._truncate_table('meta_table.jsonl', 'meta_offsets.bin',
+                                          self._max_meta_ref(offset))
+        meta_rows = {}
+        meta_lines = []
+        meta_refs = np.zeros(len(rows), dtype=np.int32)
+        for i, row in enumerate(rows):
+            line = json.dumps(row.get('original_metadata', {}), ensure_ascii=False, default=str)
+            if line not in meta_rows:
+                meta_rows[line] = meta_count + len(meta_lines)
+                meta_lines.append(line.encode('utf-8') + b'\n')
+            meta_refs[i] = meta_rows[line]
+
+        doc_ids = np.zeros(len(rows), dtype=self.DOC_ID_DTYPE)
+        for i, row in enumerate(rows):
+            encoded = str(row['document_id']).encode('utf-8')
+            if len(encoded) > self.DOC_ID_DTYPE.itemsize:
+                raise ValueError(f"문서 ID가 너무 깁니다: {row['document_id']}")
+            doc_ids[i] = encoded
+
+        chunk_indices = np.array([row['chunk_index'] for row in rows], dtype=np.int32)
+        previews = [row['text'].encode('utf-8') for row in rows]
+        texts = [self._encode_text(row.get('full_text', row['text'])) for row in rows]
+
+        self._truncate_table('previews.bin', 'preview_offsets.bin', offset)
+        self._append_blobs('previews.bin', 'preview_offsets.bin', previews)
+        # 전체 텍스트 컬럼이 없던 저장소는 이전 행을 빈 값으로 채워 청크 ID와 행을 맞춤
+        text_rows = self._truncate_table('texts.bin', 'text_offsets.bin', offset)
+        self._append_blobs('texts.bin', 'text_offsets.bin', [b''] * (offset - text_rows) + texts)
+        self._append_blobs('meta_table.jsonl', 'meta_offsets.bin', meta_lines)
+        self._append_column('document_ids.bin', doc_ids, offset)
+        self._append_column('meta_refs.bin', meta_refs, offset)
+        self._append_column('deleted.bin', np.zeros(len(rows), dtype=np.uint8), offset)
+        self._append_column('aliases.bin', np.array([row.get('alias', -1) for row in rows], dtype=np.int64),
+                            offset, fill=-1)
+        self._append_column('successors.bin', np.full(len(rows), -1, dtype=np.int64), offset, fill=-1)
+        if rows and 'label' in rows[0]:
+            self._append_column('labels.bin', np.array([row['label'] for row in rows], dtype=np.int32), offset)
+            self._append_column('local_ids.bin', np.array([row['local_id'] for row in rows], dtype=np.int64),
+                                offset)
+        # 행 수의 기준이 되는 컬럼은 마지막에 기록
+        self._append_column('chunk_indices.bin', chunk_indices, offset)
+
+    def _max_meta_ref(self, offset: int) -> int:
+        """offset 이전 행들이 참조하는 메타데이터 테이블 행 수"""
+        meta_refs = self._column('meta_refs.bin', np.int32)[:offset]
+        return int(meta_refs.max()) + 1 if len(meta_refs) else 0
+
+    def _append_column(self, name: str, values: np.ndarray, offset: int, fill: int = 0):
+        """고정 길이 컬럼 파일을 offset 행에서 잘라낸 뒤 추가 (컬럼이 없던 이전 행은 fill로 채움)"""
+        with open(self._path(name), 'ab') as f:
+            rows = f.tell() // values.dtype.itemsize
+            if rows < offset:
+                f.write(np.full(offset - rows, fill, dtype=values.dtype).tobytes())
+            else:
+                f.truncate(offset * values.dtype.itemsize)
+            f.write(np.ascontiguousarray(values).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _truncate_table(self, data_name: str, offsets_name: str, rows: int) -> int:
+        """가변 길이 테이블을 rows 행까지만 남기고 잘라냄"""
+        ends = self._ends(offsets_name)
+        rows = min(rows, len(ends))
+        end = int(ends[rows - 1]) if rows > 0 else 0
+        for name, size in ((data_name, end), (offsets_name, rows * 8)):
+            with open(self._path(name), 'ab') as f:
+                f.truncate(size)
+        return rows
+
+    def _append_blobs(self, data_name: str, offsets_name: str, blobs: Sequence[bytes]):
+        """가변 길이 데이터와 끝 오프셋 추가"""
+        data_path = self._path(data_name)
+        start = data_path.stat().st_size if data_path.exists() else 0
+        ends = start + np.cumsum([len(blob) for blob in blobs], dtype=np.int64)
+
+        with open(data_path, 'ab') as f:
+            f.write(b''.join(blobs))
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self._path(offsets_name), 'ab') as f:
+            f.write(ends.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_blob(self, f, ends: np.ndarray, row: int) -> bytes:
+        start = int(ends[row - 1]) if row > 0 else 0
+        end = int(ends[row])
+        f.seek(start)
+        return f.read(end - start)
+
+    def _encode_text(self, text: str) -> bytes:
+        """전체 텍스트 인코딩 (압축 방식 1바이트 + 데이터)"""
+        data = text.encode('utf-8')
+        if self.text_compression == 'zlib':
+            data = zlib.compress(data)
+        elif self.text_compression == 'zstd':
+            data = zstandard.ZstdCompressor().compress(data)
+        return bytes([TEXT_CODECS[self.text_compression]]) + data
+
+    @staticmethod
+    def _decode_text(blob: bytes) -> str:
+        """전체 텍스트 디코딩 (레코드마다 기록된 압축 방식 사용)"""
+        codec, data = blob[0], blob[1:]
+        if codec == TEXT_CODECS['zlib']:
+            data = zlib.decompress(data)
+        elif codec == TEXT_CODECS['zstd']:
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("zstd로 압축된 청크 텍스트를 읽으려면 zstandard 라이브러리가 필요합니다.")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        return data.decode('utf-8')
+
+    def get_texts(self, chunk_ids: Sequence[int], limit: int = None) -> List[Optional[str]]:
+        """
+        청크 전체 텍스트 읽기 (오프셋 배열로 청크마다 한 번씩 seek)
+        Args:
+            chunk_ids: 청크 ID 리스트
+            limit: 유효한 ID의 상한 (보통 메타데이터의 next_chunk_id)
+        Returns:
+            ID별 전체 텍스트 (범위 밖, 삭제, 또는 전체 텍스트가 없는 예전 행이면 None)
+        """
+        text_ends = self._ends('text_offsets.bin')
+        count = min(len(self), len(text_ends))
+        if limit is not None:
+            count = min(count, limit)
+        if count <= 0:
+            return [None] * len(chunk_ids)
+
+        positions, valid = self._readable_rows(chunk_ids, count)
+        results = []
+        with open(self._path('texts.bin'), 'rb') as texts:
+            for position, readable in zip(positions, valid):
+                if not readable:
+                    results.append(None)
+                    continue
+                blob = self._read_blob(texts, text_ends, int(position))
+                results.append(self._decode_text(blob) if blob else None)
+        return results
+
+    def get_many(self, chunk_ids: Sequence[int], limit: int = None,
+                 full_text: bool = False) -> List[Optional[Dict]]:
+        """
+        검색 결과 청크 ID의 메타데이터만 읽기
+        Args:
+            chunk_ids: 청크 ID 리스트
+            limit: 유효한 ID의 상한 (보통 메타데이터의 next_chunk_id)
+            full_text: 전체 텍스트(full_text)도 읽을지 여부 (없는 예전 행은 미리보기로 대체)
+        Returns:
+            ID별 청크 메타데이터 (범위 밖이거나 삭제되었으면 None)
+        """
+        chunk_indices = self._column('chunk_indices.bin', np.int32)
+        count = len(chunk_indices) if limit is None else min(limit, len(chunk_indices))
+        if count == 0:
+            return [None] * len(chunk_ids)
+
+        doc_ids = self._column('document_ids.bin', self.DOC_ID_DTYPE)
+        meta_refs = self._column('meta_refs.bin', np.int32)
+        preview_ends = self._ends('preview_offsets.bin')
+        meta_ends = self._ends('meta_offsets.bin')
+
+        positions, valid = self._readable_rows(chunk_ids, count)
+        results = []
+        meta_cache = {}
+        with open(self._path('previews.bin'), 'rb') as previews, \
+                open(self._path('meta_table.jsonl'), 'rb') as meta_table:
+            for position, readable in zip(positions, valid):
+                if not readable:
+                    results.append(None)
+                    continue
+
+                position = int(position)
+                meta_ref = int(meta_refs[position])
+                if meta_ref not in meta_cache:
+                    meta_cache[meta_ref] = json.loads(self._read_blob(meta_table, meta_ends, meta_ref))
+
+                results.append({
+                    'document_id': doc_ids[position].decode('utf-8'),
+                    'chunk_index': int(chunk_indices[position]),
+                    'text': self._read_blob(previews, preview_ends, position).decode('utf-8'),
+                    'original_metadata': meta_cache[meta_ref]
+                })
+
+        if full_text:
+            texts = self.get_texts(chunk_ids, count)
+            for result, text in zip(results, texts):
+                if result is not None:
+                    result['full_text'] = text if text is not None else result['text']
+
+        return results
+
+    def get(self, chunk_id: int) -> Optional[Dict]:
+        """단일 청크 메타데이터"""
+        return self.get_many([chunk_id])[0]
+
+    def document_ids(self) -> np.ndarray:
+        """전체 청크의 문서 ID 컬럼 (메모리 맵)"""
+        return self._column('document_ids.bin', self.DOC_ID_DTYPE)[:len(self)]
+
+    def _readable_rows(self, chunk_ids: Sequence[int], count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        요청한 행의 범위/삭제 여부 확인 (삭제 컬럼은 요청한 행만 메모리 맵에서 읽음)
+        Args:
+            chunk_ids: 청크 ID 리스트
+            count: 유효한 행 수
+        Returns:
+            (int64 청크 ID 배열, 범위 안이고 삭제되지 않은 행 표시 배열)
+        """
+        positions = np.asarray(chunk_ids, dtype=np.int64).ravel()
+        valid = (positions >= 0) & (positions < count)
+        deleted = self._column('deleted.bin', np.uint8)
+        stored = valid & (positions < len(deleted))
+        valid[stored] = deleted[positions[stored]] == 0
+        return positions, valid
+
+    def _deleted_mask(self, count: int) -> np.ndarray:
+        """삭제 표시 배열 (삭제 컬럼이 없던 저장소는 0으로 채움)"""
+        deleted = np.asarray(self._column('deleted.bin', np.uint8)[:count], dtype=bool)
+        if len(deleted) < count:
+            deleted = np.concatenate([deleted, np.zeros(count - len(deleted), dtype=bool)])
+        return deleted
+
+    def _live_mask(self, count: int, label: int = None) -> np.ndarray:
+        """삭제되지 않은 (label이 주어지면 그 강의의) 행 표시 배열"""
+        live = ~self._deleted_mask(count)
+        if label is not None:
+            labels = np.asarray(self._column('labels.bin', np.int32)[:count])
+            live[:len(labels)] &= labels == label
+            live[len(labels):] = False
+        return live
+
+    def live_ids(self, limit: int = None, label: int = None) -> np.ndarray:
+        """
+        삭제되지 않은 청크 ID 목록
+        Args:
+            limit: ID 상한 (보통 메타데이터의 next_chunk_id)
+            label: 공유 버킷 저장소에서 이 강의 라벨의 청크만
+        Returns:
+            int64 청크 ID 배열
+        """
+        count = len(self) if limit is None else min(limit, len(self))
+        return np.flatnonzero(self._live_mask(count, label)).astype(np.int64)
+
+    def filter_ids(self, predicate: Optional[Callable[[Dict], bool]], limit: int = None,
+                   label: int = None) -> np.ndarray:
+        """
+        문서 메타데이터 조건을 만족하는 (삭제되지 않은) 청크 ID 목록
+        조건은 메타데이터 테이블 행(보통 문서당 한 행)마다 한 번만 평가한다.
+        Args:
+            predicate: 문서 메타데이터를 받아 포함 여부를 반환하는 함수 (None이면 조건 없음)
+            limit: ID 상한 (보통 메타데이터의 next_chunk_id)
+            label: 공유 버킷 저장소에서 이 강의 라벨의 청크만
+        Returns:
+            int64 청크 ID 배열
+        """
+        count = len(self) if limit is None else min(limit, len(self))
+        if count == 0:
+            return np.zeros(0, dtype=np.int64)
+        if predicate is None:
+            return self.live_ids(count, label)
+
+        meta_ends = self._ends('meta_offsets.bin')
+        matched = np.zeros(len(meta_ends), dtype=bool)
+        with open(self._path('meta_table.jsonl'), 'rb') as meta_table:
+            for meta_ref in range(len(matched)):
+                matched[meta_ref] = bool(predicate(json.loads(self._read_blob(meta_table, meta_ends, meta_ref))))
+
+        meta_refs = np.asarray(self._column('meta_refs.bin', np.int32)[:count])
+        return np.flatnonzero(matched[meta_refs] & self._live_mask(count, label)).astype(np.int64)
+
+    def find_document_ids(self, document_id: str, limit: int = None, label: int = None) -> np.ndarray:
+        """
+        문서에 속한 (삭제되지 않은) 청크 ID 목록
+        Args:
+            document_id: 문서 ID
+            limit: ID 상한
+            label: 공유 버킷 저장소에서 이 강의 라벨의 청크만
+        Returns:
+            int64 청크 ID 배열
+        """
+        live = self.live_ids(limit, label)
+        if len(live) == 0:
+            return live
+        doc_ids = self.document_ids()
+        return live[doc_ids[live] == str(document_id).encode('utf-8')]
+
+    def local_ids(self, chunk_ids: Sequence[int]) -> np.ndarray:
+        """
+        공유 버킷 청크 ID를 강의 안에서의 청크 ID로 변환
+        Args:
+            chunk_ids: 버킷 청크 ID 배열 (-1은 빈 결과)
+        Returns:
+            int64 강의 청크 ID 배열 (빈 결과와 범위 밖은 -1)
+        """
+        column = self._column('local_ids.bin', np.int64)
+        chunk_ids = np.asarray(chunk_ids, dtype=np.int64)
+        valid = (chunk_ids >= 0) & (chunk_ids < len(column))
+        result = np.full(chunk_ids.shape, -1, dtype=np.int64)
+        result[valid] = column[chunk_ids[valid]]
+        return result
+
+    def next_local_id(self, label: int, limit: int = None) -> int:
+        """
+        공유 버킷에서 강의 라벨의 다음 청크 ID (삭제된 행도 포함해서 재사용하지 않음)
+        Args:
+            label: 강의 라벨
+            limit: 버킷 청크 ID 상한 (보통 메타데이터의 next_chunk_id)
+        Returns:
+            강의 안에서의 다음 청크 ID
+        """
+        labels = self._column('labels.bin', np.int32)
+        count = min(len(self), len(labels))
+        if limit is not None:
+            count = min(count, limit)
+        rows = np.flatnonzero(np.asarray(labels[:count]) == label)
+        if len(rows) == 0:
+            return 0
+        return int(self._column('local_ids.bin', np.int64)[rows].max()) + 1
+
+    def vector_ids(self, chunk_ids: Sequence[int]) -> np.ndarray:
+        """
+        청크가 검색되는 벡터의 ID (근사 중복 청크는 함께 쓰는 기존 청크 ID, 나머지는 자기 ID)
+        Args:
+            chunk_ids: 청크 ID 배열
+        Returns:
+            int64 벡터 ID 배열 (요청한 행만 메모리 맵에서 읽음)
+        """
+        chunk_ids = np.asarray(chunk_ids, dtype=np.int64)
+        aliases = self._column('aliases.bin', np.int64)
+        result = chunk_ids.copy()
+        stored = (chunk_ids >= 0) & (chunk_ids < len(aliases))
+        result[stored] = np.where(aliases[chunk_ids[stored]] >= 0, aliases[chunk_ids[stored]], chunk_ids[stored])
+        return result
+
+    def live_vector_ids(self, limit: int = None, label: int = None) -> np.ndarray:
+        """
+        삭제되지 않은 청크가 하나라도 쓰고 있는 벡터 ID 목록 (인덱스에 남아 있어야 하는 벡터)
+        Args:
+            limit: ID 상한 (보통 메타데이터의 next_chunk_id)
+            label: 공유 버킷 저장소에서 이 강의 라벨의 청크만
+        Returns:
+            정렬된 int64 벡터 ID 배열
+        """
+        return np.unique(self.vector_ids(self.live_ids(limit, label)))
+
+    def resolve(self, vector_ids: np.ndarray, limit: int = None) -> np.ndarray:
+        """
+        검색 결과 벡터 ID를 결과로 보여줄 청크 ID로 변환
+        벡터를 가진 청크가 삭제되었으면 같은 벡터를 쓰는 남은 청크로 바꾸고, 나머지는 그대로 둔다.
+        Args:
+            vector_ids: 검색 결과 벡터 ID 배열 (-1은 빈 결과)
+            limit: ID 상한 (보통 메타데이터의 next_chunk_id)
+        Returns:
+            vector_ids와 같은 모양의 int64 청크 ID 배열 (요청한 행만 메모리 맵에서 읽음)
+        """
+        vector_ids = np.asarray(vector_ids, dtype=np.int64)
+        count = len(self) if limit is None else min(limit, len(self))
+        positions, readable = self._readable_rows(vector_ids, count)
+        successors = self._column('successors.bin', np.int64)
+        result = positions.copy()
+        redirect = np.flatnonzero(~readable & (positions >= 0) & (positions < min(count, len(successors))))
+        targets = np.asarray(successors[positions[redirect]])
+        result[redirect[targets >= 0]] = targets[targets >= 0]
+        return result.reshape(vector_ids.shape)
+
+    def update_successors(self, vector_ids: np.ndarray, removed_ids: np.ndarray, limit: int = None) -> np.ndarray:
+        """
+        청크를 삭제하기 전에, 영향을 받는 벡터마다 삭제 후 남는 청크 중 가장 앞의 청크를 대표로 기록
+        Args:
+            vector_ids: 삭제할 청크들이 쓰는 벡터 ID 배열
+            removed_ids: 삭제할 청크 ID 배열
+            limit: ID 상한 (보통 메타데이터의 next_chunk_id)
+        Returns:
+            쓰는 청크가 남지 않아 인덱스에서 지워야 하는 정렬된 int64 벡터 ID 배열
+        """
+        vector_ids = np.unique(np.asarray(vector_ids, dtype=np.int64))
+        live = np.setdiff1d(self.live_ids(limit), removed_ids)
+        users = self.vector_ids(live)
+        sharing = np.isin(users, vector_ids)
+        kept, first = np.unique(users[sharing], return_index=True)
+
+        path = self._path('successors.bin')
+        count = len(self)
+        # 대표 컬럼이 없던 저장소는 먼저 행 수만큼 -1로 채움
+        with open(path, 'ab') as f:
+            rows = f.tell() // np.dtype(np.int64).itemsize
+            if rows < count:
+                f.write(np.full(count - rows, -1, dtype=np.int64).tobytes())
+
+        orphaned = np.setdiff1d(vector_ids, kept)
+        successors = np.memmap(path, dtype=np.int64, mode='r+')
+        successors[kept] = live[sharing][first]
+        successors[orphaned] = -1
+        successors.flush()
+        del successors
+        return orphaned
+
+    def mark_deleted(self, ids: np.ndarray):
+        """
+        청크 삭제 표시
+        Args:
+            ids: 삭제할 청크 ID 배열
+        """
+        path = self._path('deleted.bin')
+        count = len(self)
+        # 삭제 컬럼이 없던 저장소는 먼저 행 수만큼 채움
+        with open(path, 'ab') as f:
+            if f.tell() < count:
+                f.write(bytes(count - f.tell()))
+
+        deleted = np.memmap(path, dtype=np.uint8, mode='r+')
+        deleted[np.asarray(ids, dtype=np.int64)] = 1
+        deleted.flush()
+        del deleted
+
+    def disk_size(self) -> int:
+        """저장소 전체 파일 크기 (바이트)"""
+        if not self.store_dir.exists():
+            return 0
+        return sum(path.stat().st_size for path in self.store_dir.iterdir())
+
+    def delete(self) -> bool:
+        """저장소 삭제"""
+        if not self.store_dir.exists():
+            return False
+        shutil.rmtree(self.store_dir)
+        return True
@@ -0,0 +1,189 @@
+import re
+from collections import deque
+from typing import Callable, Dict, Iterator, Tuple
+
+# 문장 경계
+#   종결 부호(. ! ? 。 … 등) 뒤 공백 (닫는 따옴표/괄호는 앞 문장에 포함)
+#   한국어 종결 어미(다/요/죠/까/음/함/됨/임) 뒤 줄바꿈 (슬라이드, PDF 추출 텍스트는 마침표 없이 줄을 바꾸는 경우가 많음)
+#   빈 줄 (문단 경계)
+SENTENCE_BOUNDARY = re.compile(
+    r'(?<=[.!?。！？…])(?P<close>[\'"”’)\]]*)\s+'
+    r'|(?<=[다요죠까음함됨임])[ \t]*\n\s*'
+    r'|\n[ \t]*\n\s*'
+)
+
+WORD_PATTERN = re.compile(r'\S+')
+TOKEN_PATTERN = re.compile(r'[가-힣]+|[A-Za-z0-9]+|\S')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    다국어 SentencePiece 토크나이저 기준 토큰 수 근사값 (모델을 로드하지 않음)
+    한글은 2음절, 영문/숫자는 4글자당 1토큰, 그 외 기호/문자는 글자당 1토큰으로 계산
+    Args:
+        text: 텍스트
+    Returns:
+        추정 토큰 수
+    """
+    total = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        length = match.end() - match.start()
+        first = text[match.start()]
+        if '가' <= first <= '힣':
+            total += (length + 1) // 2
+        elif first.isascii() and first.isalnum():
+            total += (length + 3) // 4
+        else:
+            total += 1
+    return total
+
+
+class TextChunker:
+    """
+    문서 텍스트 청크 분할기 (벡터 인덱스와 document_chunks 테이블이 같은 청크를 사용)
+
+    텍스트를 문장 단위로 한 번만 훑으면서 토큰 예산을 넘기 전까지 문장을 모아 청크를 만들고,
+    다음 청크는 직전 청크 끝부분의 문장(overlap_tokens 이하)부터 이어서 시작한다.
+    청크 텍스트는 원문에서 바로 잘라내므로 문장 사이의 공백/줄바꿈이 그대로 유지된다.
+    """
+
+    # 청크당 최대 토큰 수와 앞 청크와 겹치는 토큰 수
+    MAX_TOKENS = 400
+    OVERLAP_TOKENS = 80
+
+    # 이보다 짧은 문서는 검색에 쓸모가 없으므로 청크를 만들지 않음
+    # (청크 단위로 거르면 문서 끝부분 내용이 빠지므로 문서 전체 길이로 판단)
+    MIN_CHUNK_CHARS = 50
+
+    def __init__(self, max_tokens: int = None, overlap_tokens: int = None, min_chars: int = None,
+                 count_tokens: Callable[[str], int] = estimate_tokens):
+        """
+        초기화
+        Args:
+            max_tokens: 청크당 최대 토큰 수
+            overlap_tokens: 앞 청크와 겹치는 최대 토큰 수
+            min_chars: 청크를 만들 최소 문서 길이 (글자 수)
+            count_tokens: 토큰 수 계산 함수 (기본은 근사값)
+        """
+        self.max_tokens = max_tokens or self.MAX_TOKENS
+        self.overlap_tokens = self.OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        self.min_chars = self.MIN_CHUNK_CHARS if min_chars is None else min_chars
+        self.count_tokens = count_tokens
+
+        if not 0 <= self.overlap_tokens < self.max_tokens:
+            raise ValueError(f"겹침 토큰 수는 0 이상 최대 토큰 수({self.max_tokens}) 미만이어야 합니다: "
+                             f"{self.overlap_tokens}")
+
+    def iter_chunks(self, text: str, document_id: str) -> Iterator[Dict]:
+        """
+        문서를 청크로 분할
+        Args:
+            text: 문서 텍스트
+            document_id: 문서 ID
+        Returns:
+            청크 레코드 제너레이터 {'document_id', 'chunk_index', 'text', 'size',
+                                   'start', 'end' (원문 글자 위치), 'token_count'}
+        """
+        if not text or len(text.strip()) <= self.min_chars:
+            return
+
+        window = deque()  # 현재 청크의 (시작, 끝, 토큰 수) 문장
+        window_tokens = 0
+        has_new = False   # 이전 청크에 없던 문장이 있는지
+        chunk_index = 0
+
+        for start, end, tokens in self._sentences(text):
+            if window and window_tokens + tokens > self.max_tokens:
+                if has_new:
+                    yield self._make_chunk(text, window, window_tokens, document_id, chunk_index)
+                    chunk_index += 1
+                    has_new = False
+
+                # 끝부분 문장만 남겨 다음 청크의 겹침으로 사용
+                while window and (window_tokens > self.overlap_tokens or window_tokens + tokens > self.max_tokens):
+                    window_tokens -= window.popleft()[2]
+
+            window.append((start, end, tokens))
+            window_tokens += tokens
+            has_new = True
+
+        if has_new:
+            yield self._make_chunk(text, window, window_tokens, document_id, chunk_index)
+
+    def _make_chunk(self, text: str, window: deque, tokens: int, document_id: str,
+                    chunk_index: int) -> Dict:
+        """현재 문장 묶음으로 청크 레코드 생성"""
+        start, end = window[0][0], window[-1][1]
+        chunk_text = text[start:end]
+        return {
+            'document_id': document_id,
+            'chunk_index': chunk_index,
+            'text': chunk_text,
+            'size': len(chunk_text),
+            'start': start,
+            'end': end,
+            'token_count': tokens
+        }
+
+    def _sentences(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """문장 구간 (시작, 끝, 토큰 수) 제너레이터 (토큰 예산보다 긴 문장은 나눔)"""
+        position = 0
+        for match in SENTENCE_BOUNDARY.finditer(text):
+            yield from self._pieces(text, position, match.start() + len(match.group('close') or ''))
+            position = match.end()
+        yield from self._pieces(text, position, len(text))
+
+    def _pieces(self, text: str, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+        """
+        한 문장 구간을 앞뒤 공백을 빼고 토큰 예산 이하의 조각으로 나눔
+        Args:
+            text: 문서 텍스트
+            start: 문장 시작 위치
+            end: 문장 끝 위치
+        Returns:
+            (시작, 끝, 토큰 수) 제너레이터
+        """
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            return
+
+        tokens = self.count_tokens(text[start:end])
+        if tokens <= self.max_tokens:
+            yield start, end, tokens
+            return
+
+        # 긴 문장은 단어 경계에서 나누고, 다음 조각은 직전 조각 끝부분의 단어(overlap_tokens 이하)부터 시작
+        # (마침표 없이 이어지는 긴 텍스트도 청크 사이 겹침이 유지됨)
+        words = deque()  # 현재 조각의 (시작, 끝, 토큰 수) 단어
+        piece_tokens = 0
+        for word in self._words(text, start, end):
+            if words and piece_tokens + word[2] > self.max_tokens:
+                yield words[0][0], words[-1][1], piece_tokens
+                while words and (piece_tokens > self.overlap_tokens or piece_tokens + word[2] > self.max_tokens):
+                    piece_tokens -= words.popleft()[2]
+            words.append(word)
+            piece_tokens += word[2]
+        if words:
+            yield words[0][0], words[-1][1], piece_tokens
+
+    def _words(self, text: str, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+        """
+        단어 구간 (시작, 끝, 토큰 수) 제너레이터
+        띄어쓰기 없이 예산을 넘는 단어는 글자 수로 자르고, 조각마다 overlap_tokens만큼 겹치게 함
+        """
+        for match in WORD_PATTERN.finditer(text, start, end):
+            word_tokens = self.count_tokens(match.group())
+            if word_tokens <= self.max_tokens:
+                yield match.start(), match.end(), word_tokens
+                continue
+
+            size = max(1, (match.end() - match.start()) * self.max_tokens // word_tokens)
+            step = max(1, size * (self.max_tokens - self.overlap_tokens) // self.max_tokens)
+            for piece_start in range(match.start(), match.end(), step):
+                piece_end = min(piece_start + size, match.end())
+                yield piece_start, piece_end, self.count_tokens(text[piece_start:piece_end])
+                if piece_end == match.end():
+                    break
@@ -0,0 +1,160 @@
+import os
+import pickle
+import uuid
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from vector.segmented_index import get_course_lock
+
+logger = logging.getLogger(__name__)
+
+
+class CourseBucketRegistry:
+    """
+    공유 버킷 배치 기록 (작은 강의 ID -> 버킷 키, 강의 라벨)
+
+    작은 강의는 전용 인덱스 파일 대신 여러 강의가 함께 쓰는 버킷 인덱스에 넣고,
+    버킷 청크 저장소의 라벨 컬럼으로 강의를 구분한다. 버킷은 일반 강의 인덱스와 같은 파일 형식
+    (course_{버킷 키}.faiss 등)을 쓰므로 로그, 세그먼트 병합, 압축을 그대로 사용한다.
+    라벨은 버킷 안에서 재사용하지 않는다 (삭제 후 다시 추가된 강의는 새 라벨과 새 청크 ID 세대를 받음).
+    기록 형식:
+        {'courses': {강의 ID: {'bucket': 버킷 키, 'label': 라벨, 'generation': 청크 ID 세대}},
+         'buckets': {버킷 키: {'next_label': 다음 라벨, 'course_count': 배치된 강의 수}},
+         'next_bucket': 다음 버킷 번호}
+    """
+
+    FILE_NAME = "course_buckets.pkl"
+    BUCKET_PREFIX = "shared_bucket_"
+
+    # 등록 기록 변경 시 잡는 락 키 (강의 락과 같은 락 테이블 사용)
+    LOCK_KEY = "__course_buckets__"
+
+    def __init__(self, base_path: Path, write_atomic: Callable[[Path, Callable[[Path], None]], None],
+                 max_courses: int):
+        """
+        초기화
+        Args:
+            base_path: 인덱스 데이터 경로
+            write_atomic: 임시 파일에 쓰고 rename으로 교체하는 함수
+            max_courses: 버킷 하나에 배치할 최대 강의 수
+        """
+        self.path = Path(base_path) / self.FILE_NAME
+        self.write_atomic = write_atomic
+        self.max_courses = max_courses
+        self._cached: Optional[Tuple[Tuple[int, int], Dict]] = None
+
+    @classmethod
+    def is_bucket(cls, key: str) -> bool:
+        """공유 버킷 키인지"""
+        return str(key).startswith(cls.BUCKET_PREFIX)
+
+    def _load(self) -> Dict:
+        """등록 기록 로드 (파일이 바뀌지 않았으면 캐시 사용)"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return {'courses': {}, 'buckets': {}, 'next_bucket': 0}
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._cached is None or self._cached[0] != signature:
+            with open(self.path, 'rb') as f:
+                self._cached = (signature, pickle.load(f))
+        return self._cached[1]
+
+    def _save(self, registry: Dict):
+        def dump(path: Path):
+            with open(path, 'wb') as f:
+                pickle.dump(registry, f)
+
+        self.write_atomic(self.path, dump)
+        self._cached = None
+
+    def get(self, course_id: str) -> Optional[Tuple[str, int]]:
+        """
+        강의의 버킷 배치 조회
+        Args:
+            course_id: 강의 ID
+        Returns:
+            (버킷 키, 라벨), 버킷에 없으면 None
+        """
+        entry = self._load()['courses'].get(course_id)
+        if entry is None:
+            return None
+        return entry['bucket'], entry['label']
+
+    def generation(self, course_id: str) -> Optional[str]:
+        """
+        버킷에 배치된 강의의 청크 ID 세대
+        Args:
+            course_id: 강의 ID
+        Returns:
+            세대 문자열 (버킷에 없거나 세대를 기록하기 전에 배치된 강의면 None)
+        """
+        entry = self._load()['courses'].get(course_id)
+        return entry.get('generation') if entry is not None else None
+
+    def assign(self, course_id: str) -> Tuple[str, int]:
+        """
+        강의를 빈 자리가 있는 버킷에 배치 (이미 배치되어 있으면 기존 배치 반환)
+        Args:
+            course_id: 강의 ID
+        Returns:
+            (버킷 키, 라벨)
+        """
+        with get_course_lock(self.LOCK_KEY):
+            registry = self._load()
+            entry = registry['courses'].get(course_id)
+            if entry is not None:
+                return entry['bucket'], entry['label']
+
+            registry = {
+                'courses': dict(registry['courses']),
+                'buckets': {key: dict(info) for key, info in registry['buckets'].items()},
+                'next_bucket': registry['next_bucket']
+            }
+            open_buckets = [key for key, info in registry['buckets'].items()
+                            if info['course_count'] < self.max_courses]
+            if open_buckets:
+                bucket_key = open_buckets[0]
+            else:
+                bucket_key = f"{self.BUCKET_PREFIX}{registry['next_bucket']}"
+                registry['next_bucket'] += 1
+                registry['buckets'][bucket_key] = {'next_label': 0, 'course_count': 0}
+
+            bucket = registry['buckets'][bucket_key]
+            label = bucket['next_label']
+            bucket['next_label'] += 1
+            bucket['course_count'] += 1
+            registry['courses'][course_id] = {'bucket': bucket_key, 'label': label,
+                                              'generation': uuid.uuid4().hex}
+            self._save(registry)
+
+        logger.info(f"공유 버킷 배치: {course_id} -> {bucket_key} (라벨 {label})")
+        return bucket_key, label
+
+    def remove(self, course_id: str) -> bool:
+        """
+        강의 배치 기록 삭제 (전용 인덱스로 옮겼거나 강의 인덱스를 삭제한 경우)
+        Args:
+            course_id: 강의 ID
+        Returns:
+            삭제 여부
+        """
+        with get_course_lock(self.LOCK_KEY):
+            registry = self._load()
+            entry = registry['courses'].get(course_id)
+            if entry is None:
+                return False
+
+            courses = dict(registry['courses'])
+            del courses[course_id]
+            buckets = {key: dict(info) for key, info in registry['buckets'].items()}
+            buckets[entry['bucket']]['course_count'] -= 1
+            self._save({'courses': courses, 'buckets': buckets, 'next_bucket': registry['next_bucket']})
+        return True
+
+    def courses(self, bucket_key: str) -> List[str]:
+        """버킷에 배치된 강의 ID 목록"""
+        return [course_id for course_id, entry in self._load()['courses'].items()
+                if entry['bucket'] == bucket_key]
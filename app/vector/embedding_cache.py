@@ -0,0 +1,185 @@
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+import logging
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    청크 텍스트 임베딩 영구 캐시
+
+    (모델명, 정규화된 텍스트의 SHA-256)을 키로 정규화된 임베딩을 저장한다.
+    모델별 디렉토리에 추가만 하는 두 파일로 구성된다.
+        hashes.bin  : 텍스트 해시 (32바이트 원본 그대로), 행 수의 기준
+        vectors.bin : 임베딩 (dimension 열, float32 또는 float16)
+    """
+
+    # 'S32'는 읽을 때 끝의 NUL 바이트를 잘라내므로 원본 바이트를 그대로 보존하는 void 형식 사용
+    HASH_DTYPE = np.dtype('V32')
+
+    def __init__(self, cache_dir: Path, model_name: str, dimension: int, dtype: str = 'float32'):
+        """
+        초기화
+        Args:
+            cache_dir: 캐시 루트 디렉토리
+            model_name: 임베딩 모델명 (모델마다 별도 디렉토리 사용)
+            dimension: 임베딩 차원
+            dtype: 저장 자료형 ('float32' 또는 'float16')
+        """
+        if dtype not in ('float32', 'float16'):
+            raise ValueError(f"지원되지 않는 임베딩 캐시 자료형: {dtype}")
+
+        self.model_name = model_name
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self.cache_dir = Path(cache_dir) / re.sub(r'[^A-Za-z0-9._-]', '_', f"{model_name}_{dtype}")
+
+        self._lock = threading.Lock()
+        self._rows: Dict[bytes, int] = {}
+        self._loaded_rows = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """해시 계산용 텍스트 정규화 (유니코드 NFC, 공백 정리)"""
+        return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+    def text_hash(self, text: str) -> bytes:
+        """(모델명, 정규화된 텍스트) SHA-256 해시"""
+        key = f"{self.model_name}\0{self.normalize_text(text)}"
+        return hashlib.sha256(key.encode('utf-8')).digest()
+
+    def _path(self, name: str) -> Path:
+        return self.cache_dir / name
+
+    def _row_count(self) -> int:
+        """두 파일 모두에 온전히 기록된 행 수"""
+        hashes_path = self._path('hashes.bin')
+        vectors_path = self._path('vectors.bin')
+        if not hashes_path.exists() or not vectors_path.exists():
+            return 0
+        hash_rows = hashes_path.stat().st_size // self.HASH_DTYPE.itemsize
+        vector_rows = vectors_path.stat().st_size // (self.dimension * self.dtype.itemsize)
+        return min(hash_rows, vector_rows)
+
+    def _refresh(self) -> int:
+        """다른 프로세스가 추가한 행까지 해시 색인 갱신 (락을 잡은 상태에서 호출)"""
+        count = self._row_count()
+        if count > self._loaded_rows:
+            hashes = np.memmap(self._path('hashes.bin'), dtype=self.HASH_DTYPE, mode='r')[:count]
+            for row in range(self._loaded_rows, count):
+                self._rows.setdefault(hashes[row].tobytes(), row)
+            del hashes
+        elif count < self._loaded_rows:
+            # 캐시 파일이 지워졌거나 잘렸으면 색인을 다시 만듦
+            self._rows = {}
+            self._loaded_rows = 0
+            return self._refresh()
+        self._loaded_rows = count
+        return count
+
+    def get_many(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        캐시된 임베딩 조회
+        Args:
+            texts: 청크 텍스트 리스트
+        Returns:
+            (len(texts), dimension) float32 임베딩 행렬과 캐시에 없는 위치 리스트
+        """
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        hashes = [self.text_hash(text) for text in texts]
+
+        with self._lock:
+            count = self._refresh()
+            found = [(i, self._rows[h]) for i, h in enumerate(hashes) if h in self._rows]
+
+        if found:
+            vectors = np.memmap(self._path('vectors.bin'), dtype=self.dtype, mode='r',
+                                shape=(count, self.dimension))
+            positions = np.array([i for i, _ in found], dtype=np.int64)
+            rows = np.array([row for _, row in found], dtype=np.int64)
+            embeddings[positions] = vectors[rows]
+            del vectors
+
+        found_positions = {i for i, _ in found}
+        missing = [i for i in range(len(texts)) if i not in found_positions]
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        return embeddings, missing
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray):
+        """
+        임베딩 저장 (이미 있는 텍스트는 건너뜀)
+        Args:
+            texts: 청크 텍스트 리스트
+            embeddings: 정규화된 임베딩 행렬
+        """
+        if len(texts) == 0:
+            return
+
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            count = self._refresh()
+
+            new_rows = {}
+            for i, text in enumerate(texts):
+                text_hash = self.text_hash(text)
+                if text_hash not in self._rows and text_hash not in new_rows:
+                    new_rows[text_hash] = i
+
+            if not new_rows:
+                return
+
+            hashes = np.frombuffer(b''.join(new_rows), dtype=self.HASH_DTYPE)
+            vectors = np.asarray(embeddings, dtype=self.dtype)[list(new_rows.values())]
+
+            # 벡터를 먼저 기록하고 행 수의 기준인 해시를 마지막에 기록
+            self._append(self._path('vectors.bin'), vectors, count * self.dimension * self.dtype.itemsize)
+            self._append(self._path('hashes.bin'), hashes, count * self.HASH_DTYPE.itemsize)
+
+            for row, text_hash in enumerate(new_rows, start=count):
+                self._rows[text_hash] = row
+            self._loaded_rows = count + len(new_rows)
+
+    @staticmethod
+    def _append(path: Path, values: np.ndarray, offset: int):
+        """파일을 offset 바이트에서 잘라낸 뒤 추가"""
+        with open(path, 'ab') as f:
+            f.truncate(offset)
+            f.write(np.ascontiguousarray(values).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def __len__(self) -> int:
+        return self._row_count()
+
+    def disk_size(self) -> int:
+        """캐시 파일 크기 (바이트)"""
+        if not self.cache_dir.exists():
+            return 0
+        return sum(path.stat().st_size for path in self.cache_dir.iterdir())
+
+    def get_stats(self) -> Dict:
+        """캐시 통계 조회"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'model_name': self.model_name,
+                'entries': self._row_count(),
+                'size_mb': self.disk_size() / (1024 * 1024),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0
+            }
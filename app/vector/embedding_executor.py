@@ -0,0 +1,104 @@
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingExecutor:
+    """
+    대량 임베딩용 전용 작업자
+
+    텍스트를 batch_size 단위로 나누어 작업자 스레드에서 인코딩하고, 호출한 쪽은
+    끝난 배치부터 순서대로 받아 인덱스에 추가한다. 호출한 쪽이 배치를 처리하는
+    동안 작업자는 다음 배치(최대 max_pending개)를 미리 인코딩한다.
+    작업자 스레드는 매니저마다 만들지 않고 스레드 수별 프로세스 전역 풀을 함께 쓴다.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], np.ndarray], batch_size: int = 256,
+                 max_pending: int = 2, workers: int = 1):
+        """
+        초기화
+        Args:
+            embed_fn: 텍스트 리스트를 정규화된 임베딩 행렬로 바꾸는 함수
+            batch_size: 한 번에 인코딩할 텍스트 수
+            max_pending: 미리 인코딩해 둘 최대 배치 수 (작업자 수보다 작으면 작업자 수)
+            workers: 인코딩 작업자 스레드 수
+                     (모델 인코딩은 모델별 락으로 직렬화되므로 늘리면 캐시 조회, 정규화 등 나머지 작업이 겹쳐짐)
+        """
+        if batch_size <= 0:
+            raise ValueError(f"잘못된 배치 크기: {batch_size}")
+        if workers <= 0:
+            raise ValueError(f"잘못된 작업자 수: {workers}")
+
+        self.embed_fn = embed_fn
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_pending = max(1, max_pending, workers)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        return get_embedding_thread_pool(self.workers)
+
+    def map(self, texts: List[str]) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        배치 단위 임베딩
+        Args:
+            texts: 인코딩할 텍스트 리스트
+        Returns:
+            (배치 시작 위치, 배치 임베딩)을 순서대로 내보내는 이터레이터
+        """
+        executor = self._get_executor()
+        starts = iter(range(0, len(texts), self.batch_size))
+        pending = deque()
+
+        def submit_next():
+            start = next(starts, None)
+            if start is not None:
+                batch = texts[start:start + self.batch_size]
+                pending.append((start, executor.submit(self.embed_fn, batch)))
+
+        for _ in range(self.max_pending):
+            submit_next()
+
+        try:
+            while pending:
+                start, future = pending.popleft()
+                embeddings = future.result()
+                submit_next()
+                yield start, embeddings
+        finally:
+            # 중간에 실패하거나 중단되면 아직 시작하지 않은 배치는 취소
+            for _, future in pending:
+                future.cancel()
+
+
+_shared_pools: Dict[int, ThreadPoolExecutor] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_embedding_thread_pool(workers: int = 1) -> ThreadPoolExecutor:
+    """
+    프로세스 전역 임베딩 작업자 풀 (같은 스레드 수를 쓰는 모든 매니저가 공유)
+    Args:
+        workers: 작업자 스레드 수
+    Returns:
+        스레드 풀
+    """
+    with _shared_pools_lock:
+        if workers not in _shared_pools:
+            _shared_pools[workers] = ThreadPoolExecutor(max_workers=workers,
+                                                        thread_name_prefix=f"embedding-{workers}")
+        return _shared_pools[workers]
+
+
+def shutdown_embedding_thread_pools():
+    """전역 임베딩 작업자 풀 종료 (다음 임베딩 때 다시 생성)"""
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True)
@@ -1,26 +1,138 @@
 import faiss
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Tuple, Optional
 import pickle
 import os
+import time
+import uuid
 from pathlib import Path
 import logging
 
+from vector.index_cache import CourseIndexCache, get_course_index_cache
+from vector.chunk_store import ChunkMetadataStore, ZSTD_AVAILABLE
+from vector.embedding_cache import EmbeddingCache
+from vector.query_cache import QueryEmbeddingCache, get_query_embedding_cache
+from vector.model_registry import (EmbeddingModelRegistry, get_model_registry,
+                                   EMBEDDING_BACKENDS, ONNX_AVAILABLE)
+from vector.embedding_executor import EmbeddingExecutor
+from vector.vector_log import VectorLog
+from vector.segmented_index import SegmentedIndex, get_course_lock, get_compaction_scheduler
+from vector.chunk_dedup import MinHashDeduplicator
+from vector.search_filter import normalize_filters, matches_filters
+from vector.binary_index import BinaryQuantizedIndex
+from vector.projection import DimensionProjection
+from vector.chunker import TextChunker
+from vector.course_buckets import CourseBucketRegistry
+
 logger = logging.getLogger(__name__)
 
 class FAISSVectorManager:
     """FAISS 벡터 데이터베이스 관리 클래스"""
     
-    def __init__(self, embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2"):
+    # 인덱스 타입 자동 전환 기준 (청크 수)
+    IVF_THRESHOLD = 20000
+    HNSW_THRESHOLD = 200000
+    
+    # 압축(PQ) 인덱스 타입
+    COMPRESSED_INDEX_TYPES = ('ivfpq', 'opq', 'binary', 'binary_ivf')
+    # 부호 이진화 1단계 인덱스 (재정렬은 float16 원본 벡터로)
+    BINARY_INDEX_TYPES = ('binary', 'binary_ivf')
+    
+    # 인덱스/메타데이터 교체 중에 읽었을 때 다시 읽는 횟수
+    LOAD_RETRIES = 3
+    
+    # 델타 세그먼트(또는 삭제 표시)가 이 개수와 (기본 세그먼트 벡터 수 x 비율)을 모두 넘으면 병합
+    COMPACT_MIN_VECTORS = 2000
+    COMPACT_DELTA_RATIO = 0.1
+    COMPACT_TOMBSTONE_RATIO = 0.2
+    
+    # 필터 검색에서 조건을 만족하는 청크가 이보다 적으면 ID 선택자 대신 부분 집합을 전수 비교
+    FILTER_BRUTE_FORCE_MIN = 1024
+    FILTER_BRUTE_FORCE_RATIO = 0.05
+    
+    # 유사도 기준 검색(range search)의 쿼리별 최대 결과 수
+    RANGE_MAX_RESULTS = 20
+    
+    # 차원 축소를 적용할 청크 수
+    REDUCTION_THRESHOLD = 20000
+    
+    # 작은 강의 공유 버킷 설정 (버킷당 최대 강의 수, 전용 인덱스로 옮길 강의 청크 수)
+    BUCKET_MAX_COURSES = 64
+    BUCKET_PROMOTE_CHUNKS = 2000
+    
+    def __init__(self, embedding_model: str = "paraphrase-multilingual-MiniLM-L12-v2",
+                 index_cache: CourseIndexCache = None,
+                 ivf_threshold: int = None, hnsw_threshold: int = None,
+                 ivf_nprobe: int = 16, hnsw_m: int = 32, hnsw_ef_search: int = 64,
+                 compression: str = None, pq_m: int = 48, pq_nbits: int = 8,
+                 rerank_factor: int = 4, binary_rerank_factor: int = 10, mmap_indexes: bool = False,
+                 embedding_cache: EmbeddingCache = None, use_embedding_cache: bool = True,
+                 embedding_cache_dtype: str = 'float32', query_cache: QueryEmbeddingCache = None,
+                 model_registry: EmbeddingModelRegistry = None,
+                 embed_batch_size: int = 256, embed_prefetch: int = 2, embed_workers: int = 1,
+                 embedding_backend: str = 'torch', compact_delta_ratio: float = None,
+                 compact_tombstone_ratio: float = None, background_compaction: bool = True,
+                 chunk_text_compression: str = None, dedup_chunks: bool = True,
+                 dedup_threshold: float = 0.9, reduced_dimension: int = None,
+                 reduction_method: str = 'pca', reduction_threshold: int = None,
+                 chunk_max_tokens: int = None, chunk_overlap_tokens: int = None,
+                 shared_buckets: bool = True, bucket_max_courses: int = None,
+                 bucket_promote_chunks: int = None):
         """
         초기화
         Args:
             embedding_model: 사용할 임베딩 모델명
+            index_cache: 인덱스 캐시 (None이면 프로세스 전역 캐시 사용)
+            ivf_threshold: IVF 인덱스로 전환할 청크 수
+            hnsw_threshold: HNSW 인덱스로 전환할 청크 수
+            ivf_nprobe: IVF 검색 시 탐색할 클러스터 수
+            hnsw_m: HNSW 그래프 이웃 수
+            hnsw_ef_search: HNSW 검색 후보 수
+            compression: 압축 저장 모드 (None, 'pq', 'opq', 'binary')
+            pq_m: PQ 서브 벡터 수
+            pq_nbits: PQ 서브 벡터당 비트 수
+            rerank_factor: 압축 인덱스 검색 시 재정렬할 후보 배수 (top_k * rerank_factor)
+            binary_rerank_factor: 이진 인덱스 검색 시 재정렬할 후보 배수 (해밍 거리는 PQ보다 거칠어서 더 많이 뽑음)
+            mmap_indexes: 검색용 인덱스를 메모리 맵(읽기 전용)으로 로드할지 여부
+            embedding_cache: 청크 임베딩 캐시 (None이면 데이터 경로의 모델별 캐시 사용)
+            use_embedding_cache: 청크 임베딩 캐시 사용 여부
+            embedding_cache_dtype: 임베딩 캐시 저장 자료형 ('float32' 또는 'float16')
+            query_cache: 쿼리 임베딩 캐시 (None이면 프로세스 전역 캐시 사용)
+            model_registry: 임베딩 모델 레지스트리 (None이면 프로세스 전역 레지스트리 사용)
+            embed_batch_size: 문서 추가 시 한 번에 인코딩해서 인덱스에 추가할 청크 수
+            embed_prefetch: 인덱스에 추가하는 동안 미리 인코딩해 둘 배치 수
+            embed_workers: 문서 추가 시 인코딩 작업자 스레드 수 (프로세스 전역 풀을 공유)
+            embedding_backend: 임베딩 백엔드 ('torch' 또는 'onnx-int8')
+            compact_delta_ratio: 기본 세그먼트 대비 델타 세그먼트가 이 비율을 넘으면 병합
+            compact_tombstone_ratio: 기본 세그먼트 대비 삭제 표시가 이 비율을 넘으면 병합
+            background_compaction: 세그먼트 병합을 백그라운드 작업자에서 실행할지 여부 (False면 변경 직후 실행)
+            chunk_text_compression: 청크 전체 텍스트 저장 시 압축 방식 (None, 'zlib', 'zstd')
+            dedup_chunks: 강의 안의 근사 중복 청크를 임베딩하지 않고 기존 벡터의 별칭으로 추가할지 여부
+            dedup_threshold: 중복으로 볼 최소 자카드 유사도 (MinHash 추정치)
+            reduced_dimension: 큰 강의 인덱스의 축소 차원 (None이면 축소하지 않음, 예: 128, 192)
+            reduction_method: 차원 축소 방식 ('pca' 또는 'matryoshka')
+            reduction_threshold: 차원 축소를 적용할 청크 수
+            chunk_max_tokens: 청크당 최대 토큰 수
+            chunk_overlap_tokens: 앞 청크와 겹치는 토큰 수
+            shared_buckets: 새 강의를 공유 버킷 인덱스에 배치할지 여부 (False면 항상 전용 인덱스 생성)
+            bucket_max_courses: 버킷 하나에 배치할 최대 강의 수
+            bucket_promote_chunks: 버킷의 강의를 전용 인덱스로 옮길 청크 수
         """
         self.embedding_model_name = embedding_model
-        self.embedding_model = SentenceTransformer(embedding_model)
-        self.dimension = self.embedding_model.get_sentence_embedding_dimension()
+        
+        # 모델은 프로세스 전체에서 한 번만, 처음 인코딩할 때 로드
+        self.model_registry = model_registry or get_model_registry()
+        
+        # 임베딩 백엔드 (ONNX 라이브러리가 없으면 PyTorch 사용)
+        if embedding_backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"지원되지 않는 임베딩 백엔드: {embedding_backend}")
+        if embedding_backend == 'onnx-int8' and not ONNX_AVAILABLE:
+            logger.warning("ONNX 백엔드 라이브러리가 설치되지 않아 torch 백엔드를 사용합니다.")
+            embedding_backend = 'torch'
+        self.embedding_backend = embedding_backend
+        
+        # 백엔드마다 임베딩 값이 조금씩 다르므로 캐시 키는 (모델, 백엔드) 기준
+        self.embedding_model_key = self.model_registry.model_key(embedding_model, embedding_backend)
         
         # 벡터 인덱스 저장소
         self.vector_indexes = {}
@@ -30,7 +142,95 @@ class FAISSVectorManager:
         self.base_path = Path("app/vector/data")
         self.base_path.mkdir(parents=True, exist_ok=True)
         
-        logger.info(f"FAISS Manager 초기화 완료 - 모델: {embedding_model}, 차원: {self.dimension}")
+        # 로드된 인덱스 캐시 (프로세스 내 모든 매니저가 공유)
+        self.index_cache = index_cache or get_course_index_cache()
+        
+        # 인덱스 타입 전환 설정
+        self.ivf_threshold = ivf_threshold or self.IVF_THRESHOLD
+        self.hnsw_threshold = hnsw_threshold or self.HNSW_THRESHOLD
+        self.ivf_nprobe = ivf_nprobe
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_search = hnsw_ef_search
+        
+        # 압축 저장 설정
+        if compression not in (None, 'pq', 'opq', 'binary'):
+            raise ValueError(f"지원되지 않는 압축 모드: {compression}")
+        self.compression = compression
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
+        self.rerank_factor = rerank_factor
+        self.binary_rerank_factor = binary_rerank_factor
+        
+        # 여러 프로세스가 같은 인덱스 파일의 페이지 캐시를 공유하도록 메모리 맵 로드
+        self.mmap_indexes = mmap_indexes
+        
+        # 추가/삭제는 로그(델타 세그먼트)에만 기록하고, 기준을 넘으면 기본 세그먼트로 병합
+        self.compact_delta_ratio = compact_delta_ratio or self.COMPACT_DELTA_RATIO
+        self.compact_tombstone_ratio = compact_tombstone_ratio or self.COMPACT_TOMBSTONE_RATIO
+        self.background_compaction = background_compaction
+        
+        # 검색 결과의 전체 텍스트는 DB 대신 강의별 청크 텍스트 파일에서 읽음
+        if chunk_text_compression not in (None, 'zlib', 'zstd'):
+            raise ValueError(f"지원되지 않는 텍스트 압축 방식: {chunk_text_compression}")
+        if chunk_text_compression == 'zstd' and not ZSTD_AVAILABLE:
+            logger.warning("zstandard 라이브러리가 설치되지 않아 청크 텍스트를 zlib으로 압축합니다.")
+            chunk_text_compression = 'zlib'
+        self.chunk_text_compression = chunk_text_compression
+        
+        # 슬라이드 제목, 저작권 문구처럼 문서 안에서 반복되는 청크는 한 번만 임베딩/색인
+        self.dedup_chunks = dedup_chunks
+        self.dedup_threshold = dedup_threshold
+        
+        # 문서 청크 분할기 (DocumentService가 document_chunks 저장에도 같은 청크를 사용)
+        self.chunker = TextChunker(chunk_max_tokens, chunk_overlap_tokens)
+        
+        # 큰 강의는 모델별 투영 행렬로 임베딩 차원을 줄여 인덱스 메모리와 검색 비용 절감
+        if reduction_method not in DimensionProjection.METHODS:
+            raise ValueError(f"지원되지 않는 차원 축소 방식: {reduction_method}")
+        self.reduced_dimension = reduced_dimension
+        self.reduction_method = reduction_method
+        self.reduction_threshold = reduction_threshold or self.REDUCTION_THRESHOLD
+        self._projections: Dict[str, DimensionProjection] = {}
+        
+        # 작은 강의는 여러 강의가 함께 쓰는 버킷 인덱스에 넣어 파일 수와 인덱스별 로드/메모리 부담을 줄이고,
+        # 청크 수가 기준을 넘으면 전용 인덱스로 옮김 (이미 배치된 강의는 설정과 관계없이 버킷에서 찾음)
+        self.shared_buckets = shared_buckets
+        self.bucket_promote_chunks = bucket_promote_chunks or self.BUCKET_PROMOTE_CHUNKS
+        self.bucket_registry = CourseBucketRegistry(self.base_path, self._write_atomic,
+                                                    bucket_max_courses or self.BUCKET_MAX_COURSES)
+        
+        # 같은 텍스트를 다시 임베딩하지 않도록 (모델, 텍스트 해시) 기준 캐시
+        # (모델 차원이 필요하므로 처음 사용할 때 생성)
+        self._embedding_cache = embedding_cache
+        self.use_embedding_cache = use_embedding_cache or embedding_cache is not None
+        self.embedding_cache_dtype = embedding_cache_dtype
+        
+        # 대량 문서 추가 시 배치 단위로 인코딩하는 작업자 (스레드는 프로세스 전역 풀을 공유하므로 매니저마다 늘지 않음)
+        self.embedding_executor = EmbeddingExecutor(self.embed_texts, embed_batch_size, embed_prefetch,
+                                                    embed_workers)
+        
+        # 반복되는 질문의 쿼리 임베딩 캐시 (프로세스 내 모든 매니저가 공유)
+        self.query_cache = query_cache or get_query_embedding_cache()
+        
+        logger.info(f"FAISS Manager 초기화 완료 - 모델: {embedding_model}, 백엔드: {embedding_backend}")
+    
+    @property
+    def embedding_model(self):
+        """임베딩 모델 (레지스트리에서 로드)"""
+        return self.model_registry.get(self.embedding_model_name, self.embedding_backend)
+    
+    @property
+    def dimension(self) -> int:
+        """임베딩 차원"""
+        return self.model_registry.get_dimension(self.embedding_model_name, self.embedding_backend)
+    
+    @property
+    def embedding_cache(self) -> Optional[EmbeddingCache]:
+        """청크 임베딩 캐시 (사용하지 않으면 None)"""
+        if self._embedding_cache is None and self.use_embedding_cache:
+            self._embedding_cache = EmbeddingCache(self.base_path / "embedding_cache", self.embedding_model_key,
+                                                   self.dimension, self.embedding_cache_dtype)
+        return self._embedding_cache
     
     def create_course_index(self, course_id: str, force_recreate: bool = False) -> str:
         """
@@ -44,58 +244,178 @@ class FAISSVectorManager:
         index_path = self.base_path / f"course_{course_id}.faiss"
         metadata_path = self.base_path / f"course_{course_id}_metadata.pkl"
         
-        if index_path.exists() and not force_recreate:
-            logger.info(f"기존 인덱스 로드: {index_path}")
-            return str(index_path)
-        
-        # 새로운 FAISS 인덱스 생성
-        index = faiss.IndexFlatIP(self.dimension)  # 내적 기반 유사도 검색
-        
-        # 인덱스 저장
-        faiss.write_index(index, str(index_path))
-        
-        # 메타데이터 초기화
-        metadata = {
-            'course_id': course_id,
-            'embedding_model': self.embedding_model_name,
-            'dimension': self.dimension,
-            'document_count': 0,
-            'chunk_count': 0,
-            'chunk_metadata': []
-        }
-        
-        with open(metadata_path, 'wb') as f:
-            pickle.dump(metadata, f)
+        with get_course_lock(course_id):
+            if index_path.exists() and not force_recreate:
+                logger.info(f"기존 인덱스 로드: {index_path}")
+                return str(index_path)
+            
+            # 새로운 FAISS 인덱스 생성 (청크 ID로 벡터를 찾고 지울 수 있도록 ID 매핑)
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dimension))  # 내적 기반 유사도 검색
+            
+            # 인덱스 저장
+            self.index_cache.invalidate(course_id)
+            self._chunk_store(course_id).delete()
+            self._delete_vector_logs(course_id)
+            self._write_atomic(index_path, lambda path: faiss.write_index(index, str(path)))
+            
+            # 메타데이터 초기화
+            metadata = {
+                'course_id': course_id,
+                'embedding_model': self.embedding_model_name,
+                'embedding_backend': self.embedding_backend,
+                'dimension': self.dimension,
+                'document_count': 0,
+                'chunk_count': 0,
+                'index_type': 'flat',
+                'index_params': {},
+                'chunk_ids': True,
+                'next_chunk_id': 0,
+                'checkpoint_ntotal': 0,
+                'log_generation': 0,
+                'log_offset': 0,
+                'log_committed_end': 0,
+                'delta_count': 0,
+                'tombstone_count': 0,
+                'dedup_skipped': 0,
+                # 청크 ID가 0부터 다시 시작하는 새 인덱스마다 바뀌는 세대 (document_chunks 키에 포함)
+                'index_generation': uuid.uuid4().hex
+            }
+            
+            self._write_atomic(metadata_path, lambda path: self._dump_pickle(metadata, path))
         
         logger.info(f"새로운 인덱스 생성 완료: {index_path}")
         return str(index_path)
     
     def load_course_index(self, course_id: str) -> Tuple[faiss.Index, Dict]:
         """
-        강의 인덱스 로드
+        강의 인덱스를 수정용으로 로드 (기본 세그먼트에 로그의 추가/삭제를 모두 반영한 단일 인덱스)
         Args:
             course_id: 강의 ID
         Returns:
             FAISS 인덱스와 메타데이터
         """
+        index, metadata, _ = self._read_checkpoint(course_id, mmap=False)
+        
+        # 체크포인트 이후의 로그 재생
+        if self._vector_log(course_id, metadata).end() > metadata.get('log_offset', 0):
+            self._replay_vector_log(course_id, index, metadata)
+        
+        self._apply_search_params(index, metadata)
+        return index, metadata
+    
+    def load_course_segments(self, course_id: str) -> Tuple[SegmentedIndex, Dict]:
+        """
+        검색용 강의 인덱스 로드 (기본 세그먼트 + 델타 세그먼트, 캐시 사용)
+        Args:
+            course_id: 강의 ID
+        Returns:
+            세그먼트 인덱스와 메타데이터
+        """
+        index_path = self.base_path / f"course_{course_id}.faiss"
+        metadata_path = self.base_path / f"course_{course_id}_metadata.pkl"
+        
+        signature = self.index_cache.file_signature(index_path, metadata_path)
+        
+        # 메타데이터만 바뀌었으면 (문서 추가/삭제) 이전 기본 세그먼트와 델타를 이어서 사용
+        previous = self.index_cache.peek(course_id)
+        previous = previous[0] if previous is not None else None
+        
+        # 캐시 조회 (파일이 바뀌지 않았으면 디스크를 읽지 않음)
+        if signature is not None:
+            cached = self.index_cache.get(course_id, signature)
+            if cached is not None:
+                return cached
+        
+        base, metadata, matched = self._read_checkpoint(course_id, self.mmap_indexes, previous)
+        self._apply_search_params(base, metadata)
+        
+        generation = metadata.get('log_generation', 0)
+        offset = metadata.get('log_offset', 0)
+        if (previous is not None and previous.base is base and previous.log_generation == generation
+                and previous.log_end >= offset):
+            segments = previous.clone()
+            offset = previous.log_end
+        else:
+            segments = SegmentedIndex(base, metadata['dimension'], self.index_cache.file_signature(index_path))
+            segments.log_generation = generation
+        
+        # 체크포인트 이후의 로그를 델타 세그먼트로 재생
+        # (체크포인트 저장 도중 중단되어 로그와 겹치면 기본 세그먼트에 있는 ID는 건너뜀)
+        log = self._vector_log(course_id, metadata)
+        if log.end() > offset:
+            segments.replay(log, offset, None if matched else self._index_ids(base))
+        else:
+            segments.log_end = offset
+        
+        if not matched:
+            logger.warning(f"체크포인트와 메타데이터가 맞지 않아 세그먼트 병합을 예약합니다: {course_id}")
+            get_compaction_scheduler().schedule(course_id, self.compact_course_index)
+        
+        # 읽는 도중 파일이 바뀌었으면 캐시하지 않음 (다음 검색에서 다시 로드)
+        if signature is not None and self.index_cache.file_signature(index_path, metadata_path) == signature:
+            size_bytes = self._estimate_index_bytes(index_path, metadata_path, self.mmap_indexes)
+            self.index_cache.put(course_id, signature, segments, metadata, size_bytes + segments.memory_bytes())
+        
+        return segments, metadata
+    
+    def _read_checkpoint(self, course_id: str, mmap: bool,
+                         previous: SegmentedIndex = None) -> Tuple[faiss.Index, Dict, bool]:
+        """
+        체크포인트(기본 세그먼트)와 메타데이터 읽기
+        Args:
+            course_id: 강의 ID
+            mmap: 읽기 전용 메모리 맵 사용 여부
+            previous: 이전에 로드한 세그먼트 인덱스 (기본 세그먼트 파일이 그대로면 재사용)
+        Returns:
+            FAISS 인덱스, 메타데이터, 체크포인트와 메타데이터 일치 여부
+        """
+        index_path = self.base_path / f"course_{course_id}.faiss"
+        
+        # 인덱스와 메타데이터는 각각 원자적으로 교체되므로, 그 사이에 읽으면 다시 읽음
+        for attempt in range(self.LOAD_RETRIES):
+            metadata = self._load_metadata(course_id)
+            
+            base_signature = self.index_cache.file_signature(index_path)
+            if previous is not None and base_signature is not None and previous.base_signature == base_signature:
+                index = previous.base
+            else:
+                index = self._read_index(index_path, mmap)
+            
+            checkpoint_ntotal = metadata.get('checkpoint_ntotal', metadata.get('chunk_count', index.ntotal))
+            if checkpoint_ntotal == index.ntotal:
+                return index, metadata, True
+            time.sleep(0.01 * (attempt + 1))
+        
+        # 실제로 읽은 체크포인트 기준으로 기록 (체크포인트 도중 중단된 경우 바로잡음)
+        metadata['checkpoint_ntotal'] = index.ntotal
+        return index, metadata, False
+    
+    def _load_metadata(self, course_id: str) -> Dict:
+        """
+        강의 메타데이터만 로드 (인덱스 파일은 읽지 않음)
+        Args:
+            course_id: 강의 ID
+        Returns:
+            메타데이터
+        """
         index_path = self.base_path / f"course_{course_id}.faiss"
         metadata_path = self.base_path / f"course_{course_id}_metadata.pkl"
         
         if not index_path.exists():
             raise FileNotFoundError(f"인덱스 파일이 없습니다: {index_path}")
         
-        # 인덱스 로드
-        index = faiss.read_index(str(index_path))
-        
-        # 메타데이터 로드
         with open(metadata_path, 'rb') as f:
             metadata = pickle.load(f)
         
-        return index, metadata
+        # 청크 메타데이터가 pickle 안에 리스트로 들어 있는 예전 형식은 컬럼 저장소로 변환
+        if 'chunk_metadata' in metadata:
+            self._migrate_legacy_metadata(course_id, metadata_path, metadata)
+        
+        return metadata
     
     def save_course_index(self, course_id: str, index: faiss.Index, metadata: Dict):
         """
-        강의 인덱스 저장
+        강의 인덱스 저장 (체크포인트: 인덱스 파일 전체를 쓰고 벡터 로그를 새로 시작)
         Args:
             course_id: 강의 ID
             index: FAISS 인덱스
@@ -104,44 +424,443 @@ class FAISSVectorManager:
         index_path = self.base_path / f"course_{course_id}.faiss"
         metadata_path = self.base_path / f"course_{course_id}_metadata.pkl"
         
-        faiss.write_index(index, str(index_path))
-        
-        with open(metadata_path, 'wb') as f:
-            pickle.dump(metadata, f)
+        with get_course_lock(course_id):
+            # 저장할 때마다 버전 증가 (캐시 일관성 확인용)
+            metadata['version'] = metadata.get('version', 0) + 1
+            
+            # 체크포인트에 포함된 로그는 메타데이터를 교체한 뒤 삭제
+            # (그 사이에 중단되면 이전 로그를 다시 재생하지만, 재생은 이미 있는 ID를 건너뜀)
+            old_log = self._vector_log(course_id, metadata)
+            if old_log.exists():
+                metadata['log_generation'] = metadata.get('log_generation', 0) + 1
+            metadata['log_offset'] = 0
+            metadata['log_committed_end'] = 0
+            metadata['checkpoint_ntotal'] = index.ntotal
+            metadata['delta_count'] = 0
+            metadata['tombstone_count'] = 0
+            
+            # 임시 파일에 쓴 뒤 rename으로 교체 (읽는 쪽은 항상 완성된 파일만 봄)
+            self._write_atomic(index_path, lambda path: self._write_index(index, path))
+            self._write_atomic(metadata_path, lambda path: self._dump_pickle(metadata, path))
+            old_log.delete()
+            
+            # PQ <-> 이진 전환 후에는 이전 자료형의 원본 벡터 파일이 필요 없음
+            if self._is_compressed(metadata):
+                raw_dtype = self._raw_vectors_dtype(metadata['index_type'])
+                for dtype in (np.float32, np.float16):
+                    stale_path = self._raw_vectors_path(course_id, dtype)
+                    if np.dtype(dtype) != raw_dtype and stale_path.exists():
+                        os.remove(stale_path)
+            
+            self._refresh_cache(course_id, index, metadata)
         
         logger.info(f"인덱스 저장 완료: {index_path}")
     
-    def add_documents_to_index(self, course_id: str, documents: List[Dict]) -> int:
+    def _commit_metadata(self, course_id: str, metadata: Dict):
         """
-        문서들을 인덱스에 추가
+        로그에 기록한 변경 확정 (메타데이터만 저장, 강의 락을 잡은 상태에서 호출)
+        Args:
+            course_id: 강의 ID
+            metadata: 메타데이터
+        """
+        metadata_path = self.base_path / f"course_{course_id}_metadata.pkl"
+        metadata['version'] = metadata.get('version', 0) + 1
+        self._write_atomic(metadata_path, lambda path: self._dump_pickle(metadata, path))
+    
+    def _refresh_cache(self, course_id: str, index: faiss.Index, metadata: Dict):
+        """방금 저장한 체크포인트로 캐시 갱신 (메모리 맵 모드는 다음 검색 때 새 파일을 매핑)"""
+        index_path = self.base_path / f"course_{course_id}.faiss"
+        metadata_path = self.base_path / f"course_{course_id}_metadata.pkl"
+        
+        signature = self.index_cache.file_signature(index_path, metadata_path)
+        if signature is not None and not self.mmap_indexes:
+            self._apply_search_params(index, metadata)
+            segments = SegmentedIndex(index, metadata['dimension'], self.index_cache.file_signature(index_path))
+            segments.log_generation = metadata.get('log_generation', 0)
+            self.index_cache.put(course_id, signature, segments, metadata,
+                                 self._estimate_index_bytes(index_path, metadata_path))
+        else:
+            self.index_cache.invalidate(course_id)
+    
+    def _vector_log(self, course_id: str, metadata: Dict) -> VectorLog:
+        """
+        현재 체크포인트 이후의 벡터 로그 (델타 세그먼트와 삭제 표시의 원본)
+        메타데이터에 확정된 끝 위치까지만 재생하므로, 레코드를 쓴 뒤 메타데이터 저장 전에 중단되어
+        next_chunk_id에 반영되지 않은 레코드는 무시되고 다음 기록 때 잘림
+        """
+        generation = metadata.get('log_generation', 0)
+        return VectorLog(self.base_path / f"course_{course_id}_vectors.{generation}.log", metadata['dimension'],
+                         metadata.get('log_committed_end'))
+    
+    def index_generation(self, course_id: str) -> Optional[str]:
+        """
+        강의 청크 ID의 세대 (인덱스를 지우고 다시 만들거나 공유 버킷에 다시 배치해서 청크 ID가 0부터
+        다시 시작하면 바뀜, 전용 인덱스로 옮길 때는 청크 ID와 함께 유지)
         Args:
             course_id: 강의 ID
-            documents: 문서 리스트 [{'id': str, 'text': str, 'metadata': dict}]
         Returns:
-            추가된 청크 수
+            세대 문자열 (인덱스가 없거나 세대를 기록하기 전에 만든 인덱스면 None)
+        """
+        storage_key, label = self._course_location(course_id)
+        if label is not None:
+            return self.bucket_registry.generation(course_id)
+        try:
+            return self._load_metadata(storage_key).get('index_generation')
+        except FileNotFoundError:
+            return None
+    
+    def _delete_vector_logs(self, course_id: str):
+        """강의의 모든 세대 벡터 로그 삭제"""
+        for path in self.base_path.glob(f"course_{course_id}_vectors.*.log"):
+            os.remove(path)
+    
+    def _course_location(self, course_id: str, create: bool = False) -> Tuple[str, Optional[int]]:
+        """
+        강의 인덱스 위치 조회
+        전용 인덱스가 있으면 그대로 사용하고, 없으면 공유 버킷 배치 기록을 찾음
+        (전용 인덱스는 메타데이터 파일을 마지막에 쓰므로 메타데이터 파일이 있으면 사용할 수 있는 상태)
+        Args:
+            course_id: 강의 ID
+            create: 인덱스가 없는 새 강의를 공유 버킷에 배치할지 여부
+        Returns:
+            (저장 키, 라벨) - 전용 인덱스는 (강의 ID, None), 공유 버킷은 (버킷 키, 강의 라벨)
+        """
+        if (self.base_path / f"course_{course_id}_metadata.pkl").exists():
+            return course_id, None
+        
+        placement = self.bucket_registry.get(course_id)
+        if placement is not None:
+            return placement
+        
+        if create and self.shared_buckets:
+            return self.bucket_registry.assign(course_id)
+        return course_id, None
+    
+    def _prepare_write(self, course_id: str, create: bool = True) -> Dict:
+        """
+        문서 추가/삭제 전 메타데이터 준비 (강의 락을 잡은 상태에서 호출)
+        Args:
+            course_id: 강의 ID
+            create: 인덱스가 없으면 생성할지 여부
+        Returns:
+            메타데이터
         """
         try:
-            # 인덱스 로드 (없으면 생성)
+            metadata = self._load_metadata(course_id)
+        except FileNotFoundError:
+            if not create:
+                raise
+            self.create_course_index(course_id)
+            metadata = self._load_metadata(course_id)
+        
+        # 청크 ID나 체크포인트 정보가 없는 예전 인덱스는 세그먼트로 나누기 전에 한 번 전체 변환
+        if not metadata.get('chunk_ids') or 'checkpoint_ntotal' not in metadata:
+            index, metadata = self.load_course_index(course_id)
+            index = self._ensure_chunk_ids(course_id, index, metadata)
+            self.save_course_index(course_id, index, metadata)
+        
+        return metadata
+    
+    def _needs_compaction(self, metadata: Dict) -> bool:
+        """세그먼트 병합이 필요한지 (델타/삭제 표시가 기준을 넘었거나 인덱스 타입 전환이 필요한 경우)"""
+        base_ntotal = metadata.get('checkpoint_ntotal', 0)
+        delta_count = metadata.get('delta_count', 0)
+        tombstone_count = metadata.get('tombstone_count', 0)
+        
+        if delta_count > max(self.COMPACT_MIN_VECTORS, base_ntotal * self.compact_delta_ratio):
+            return True
+        if tombstone_count > max(self.COMPACT_MIN_VECTORS, base_ntotal * self.compact_tombstone_ratio):
+            return True
+        
+        # 청크 수가 인덱스 타입 전환 기준을 넘으면 바로 병합하면서 전환
+        if delta_count or tombstone_count:
+            compression = self.compression or metadata.get('compression')
+            target_type = self._select_index_type(metadata.get('chunk_count', base_ntotal), compression)
+            if self._should_reduce(metadata, metadata.get('chunk_count', base_ntotal)):
+                return True
+            return target_type != metadata.get('index_type', 'flat')
+        return False
+    
+    def _schedule_compaction(self, course_id: str, metadata: Dict):
+        """기준을 넘었으면 세그먼트 병합 실행 (기본은 백그라운드 작업자에 예약)"""
+        if not self._needs_compaction(metadata):
+            return
+        
+        if self.background_compaction:
+            if get_compaction_scheduler().schedule(course_id, self.compact_course_index):
+                logger.info(f"세그먼트 병합 예약: {course_id}")
+        else:
+            self.compact_course_index(course_id)
+    
+    def compact_course_index(self, course_id: str) -> bool:
+        """
+        세그먼트 병합: 델타 세그먼트와 삭제 표시를 기본 세그먼트에 합쳐 새 체크포인트 저장
+        (병합하는 동안 같은 강의의 추가/삭제는 대기, 검색은 이전 세그먼트로 계속 진행)
+        Args:
+            course_id: 강의 ID
+        Returns:
+            병합 여부 (합칠 변경이 없으면 False)
+        """
+        with get_course_lock(course_id):
             try:
-                index, metadata = self.load_course_index(course_id)
+                metadata = self._load_metadata(course_id)
             except FileNotFoundError:
-                self.create_course_index(course_id)
-                index, metadata = self.load_course_index(course_id)
+                return False
+            
+            if self._vector_log(course_id, metadata).end() <= metadata.get('log_offset', 0):
+                return False
+            
+            start_time = time.time()
+            index, metadata = self.load_course_index(course_id)
+            
+            # HNSW 그래프는 벡터 삭제를 지원하지 않으므로 삭제가 있었으면 남은 벡터로 다시 구성
+            if metadata.get('index_type') == 'hnsw' and metadata.get('tombstone_count'):
+                vectors, ids = self._reconstruct_vectors(course_id, index, metadata)
+                index, metadata['index_params'] = self._build_index('hnsw', vectors, ids)
+            
+            # 청크 수에 맞는 인덱스 타입으로 전환
+            index = self._maybe_migrate_index(course_id, index, metadata)
+            metadata['chunk_count'] = index.ntotal
+            
+            self.save_course_index(course_id, index, metadata)
+        
+        logger.info(f"세그먼트 병합 완료: {course_id}, 벡터 수: {index.ntotal}, "
+                    f"소요 시간: {time.time() - start_time:.2f}초")
+        return True
+    
+    def _replay_vector_log(self, course_id: str, index: faiss.Index, metadata: Dict) -> int:
+        """
+        체크포인트 이후의 로그 레코드를 인덱스에 순서대로 적용
+        Args:
+            course_id: 강의 ID
+            index: 체크포인트에서 읽은 FAISS 인덱스
+            metadata: 메타데이터 (next_chunk_id, chunk_count 갱신)
+        Returns:
+            재생한 레코드 수
+        """
+        present_ids = None
+        replayed = 0
+        # HNSW는 삭제를 지원하지 않으므로 병합할 때 남은 벡터로 다시 구성
+        supports_remove = metadata.get('index_type') != 'hnsw'
+        
+        for op, ids, vectors, _ in self._vector_log(course_id, metadata).records(metadata.get('log_offset', 0)):
+            if op == VectorLog.OP_ADD:
+                # 체크포인트에 이미 들어 있는 ID는 건너뜀 (ID는 재사용하지 않음)
+                if present_ids is None:
+                    present_ids = self._index_ids(index)
+                new = ~np.isin(ids, present_ids)
+                if new.any():
+                    index.add_with_ids(np.ascontiguousarray(vectors[new]), np.ascontiguousarray(ids[new]))
+                metadata['next_chunk_id'] = max(metadata.get('next_chunk_id', 0), int(ids.max()) + 1)
+            elif supports_remove:
+                index.remove_ids(np.ascontiguousarray(ids))
+            replayed += 1
+        
+        logger.info(f"벡터 로그 재생: {course_id}, 레코드 수: {replayed}, 벡터 수: {index.ntotal}")
+        return replayed
+    
+    def _index_ids(self, index: faiss.Index) -> np.ndarray:
+        """인덱스에 들어 있는 청크 ID 목록"""
+        if hasattr(index, 'id_map'):
+            return faiss.vector_to_array(index.id_map)
+        
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is None:
+            return np.arange(index.ntotal, dtype=np.int64)
+        
+        invlists = ivf.invlists
+        ids = [np.zeros(0, dtype=np.int64)]
+        for list_no in range(ivf.nlist):
+            list_size = invlists.list_size(list_no)
+            if list_size:
+                ids.append(faiss.rev_swig_ptr(invlists.get_ids(list_no), list_size).copy())
+        return np.concatenate(ids)
+    
+    def _chunk_deduplicator(self, course_id: str) -> MinHashDeduplicator:
+        """강의 근사 중복 청크 검출기 (시그니처는 청크 저장소 디렉토리에 저장)"""
+        return MinHashDeduplicator(self.base_path / f"course_{course_id}_chunks", self.dedup_threshold)
+    
+    def _append_aliases(self, metadata: Dict, chunk_store: ChunkMetadataStore, label: Optional[int],
+                        rows: List[Dict], vector_ids: np.ndarray, chunks: List[Dict]):
+        """
+        근사 중복 청크를 기존 벡터를 가리키는 별칭 행으로 추가 (강의 락을 잡은 상태에서 호출, 메타데이터 저장은 호출하는 쪽에서)
+        Args:
+            metadata: 메타데이터 (next_chunk_id와 중복 제외 청크 수 갱신)
+            chunk_store: 청크 메타데이터 저장소
+            label: 공유 버킷의 강의 라벨
+            rows: 청크 메타데이터 행 리스트
+            vector_ids: 행별로 함께 쓰는 벡터의 청크 ID
+            chunks: 행별 청크 레코드 ('vector_id'에 강의 안에서의 청크 ID 기록)
+        """
+        start_id = metadata['next_chunk_id']
+        local_start = start_id if label is None else chunk_store.next_local_id(label, start_id)
+        rows = [dict(row, alias=int(vector_id)) for row, vector_id in zip(rows, vector_ids)]
+        if label is not None:
+            rows = [dict(row, label=label, local_id=local_start + i) for i, row in enumerate(rows)]
+        chunk_store.append(rows, start_id)
+        
+        for i, chunk in enumerate(chunks):
+            chunk['vector_id'] = local_start + i
+        metadata['next_chunk_id'] = start_id + len(rows)
+        self._count_dedup(metadata, len(rows), label)
+    
+    def _count_dedup(self, metadata: Dict, skipped: int, label: int = None):
+        """
+        메타데이터의 중복 제외 청크 수 갱신
+        Args:
+            metadata: 메타데이터
+            skipped: 제외한 청크 수
+            label: 공유 버킷의 강의 라벨 (버킷은 전체 합계와 함께 강의 라벨별로도 누적)
+        """
+        metadata['dedup_skipped'] = metadata.get('dedup_skipped', 0) + skipped
+        if label is not None and skipped:
+            by_label = metadata.setdefault('dedup_skipped_labels', {})
+            by_label[label] = by_label.get(label, 0) + skipped
+    
+    def _vector_bytes(self) -> int:
+        """청크 하나가 인덱스에서 차지하는 대략적인 바이트 수 (float32 벡터 + 64비트 ID)"""
+        return self.dimension * 4 + 8
+    
+    def _chunk_store(self, course_id: str) -> ChunkMetadataStore:
+        """강의 청크 메타데이터 저장소"""
+        return ChunkMetadataStore(self.base_path / f"course_{course_id}_chunks", self.chunk_text_compression)
+    
+    def _migrate_legacy_metadata(self, course_id: str, metadata_path: Path, metadata: Dict):
+        """
+        pickle 안의 chunk_metadata 리스트를 컬럼 저장소로 옮기고 메타데이터 파일 재저장
+        Args:
+            course_id: 강의 ID
+            metadata_path: 메타데이터 파일 경로
+            metadata: 로드한 메타데이터 (chunk_metadata 키를 제거함)
+        """
+        chunk_metadata = metadata.pop('chunk_metadata')
+        if chunk_metadata:
+            self._chunk_store(course_id).append(chunk_metadata, 0)
+        self._write_atomic(metadata_path, lambda path: self._dump_pickle(metadata, path))
+        logger.info(f"청크 메타데이터 형식 변환 완료: {course_id}, 청크 수: {len(chunk_metadata)}")
+    
+    def _estimate_index_bytes(self, index_path: Path, metadata_path: Path, mmap: bool = False) -> int:
+        """
+        로드된 인덱스의 메모리 사용량 추정 (파일 크기 기준)
+        Args:
+            index_path: 인덱스 파일 경로
+            metadata_path: 메타데이터 파일 경로
+            mmap: 메모리 맵 로드 여부 (공유 페이지 캐시는 제외)
+        Returns:
+            추정 바이트 수
+        """
+        paths = (metadata_path,) if mmap else (index_path, metadata_path)
+        size = 0
+        for path in paths:
+            if path.exists():
+                size += path.stat().st_size
+        return size
+    
+    def _read_index(self, index_path: Path, mmap: bool) -> faiss.Index:
+        """
+        FAISS 인덱스 파일 읽기
+        Args:
+            index_path: 인덱스 파일 경로
+            mmap: 읽기 전용 메모리 맵 사용 여부
+        Returns:
+            FAISS 인덱스 (이진 인덱스 파일이면 BinaryQuantizedIndex)
+        """
+        # 인덱스 타입 전환 중에도 맞게 읽도록 메타데이터 대신 파일 헤더로 판단 (이진 인덱스는 'IB'로 시작)
+        with open(index_path, 'rb') as f:
+            if f.read(2) == b'IB':
+                return BinaryQuantizedIndex.read(index_path)
+        
+        if not mmap:
+            return faiss.read_index(str(index_path))
+        
+        # IO_FLAG_MMAP_IFC는 IVF 역색인 목록을 읽지 못하므로 쓰지 않음 (Flat, IVF, HNSW 모두 이 플래그로 읽힘)
+        return faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    
+    def _write_index(self, index: faiss.Index, path: Path):
+        """FAISS 인덱스 파일 쓰기 (이진 인덱스 포함)"""
+        if isinstance(index, BinaryQuantizedIndex):
+            index.write(path)
+        else:
+            faiss.write_index(index, str(path))
+    
+    def _write_atomic(self, path: Path, write_fn):
+        """
+        임시 파일에 쓰고 fsync 후 rename으로 교체
+        Args:
+            path: 최종 파일 경로
+            write_fn: 임시 파일 경로를 받아 내용을 쓰는 함수
+        """
+        tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}")
+        try:
+            write_fn(tmp_path)
+            with open(tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                os.remove(tmp_path)
+        
+        # rename 자체가 디스크에 반영되도록 디렉토리도 fsync
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    
+    @staticmethod
+    def _dump_pickle(obj, path: Path):
+        """pickle 파일 저장"""
+        with open(path, 'wb') as f:
+            pickle.dump(obj, f)
+    
+    def add_documents_to_index(self, course_id: str, documents: List[Dict],
+                               progress_callback: Callable[[int, int], None] = None) -> int:
+        """
+        문서들을 인덱스에 추가
+        Args:
+            course_id: 강의 ID
+            documents: 문서 리스트 [{'id': str, 'text': str, 'metadata': dict, 'chunks': 청크 레코드 리스트 (선택)}]
+            progress_callback: 배치마다 (임베딩 완료 청크 수, 전체 청크 수)로 호출되는 함수
+        Returns:
+            임베딩해서 추가한 청크 수 (청크 레코드마다 강의 안에서의 청크 ID를 'vector_id'로,
+            청크 ID 세대를 'index_generation'으로 기록, 근사 중복 청크는 같은 내용의 기존 벡터를 가리키는 별칭 청크로 추가)
+        """
+        try:
+            # 작은 강의는 공유 버킷 인덱스에 라벨을 붙여 추가 (label이 None이면 전용 인덱스)
+            storage_key, label = self._course_location(course_id, create=True)
+            
+            # 인덱스 파일은 읽지 않고 메타데이터만 준비 (없으면 생성)
+            with get_course_lock(storage_key):
+                metadata = self._prepare_write(storage_key)
+            generation = self.bucket_registry.generation(course_id) if label is not None else \
+                metadata.get('index_generation')
+            
+            # 기존 인덱스는 torch 백엔드로 만들어진 것으로 간주
+            index_backend = metadata.get('embedding_backend', 'torch')
+            if index_backend != self.embedding_backend:
+                logger.warning(f"인덱스와 다른 임베딩 백엔드로 추가합니다: {course_id} "
+                               f"({index_backend} -> {self.embedding_backend})")
             
             # 문서 청크 생성 및 임베딩
             all_chunks = []
-            chunk_metadata = metadata.get('chunk_metadata', [])
+            chunk_rows = []
             
             for doc in documents:
-                doc_chunks = self._split_document(doc['text'], doc['id'])
+                # 호출하는 쪽에서 이미 나눈 청크가 있으면 그대로 사용 (DB에 저장하는 청크와 일치)
+                doc_chunks = doc.get('chunks')
+                if doc_chunks is None:
+                    doc_chunks = list(self.chunker.iter_chunks(doc['text'], doc['id']))
                 all_chunks.extend(doc_chunks)
                 
                 # 메타데이터 업데이트
                 for chunk in doc_chunks:
-                    chunk_metadata.append({
+                    chunk['vector_id'] = None
+                    chunk['index_generation'] = generation
+                    chunk_rows.append({
                         'document_id': doc['id'],
                         'chunk_index': chunk['chunk_index'],
                         'text': chunk['text'][:200] + '...' if len(chunk['text']) > 200 else chunk['text'],
+                        'full_text': chunk['text'],
                         'original_metadata': doc.get('metadata', {})
                     })
             
@@ -149,23 +868,111 @@ class FAISSVectorManager:
                 logger.warning(f"추가할 청크가 없습니다: {course_id}")
                 return 0
             
-            # 텍스트 임베딩 생성
-            texts = [chunk['text'] for chunk in all_chunks]
-            embeddings = self.embedding_model.encode(texts, convert_to_tensor=False)
+            chunk_store = self._chunk_store(storage_key)
             
-            # 임베딩 정규화 (내적 검색을 위해)
-            embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+            # 강의 안에서 근사 중복인 청크는 임베딩하지 않고 같은 내용의 벡터를 가리키는 별칭 청크로 추가
+            # (벡터는 그 벡터를 쓰는 청크가 하나라도 남아 있는 동안 유지되므로, 한 문서를 삭제해도
+            #  같은 내용을 가진 다른 문서는 계속 검색됨)
+            signatures = None
+            batch_aliases = []
+            skipped = 0
+            if self.dedup_chunks:
+                deduplicator = self._chunk_deduplicator(storage_key)
+                signatures = deduplicator.signatures([chunk['text'] for chunk in all_chunks])
+                
+                # 기존 벡터 확인과 별칭 추가를 같은 락 안에서 해서 그 사이에 기존 벡터가 지워지지 않게 함
+                with get_course_lock(storage_key):
+                    metadata = self._load_metadata(storage_key)
+                    existing_ids = chunk_store.live_vector_ids(metadata['next_chunk_id'], label)
+                    existing_matches, batch_matches = deduplicator.find_duplicates(signatures, existing_ids)
+                    aliased = np.flatnonzero(existing_matches >= 0)
+                    if len(aliased):
+                        self._append_aliases(metadata, chunk_store, label, [chunk_rows[i] for i in aliased],
+                                             existing_matches[aliased], [all_chunks[i] for i in aliased])
+                        metadata['document_count'] = self._count_documents(chunk_store, metadata)
+                        self._commit_metadata(storage_key, metadata)
+                
+                duplicate = (existing_matches >= 0) | (batch_matches >= 0)
+                skipped = int(duplicate.sum())
+                if skipped:
+                    # 같은 배치 안의 중복은 앞선 청크가 인덱스에 들어간 뒤 별칭으로 추가
+                    unique_positions = np.flatnonzero(~duplicate)
+                    batch_aliases = [(chunk_rows[i], all_chunks[i],
+                                      int(np.searchsorted(unique_positions, batch_matches[i])))
+                                     for i in np.flatnonzero(batch_matches >= 0)]
+                    all_chunks = [chunk for chunk, dup in zip(all_chunks, duplicate) if not dup]
+                    chunk_rows = [row for row, dup in zip(chunk_rows, duplicate) if not dup]
+                    signatures = signatures[~duplicate]
+                    logger.info(f"근사 중복 청크 제외: {course_id}, {skipped}개 "
+                                f"(임베딩 {skipped}회, 인덱스 약 {skipped * self._vector_bytes() / (1024 * 1024):.2f} MB 절약)")
+            
+            if not all_chunks:
+                logger.warning(f"추가할 청크가 모두 중복입니다: {course_id}")
+                return 0
+            
+            # 텍스트 임베딩은 배치 단위로 생성하고, 끝난 배치부터 델타 세그먼트(로그)에 추가
+            texts = [chunk['text'] for chunk in all_chunks]
+            added_ids = np.zeros(len(all_chunks), dtype=np.int64)
             
-            # 인덱스에 벡터 추가
-            index.add(embeddings.astype(np.float32))
+            for batch_start, embeddings in self.embedding_executor.map(texts):
+                with get_course_lock(storage_key):
+                    # 배치마다 최신 메타데이터에 이어서 기록 (그 사이에 세그먼트 병합이 끝났을 수 있음)
+                    metadata = self._load_metadata(storage_key)
+                    
+                    # 차원 축소된 강의는 인덱스 차원으로 투영 (임베딩 캐시는 원래 차원 그대로)
+                    embeddings = self._project(metadata, embeddings)
+                    
+                    # 청크마다 재사용하지 않는 64비트 ID 부여
+                    start_id = metadata['next_chunk_id']
+                    chunk_ids = np.arange(start_id, start_id + len(embeddings), dtype=np.int64)
+                    added_ids[batch_start:batch_start + len(embeddings)] = chunk_ids
+                    batch_rows = chunk_rows[batch_start:batch_start + len(embeddings)]
+                    
+                    # 공유 버킷은 강의 안에서의 청크 ID를 따로 부여 (전용 인덱스로 옮겨도 그대로 유지)
+                    local_start = start_id if label is None else chunk_store.next_local_id(label, start_id)
+                    if label is not None:
+                        batch_rows = [dict(row, label=label, local_id=local_start + i)
+                                      for i, row in enumerate(batch_rows)]
+                    for i, chunk in enumerate(all_chunks[batch_start:batch_start + len(embeddings)]):
+                        chunk['vector_id'] = local_start + i
+                    
+                    # 청크 메타데이터는 청크 ID 순서대로 컬럼 저장소에 추가 (로그 기록 전에 기록)
+                    if signatures is not None:
+                        deduplicator.append(signatures[batch_start:batch_start + len(embeddings)], start_id)
+                    chunk_store.append(batch_rows, start_id)
+                    
+                    # 압축 인덱스는 재정렬용 원본 벡터를 별도 파일에 보관
+                    if self._is_compressed(metadata):
+                        self._append_raw_vectors(storage_key, embeddings, start_id,
+                                                 self._raw_vectors_dtype(metadata.get('index_type')))
+                    
+                    # 기본 세그먼트는 건드리지 않고 로그에만 fsync해서 기록
+                    metadata['log_committed_end'] = self._vector_log(storage_key, metadata).append_add(chunk_ids,
+                                                                                                       embeddings)
+                    metadata['next_chunk_id'] = start_id + len(embeddings)
+                    metadata['chunk_count'] = metadata.get('chunk_count', 0) + len(embeddings)
+                    metadata['delta_count'] = metadata.get('delta_count', 0) + len(embeddings)
+                    self._commit_metadata(storage_key, metadata)
+                
+                if progress_callback:
+                    progress_callback(batch_start + len(embeddings), len(texts))
             
             # 메타데이터 업데이트
-            metadata['document_count'] = len(set(doc['id'] for doc in documents))
-            metadata['chunk_count'] = index.ntotal
-            metadata['chunk_metadata'] = chunk_metadata
+            with get_course_lock(storage_key):
+                metadata = self._load_metadata(storage_key)
+                if batch_aliases:
+                    rows, chunks, positions = zip(*batch_aliases)
+                    self._append_aliases(metadata, chunk_store, label, list(rows), added_ids[list(positions)],
+                                         list(chunks))
+                metadata['document_count'] = self._count_documents(chunk_store, metadata)
+                self._commit_metadata(storage_key, metadata)
             
-            # 인덱스 저장
-            self.save_course_index(course_id, index, metadata)
+            # 델타 세그먼트가 커졌으면 기본 세그먼트로 병합
+            self._schedule_compaction(storage_key, metadata)
+            
+            # 공유 버킷에서 커진 강의는 전용 인덱스로 옮김
+            if label is not None:
+                self._maybe_promote_course(course_id, storage_key, label)
             
             logger.info(f"문서 추가 완료: {course_id}, 청크 수: {len(all_chunks)}")
             return len(all_chunks)
@@ -175,7 +982,7 @@ class FAISSVectorManager:
             raise
     
     def search_course_documents(self, course_id: str, query: str, top_k: int = 5, 
-                               min_similarity: float = 0.5) -> List[Dict]:
+                               min_similarity: float = 0.5, filters: Dict = None) -> List[Dict]:
         """
         강의 문서에서 유사도 검색
         Args:
@@ -183,114 +990,916 @@ class FAISSVectorManager:
             query: 검색 쿼리
             top_k: 반환할 결과 수
             min_similarity: 최소 유사도 점수
+            filters: 문서 메타데이터 필터 (file_type, uploader, uploaded_after, uploaded_before)
         Returns:
             검색 결과 리스트
         """
+        results = self.search_course_documents_batch(course_id, [query], top_k, min_similarity, filters)[0]
+        logger.info(f"검색 완료: {course_id}, 쿼리: {query}, 결과 수: {len(results)}")
+        return results
+    
+    def search_course_documents_batch(self, course_id: str, queries: List[str], top_k: int = 5,
+                                      min_similarity: float = 0.5, filters: Dict = None) -> List[List[Dict]]:
+        """
+        여러 쿼리를 한 번에 검색 (임베딩 1회, FAISS 검색 1회)
+        Args:
+            course_id: 강의 ID
+            queries: 검색 쿼리 리스트
+            top_k: 쿼리별 반환할 결과 수
+            min_similarity: 최소 유사도 점수
+            filters: 문서 메타데이터 필터 (file_type, uploader, uploaded_after, uploaded_before)
+        Returns:
+            쿼리 순서대로의 검색 결과 리스트
+        """
+        if not queries:
+            return []
+        
         try:
-            # 인덱스 로드
-            index, metadata = self.load_course_index(course_id)
+            # 인덱스가 없거나 비어 있으면 임베딩도 생략
+            index, _ = self.load_course_segments(self._course_location(course_id)[0])
+            if index.ntotal == 0:
+                logger.warning(f"빈 인덱스: {course_id}")
+                return [[] for _ in queries]
+        except FileNotFoundError:
+            logger.warning(f"인덱스가 없습니다: {course_id}")
+            return [[] for _ in queries]
+        
+        query_embeddings = self.encode_queries(queries)
+        return self.search_course_embeddings(course_id, query_embeddings, top_k, min_similarity, filters)
+    
+    def search_course_embeddings(self, course_id: str, query_embeddings: np.ndarray, top_k: int = 5,
+                                 min_similarity: float = 0.5, filters: Dict = None) -> List[List[Dict]]:
+        """
+        정규화된 쿼리 임베딩 행렬로 강의 인덱스 검색
+        Args:
+            course_id: 강의 ID
+            query_embeddings: (쿼리 수, dimension) 정규화된 임베딩
+            top_k: 쿼리별 반환할 결과 수
+            min_similarity: 최소 유사도 점수
+            filters: 문서 메타데이터 필터 (file_type, uploader, uploaded_after, uploaded_before)
+        Returns:
+            쿼리 순서대로의 검색 결과 리스트
+        """
+        filters = normalize_filters(filters)
+        
+        try:
+            # 세그먼트 인덱스 로드 (기본 세그먼트와 델타 세그먼트를 함께 검색해서 병합)
+            storage_key, label = self._course_location(course_id)
+            index, metadata = self.load_course_segments(storage_key)
             
             if index.ntotal == 0:
                 logger.warning(f"빈 인덱스: {course_id}")
-                return []
+                return [[] for _ in range(len(query_embeddings))]
             
-            # 쿼리 임베딩 생성
-            query_embedding = self.embedding_model.encode([query], convert_to_tensor=False)
-            query_embedding = query_embedding / np.linalg.norm(query_embedding, axis=1, keepdims=True)
+            # 차원 축소된 강의는 쿼리도 같은 투영으로 변환
+            query_embeddings = self._project(metadata, query_embeddings)
             
-            # 유사도 검색
-            similarities, indices = index.search(query_embedding.astype(np.float32), top_k)
+            # 유사도 검색 (압축 인덱스는 후보를 넉넉히 뽑아 원본 벡터로 재정렬)
+            # 공유 버킷은 강의 라벨의 청크만 검색
+            if filters or label is not None:
+                similarities, indices = self._search_filtered(storage_key, index, metadata,
+                                                              query_embeddings, top_k, filters, label)
+            elif self._is_compressed(metadata):
+                _, candidates = index.search(query_embeddings, top_k * self._rerank_factor(metadata))
+                similarities, indices = self._rerank_exact(storage_key, query_embeddings, candidates, top_k,
+                                                           self._raw_vectors_dtype(metadata.get('index_type')))
+            else:
+                similarities, indices = index.search(query_embeddings, top_k)
             
-            # 결과 구성
-            results = []
-            chunk_metadata = metadata.get('chunk_metadata', [])
+            # 결과 ID의 행만 저장소에서 한 번에 읽음 (전체 텍스트는 오프셋으로 바로 찾아 읽음)
+            # 벡터를 가진 청크가 삭제되었으면 같은 벡터를 쓰는 남은 청크를 결과로 보여줌
+            chunk_store = self._chunk_store(storage_key)
+            limit = metadata.get('next_chunk_id', index.ntotal)
+            indices = chunk_store.resolve(indices, limit)
+            chunk_infos = chunk_store.get_many(indices.ravel(), limit=limit, full_text=True)
             
-            for i, (similarity, idx) in enumerate(zip(similarities[0], indices[0])):
-                if similarity < min_similarity:
-                    continue
-                
-                if idx < len(chunk_metadata):
-                    chunk_info = chunk_metadata[idx]
-                    results.append({
-                        'rank': i + 1,
-                        'similarity': float(similarity),
-                        'document_id': chunk_info['document_id'],
-                        'chunk_index': chunk_info['chunk_index'],
-                        'text': chunk_info['text'],
-                        'metadata': chunk_info.get('original_metadata', {})
-                    })
+            # 공유 버킷 결과는 강의 안에서의 청크 ID로 변환
+            if label is not None:
+                indices = chunk_store.local_ids(indices)
             
-            logger.info(f"검색 완료: {course_id}, 쿼리: {query}, 결과 수: {len(results)}")
-            return results
+            batch_results = []
+            for row, row_similarities in enumerate(similarities):
+                row_infos = chunk_infos[row * indices.shape[1]:(row + 1) * indices.shape[1]]
+                batch_results.append(self._build_search_results(row_similarities, indices[row], row_infos,
+                                                                min_similarity))
+            
+            return batch_results
             
         except FileNotFoundError:
             logger.warning(f"인덱스가 없습니다: {course_id}")
-            return []
+            return [[] for _ in range(len(query_embeddings))]
         except Exception as e:
             logger.error(f"검색 중 오류 발생: {str(e)}")
             raise
     
-    def _split_document(self, text: str, document_id: str, chunk_size: int = 1000, 
-                       chunk_overlap: int = 200) -> List[Dict]:
+    def search_course_documents_range(self, course_id: str, query: str, min_similarity: float = 0.5,
+                                      max_results: int = None, filters: Dict = None) -> List[Dict]:
         """
-        문서를 청크로 분할
+        유사도 기준 검색: min_similarity 이상인 청크를 모두 반환 (최대 max_results개)
+        고정된 top_k 대신 관련 청크 수만큼 결과가 나오고, 기준을 넘는 청크가 없으면 청크 저장소를 읽지 않고 바로 반환
         Args:
-            text: 문서 텍스트
-            document_id: 문서 ID
-            chunk_size: 청크 크기
-            chunk_overlap: 청크 겹침 크기
-        Returns:
-            청크 리스트
+            course_id: 강의 ID
+            query: 검색 쿼리
+            min_similarity: 최소 유사도 점수
+            max_results: 최대 결과 수 (None이면 RANGE_MAX_RESULTS)
+            filters: 문서 메타데이터 필터 (file_type, uploader, uploaded_after, uploaded_before)
+        Returns:
+            검색 결과 리스트 (유사도 내림차순)
         """
-        if not text or not text.strip():
+        try:
+            index, _ = self.load_course_segments(self._course_location(course_id)[0])
+            if index.ntotal == 0:
+                logger.warning(f"빈 인덱스: {course_id}")
+                return []
+        except FileNotFoundError:
+            logger.warning(f"인덱스가 없습니다: {course_id}")
             return []
         
-        chunks = []
-        text = text.strip()
+        results = self.search_course_embeddings_range(course_id, self.encode_queries([query]), min_similarity,
+                                                      max_results, filters)[0]
+        logger.info(f"유사도 기준 검색 완료: {course_id}, 쿼리: {query}, 결과 수: {len(results)}")
+        return results
+    
+    def search_course_embeddings_range(self, course_id: str, query_embeddings: np.ndarray,
+                                       min_similarity: float = 0.5, max_results: int = None,
+                                       filters: Dict = None) -> List[List[Dict]]:
+        """
+        정규화된 쿼리 임베딩 행렬로 유사도 기준 검색
+        Args:
+            course_id: 강의 ID
+            query_embeddings: (쿼리 수, dimension) 정규화된 임베딩
+            min_similarity: 최소 유사도 점수
+            max_results: 쿼리별 최대 결과 수 (None이면 RANGE_MAX_RESULTS)
+            filters: 문서 메타데이터 필터 (file_type, uploader, uploaded_after, uploaded_before)
+        Returns:
+            쿼리 순서대로의 검색 결과 리스트
+        """
+        filters = normalize_filters(filters)
+        max_results = max_results or self.RANGE_MAX_RESULTS
+        
+        try:
+            storage_key, label = self._course_location(course_id)
+            index, metadata = self.load_course_segments(storage_key)
+            
+            if index.ntotal == 0:
+                logger.warning(f"빈 인덱스: {course_id}")
+                return [[] for _ in range(len(query_embeddings))]
+            
+            query_embeddings = self._project(metadata, query_embeddings)
+            
+            # 필터 검색(공유 버킷 포함)과 압축 인덱스(근사 점수)는 상위 max_results개의 정확한 유사도를 구한 뒤 기준으로 자름
+            if filters or label is not None:
+                similarities, indices = self._search_filtered(storage_key, index, metadata,
+                                                              query_embeddings, max_results, filters, label)
+                hits = self._threshold_hits(similarities, indices, min_similarity)
+            elif self._is_compressed(metadata):
+                _, candidates = index.search(query_embeddings, max_results * self._rerank_factor(metadata))
+                similarities, indices = self._rerank_exact(storage_key, query_embeddings, candidates, max_results,
+                                                           self._raw_vectors_dtype(metadata.get('index_type')))
+                hits = self._threshold_hits(similarities, indices, min_similarity)
+            else:
+                hits = index.range_search(query_embeddings, min_similarity, max_results)
+            
+            # 기준을 넘는 청크가 없으면 ("관련 자료 없음") 청크 메타데이터/텍스트를 읽지 않음
+            if not any(len(ids) for _, ids in hits):
+                return [[] for _ in hits]
+            
+            chunk_store = self._chunk_store(storage_key)
+            limit = metadata.get('next_chunk_id', index.ntotal)
+            hits = [(similarities, chunk_store.resolve(ids, limit)) for similarities, ids in hits]
+            chunk_infos = chunk_store.get_many(np.concatenate([ids for _, ids in hits]), limit=limit, full_text=True)
+            
+            batch_results = []
+            offset = 0
+            for similarities, ids in hits:
+                if label is not None:
+                    ids = chunk_store.local_ids(ids)
+                batch_results.append(self._build_search_results(similarities, ids,
+                                                                chunk_infos[offset:offset + len(ids)], min_similarity))
+                offset += len(ids)
+            
+            return batch_results
+            
+        except FileNotFoundError:
+            logger.warning(f"인덱스가 없습니다: {course_id}")
+            return [[] for _ in range(len(query_embeddings))]
+        except Exception as e:
+            logger.error(f"유사도 기준 검색 중 오류 발생: {str(e)}")
+            raise
+    
+    def _threshold_hits(self, similarities: np.ndarray, indices: np.ndarray,
+                        min_similarity: float) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """상위 k 검색 결과를 쿼리별 기준 이상 (유사도, 청크 ID) 쌍으로 변환"""
+        hits = []
+        for row_similarities, row_ids in zip(similarities, indices):
+            keep = (row_ids >= 0) & (row_similarities >= min_similarity)
+            hits.append((row_similarities[keep], row_ids[keep]))
+        return hits
+    
+    def _search_filtered(self, course_id: str, index: SegmentedIndex, metadata: Dict,
+                         query_embeddings: np.ndarray, top_k: int, filters: Optional[Dict],
+                         label: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        메타데이터 필터(공유 버킷이면 강의 라벨)를 만족하는 청크만 검색
+        조건을 만족하는 청크가 적으면 그 부분 집합의 벡터만 전수 비교하고,
+        많으면 청크 ID 비트맵 선택자를 FAISS 검색에 넘겨 인덱스 안에서 거름
+        Args:
+            course_id: 강의 ID (공유 버킷이면 버킷 키)
+            index: 세그먼트 인덱스
+            metadata: 메타데이터
+            query_embeddings: (쿼리 수, dimension) 정규화된 임베딩
+            top_k: 쿼리별 반환할 결과 수
+            filters: normalize_filters로 정규화한 필터 (없으면 None)
+            label: 공유 버킷의 강의 라벨
+        Returns:
+            index.search와 같은 형태의 (유사도, 청크 ID) 배열 (결과는 조건을 만족하는 청크 ID)
+        """
+        limit = metadata.get('next_chunk_id', index.ntotal)
+        predicate = (lambda meta: matches_filters(meta, filters)) if filters else None
+        chunk_store = self._chunk_store(course_id)
+        chunk_ids = chunk_store.filter_ids(predicate, limit, label)
+        
+        # 근사 중복 청크는 함께 쓰는 벡터로 검색하고, 결과 벡터는 그 벡터를 쓰는 조건 만족 청크로 되돌림
+        vector_ids = chunk_store.vector_ids(chunk_ids)
+        allowed, first = np.unique(vector_ids, return_index=True)
+        similarities, indices = self._search_allowed(course_id, index, metadata, query_embeddings, top_k,
+                                                     allowed, limit)
         
-        # 문장 단위로 분할 시도
-        sentences = text.split('. ')
+        positions = np.searchsorted(allowed, indices)
+        found = (indices >= 0) & (positions < len(allowed))
+        found[found] = allowed[positions[found]] == indices[found]
+        indices[found] = chunk_ids[first[positions[found]]]
+        return similarities, indices
+    
+    def _search_allowed(self, course_id: str, index: SegmentedIndex, metadata: Dict, query_embeddings: np.ndarray,
+                        top_k: int, allowed: np.ndarray, limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        허용된 벡터 ID 부분 집합만 검색
+        Args:
+            course_id: 강의 ID (공유 버킷이면 버킷 키)
+            index: 세그먼트 인덱스
+            metadata: 메타데이터
+            query_embeddings: (쿼리 수, dimension) 정규화된 임베딩
+            top_k: 쿼리별 반환할 결과 수
+            allowed: 정렬된 벡터 ID 배열
+            limit: ID 상한 (비트맵 크기)
+        Returns:
+            index.search와 같은 형태의 (유사도, 벡터 ID) 배열
+        """
+        if len(allowed) == 0:
+            return (np.full((len(query_embeddings), top_k), -np.inf, dtype=np.float32),
+                    np.full((len(query_embeddings), top_k), -1, dtype=np.int64))
         
-        current_chunk = ""
-        chunk_index = 0
+        # 선택도가 높은 필터는 IVF/HNSW 탐색 범위 안에 허용된 벡터가 거의 없으므로 전수 비교
+        if len(allowed) <= max(self.FILTER_BRUTE_FORCE_MIN, self.FILTER_BRUTE_FORCE_RATIO * index.ntotal):
+            try:
+                if self._is_compressed(metadata):
+                    raw_vectors = self._open_raw_vectors(course_id, self._raw_vectors_dtype(metadata.get('index_type')),
+                                                         metadata['dimension'])
+                    vectors = np.asarray(raw_vectors[allowed], dtype=np.float32)
+                else:
+                    vectors = index.reconstruct_batch(allowed)
+                return self._brute_force_search(query_embeddings, vectors, allowed, top_k)
+            except RuntimeError as e:
+                # 벡터를 복원할 수 없는 예전 인덱스는 ID 선택자로 검색
+                logger.warning(f"필터 부분 집합 벡터 복원 실패, ID 선택자로 검색합니다: {course_id} - {str(e)}")
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
+        # 청크 ID 비트맵 (검색이 끝날 때까지 배열을 유지해야 함)
+        bitmap = np.zeros(limit, dtype=bool)
+        bitmap[allowed] = True
+        bitmap = np.packbits(bitmap, bitorder='little')
+        selector = faiss.IDSelectorBitmap(limit, faiss.swig_ptr(bitmap))
+        
+        if self._is_compressed(metadata):
+            _, candidates = index.search(query_embeddings, top_k * self._rerank_factor(metadata), selector)
+            return self._rerank_exact(course_id, query_embeddings, candidates, top_k,
+                                      self._raw_vectors_dtype(metadata.get('index_type')))
+        return index.search(query_embeddings, top_k, selector)
+    
+    def _brute_force_search(self, query_embeddings: np.ndarray, vectors: np.ndarray, ids: np.ndarray,
+                            top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        벡터 부분 집합 전수 비교 (내적)
+        Args:
+            query_embeddings: (쿼리 수, dimension) 정규화된 임베딩
+            vectors: (N, dimension) 후보 벡터
+            ids: 벡터별 청크 ID
+            top_k: 쿼리별 반환할 결과 수
+        Returns:
+            index.search와 같은 형태의 (유사도, 청크 ID) 배열 (빈 자리는 -inf, -1)
+        """
+        similarities = np.full((len(query_embeddings), top_k), -np.inf, dtype=np.float32)
+        indices = np.full((len(query_embeddings), top_k), -1, dtype=np.int64)
+        
+        scores = query_embeddings @ vectors.T
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        
+        similarities[:, :k] = np.take_along_axis(top_scores, order, axis=1)
+        indices[:, :k] = ids[np.take_along_axis(top, order, axis=1)]
+        return similarities, indices
+    
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        청크 텍스트 임베딩 생성 (캐시에 없는 텍스트만 인코딩)
+        Args:
+            texts: 청크 텍스트 리스트
+        Returns:
+            (텍스트 수, dimension) 정규화된 float32 임베딩 행렬
+        """
+        if self.embedding_cache is None:
+            embeddings, missing = np.zeros((len(texts), self.dimension), dtype=np.float32), list(range(len(texts)))
+        else:
+            embeddings, missing = self.embedding_cache.get_many(texts)
+        
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            encoded = self.model_registry.encode(self.embedding_model_name, missing_texts, self.embedding_backend)
             
-            # 현재 청크에 문장 추가 시 크기 확인
-            test_chunk = current_chunk + ". " + sentence if current_chunk else sentence
+            # 임베딩 정규화 (내적 검색을 위해)
+            encoded = (encoded / np.linalg.norm(encoded, axis=1, keepdims=True)).astype(np.float32)
+            embeddings[missing] = encoded
             
-            if len(test_chunk) <= chunk_size:
-                current_chunk = test_chunk
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(missing_texts, encoded)
+        
+        if self.embedding_cache is not None:
+            logger.info(f"임베딩 캐시 적중: {len(texts) - len(missing)}/{len(texts)}")
+        
+        return embeddings
+    
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        쿼리 임베딩 생성 (정규화된 float32 행렬)
+        Args:
+            queries: 검색 쿼리 리스트
+        Returns:
+            (쿼리 수, dimension) 임베딩 행렬
+        """
+        # 공백만 다른 쿼리는 같은 쿼리로 취급
+        normalized = [EmbeddingCache.normalize_text(query) for query in queries]
+        query_embeddings = np.zeros((len(queries), self.dimension), dtype=np.float32)
+        
+        missing = {}
+        for i, query in enumerate(normalized):
+            cached = self.query_cache.get(self.embedding_model_key, query)
+            if cached is None:
+                missing.setdefault(query, []).append(i)
             else:
-                # 현재 청크 저장
-                if current_chunk:
-                    chunks.append({
-                        'document_id': document_id,
-                        'chunk_index': chunk_index,
-                        'text': current_chunk,
-                        'size': len(current_chunk)
-                    })
-                    chunk_index += 1
+                query_embeddings[i] = cached
+        
+        if missing:
+            missing_queries = list(missing.keys())
+            encoded = self.model_registry.encode(self.embedding_model_name, missing_queries, self.embedding_backend)
+            encoded = (encoded / np.linalg.norm(encoded, axis=1, keepdims=True)).astype(np.float32)
+            for query, embedding in zip(missing_queries, encoded):
+                query_embeddings[missing[query]] = embedding
+                self.query_cache.put(self.embedding_model_key, query, embedding)
+        
+        return query_embeddings
+    
+    def _build_search_results(self, similarities: np.ndarray, chunk_ids: np.ndarray,
+                              chunk_infos: List[Optional[Dict]], min_similarity: float) -> List[Dict]:
+        """
+        한 쿼리의 검색 결과 구성
+        Args:
+            similarities: 결과별 유사도
+            chunk_ids: 결과별 청크 ID
+            chunk_infos: 결과별 청크 메타데이터 (없으면 None)
+            min_similarity: 최소 유사도 점수
+        Returns:
+            검색 결과 리스트
+        """
+        results = []
+        for i, (similarity, chunk_id, chunk_info) in enumerate(zip(similarities, chunk_ids, chunk_infos)):
+            if similarity < min_similarity:
+                continue
+            
+            if chunk_info is not None:
+                results.append({
+                    'rank': i + 1,
+                    'similarity': float(similarity),
+                    'vector_id': int(chunk_id),
+                    'document_id': chunk_info['document_id'],
+                    'chunk_index': chunk_info['chunk_index'],
+                    'text': chunk_info['text'],
+                    'full_text': chunk_info.get('full_text', chunk_info['text']),
+                    'metadata': chunk_info.get('original_metadata', {})
+                })
+        return results
+    
+    def remove_document(self, course_id: str, document_id: str) -> int:
+        """
+        강의 인덱스에서 한 문서의 벡터만 삭제
+        Args:
+            course_id: 강의 ID
+            document_id: 문서 ID
+        Returns:
+            삭제된 청크 수
+        """
+        try:
+            storage_key, label = self._course_location(course_id)
+            with get_course_lock(storage_key):
+                try:
+                    metadata = self._prepare_write(storage_key, create=False)
+                except FileNotFoundError:
+                    return 0
                 
-                # 새로운 청크 시작
-                current_chunk = sentence
+                chunk_store = self._chunk_store(storage_key)
+                chunk_ids = chunk_store.find_document_ids(document_id, metadata['next_chunk_id'], label)
+                if len(chunk_ids) == 0:
+                    return 0
+                
+                self._remove_chunks(storage_key, metadata, chunk_store, chunk_ids)
+            
+            self._schedule_compaction(storage_key, metadata)
+            
+            logger.info(f"문서 벡터 삭제 완료: {course_id}, 문서: {document_id}, 청크 수: {len(chunk_ids)}")
+            return len(chunk_ids)
+            
+        except Exception as e:
+            logger.error(f"문서 벡터 삭제 중 오류 발생: {str(e)}")
+            raise
+    
+    def _remove_chunks(self, course_id: str, metadata: Dict, chunk_store: ChunkMetadataStore,
+                       chunk_ids: np.ndarray):
+        """
+        청크 삭제 기록 (강의 락을 잡은 상태에서 호출)
+        Args:
+            course_id: 강의 ID (공유 버킷이면 버킷 키)
+            metadata: 메타데이터
+            chunk_store: 청크 메타데이터 저장소
+            chunk_ids: 삭제할 청크 ID 배열
+        """
+        # 다른 청크가 함께 쓰는 벡터는 남기고, 남는 청크 중 하나를 그 벡터의 검색 결과로 기록
+        vector_ids = chunk_store.update_successors(chunk_store.vector_ids(chunk_ids), chunk_ids,
+                                                   metadata['next_chunk_id'])
+        
+        # 저장소에 먼저 삭제 표시 (로그 기록 전에 실패해도 검색 결과에서 제외됨)
+        chunk_store.mark_deleted(chunk_ids)
+        
+        # 기본 세그먼트는 그대로 두고 삭제 레코드만 기록 (벡터는 병합할 때 제거)
+        if len(vector_ids):
+            metadata['log_committed_end'] = self._vector_log(course_id, metadata).append_remove(vector_ids)
+        metadata['chunk_count'] = max(0, metadata.get('chunk_count', 0) - len(vector_ids))
+        metadata['tombstone_count'] = metadata.get('tombstone_count', 0) + len(vector_ids)
+        metadata['document_count'] = self._count_documents(chunk_store, metadata)
+        self._commit_metadata(course_id, metadata)
+    
+    def replace_document(self, course_id: str, document: Dict) -> int:
+        """
+        한 문서의 벡터를 새 내용으로 교체 (해당 문서만 다시 임베딩)
+        Args:
+            course_id: 강의 ID
+            document: {'id': str, 'text': str, 'metadata': dict}
+        Returns:
+            추가된 청크 수
+        """
+        self.remove_document(course_id, document['id'])
+        return self.add_documents_to_index(course_id, [document])
+    
+    def _select_index_type(self, ntotal: int, compression: str = None) -> str:
+        """
+        청크 수에 맞는 인덱스 타입 선택
+        Args:
+            ntotal: 전체 벡터 수
+            compression: 압축 저장 모드 (None, 'pq', 'opq', 'binary')
+        Returns:
+            인덱스 타입 ('flat', 'ivf', 'hnsw', 'ivfpq', 'opq', 'binary', 'binary_ivf')
+        """
+        # 이진 인덱스는 학습이 필요 없으므로 크기와 관계없이 사용 (클 때만 IVF)
+        if compression == 'binary':
+            return 'binary_ivf' if ntotal >= self.ivf_threshold else 'binary'
+        if compression and ntotal >= max(self.ivf_threshold, 2 ** self.pq_nbits):
+            return 'opq' if compression == 'opq' else 'ivfpq'
+        if ntotal >= self.hnsw_threshold:
+            return 'hnsw'
+        if ntotal >= self.ivf_threshold:
+            return 'ivf'
+        return 'flat'
+    
+    def _build_index(self, index_type: str, vectors: np.ndarray, ids: np.ndarray) -> Tuple[faiss.Index, Dict]:
+        """
+        지정한 타입의 인덱스를 만들고 벡터 추가
+        Args:
+            index_type: 인덱스 타입
+            vectors: 정규화된 임베딩 행렬
+            ids: 벡터별 청크 ID
+        Returns:
+            FAISS 인덱스와 인덱스 파라미터
+        """
+        # 차원 축소된 강의는 모델 차원이 아니라 벡터 차원으로 생성
+        dimension = vectors.shape[1]
+        
+        if index_type == 'ivf':
+            # 클러스터 수는 sqrt(N)의 4배 정도, 학습 데이터가 클러스터당 39개 이상 되도록 제한
+            nlist = max(1, min(int(4 * np.sqrt(len(vectors))), len(vectors) // 39))
+            quantizer = faiss.IndexFlatIP(dimension)
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            # 청크 ID로 벡터를 복원할 수 있도록 ID -> 위치 해시 테이블 유지
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)
+            params = {'nlist': nlist, 'nprobe': min(self.ivf_nprobe, nlist), 'trained_ntotal': len(vectors)}
+        elif index_type in self.BINARY_INDEX_TYPES:
+            nlist = 0
+            params = {}
+            if index_type == 'binary_ivf':
+                nlist = max(1, min(int(4 * np.sqrt(len(vectors))), len(vectors) // 39))
+                params = {'nlist': nlist, 'nprobe': min(self.ivf_nprobe, nlist), 'trained_ntotal': len(vectors)}
+            index = BinaryQuantizedIndex.build(dimension, vectors, nlist)
+        elif index_type in self.COMPRESSED_INDEX_TYPES:
+            nlist = max(1, min(int(4 * np.sqrt(len(vectors))), len(vectors) // 39))
+            pq_m = self._select_pq_m(self.pq_m, dimension)
+            factory = f"IVF{nlist},PQ{pq_m}x{self.pq_nbits}"
+            if index_type == 'opq':
+                factory = f"OPQ{pq_m}," + factory
+            index = faiss.index_factory(dimension, factory, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            params = {
+                'nlist': nlist,
+                'nprobe': min(self.ivf_nprobe, nlist),
+                'pq_m': pq_m,
+                'pq_nbits': self.pq_nbits,
+                'trained_ntotal': len(vectors)
+            }
+        elif index_type == 'hnsw':
+            index = faiss.IndexIDMap2(
+                faiss.IndexHNSWFlat(dimension, self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            )
+            params = {'M': self.hnsw_m, 'efSearch': self.hnsw_ef_search}
+        else:
+            index = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+            params = {}
+        
+        self._apply_search_params(index, {'index_type': index_type, 'index_params': params})
+        if len(vectors):
+            index.add_with_ids(vectors, ids)
+        
+        return index, params
+    
+    def _apply_search_params(self, index: faiss.Index, metadata: Dict):
+        """
+        메타데이터에 기록된 검색 파라미터 적용
+        Args:
+            index: FAISS 인덱스
+            metadata: 메타데이터
+        """
+        index_type = metadata.get('index_type', 'flat')
+        params = metadata.get('index_params', {})
         
-        # 마지막 청크 저장
-        if current_chunk:
-            chunks.append({
-                'document_id': document_id,
-                'chunk_index': chunk_index,
-                'text': current_chunk,
-                'size': len(current_chunk)
-            })
+        if isinstance(index, BinaryQuantizedIndex):
+            index.nprobe = params.get('nprobe', self.ivf_nprobe)
+            return
         
-        # 너무 짧은 청크는 제거
-        chunks = [chunk for chunk in chunks if len(chunk['text']) > 50]
+        # 메타데이터와 실제 인덱스 타입이 다를 수 있으므로 인덱스 구조를 직접 확인
+        if index_type == 'ivf' or index_type in self.COMPRESSED_INDEX_TYPES:
+            ivf_index = faiss.try_extract_index_ivf(index)
+            if ivf_index is not None:
+                ivf_index.nprobe = params.get('nprobe', self.ivf_nprobe)
+        elif index_type == 'hnsw':
+            hnsw_index = faiss.downcast_index(index)
+            if isinstance(hnsw_index, faiss.IndexIDMap2):
+                hnsw_index = faiss.downcast_index(hnsw_index.index)
+            if hasattr(hnsw_index, 'hnsw'):
+                hnsw_index.hnsw.efSearch = params.get('efSearch', self.hnsw_ef_search)
+    
+    def _reconstruct_vectors(self, course_id: str, index: faiss.Index,
+                             metadata: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        삭제되지 않은 청크가 쓰는 벡터 전체 복원
+        Args:
+            course_id: 강의 ID
+            index: FAISS 인덱스
+            metadata: 메타데이터
+        Returns:
+            (N, dimension) 임베딩 행렬과 청크 ID 배열
+        """
+        ids = self._chunk_store(course_id).live_vector_ids(metadata.get('next_chunk_id', index.ntotal))
+        if index.ntotal == 0 or len(ids) == 0:
+            return np.zeros((0, metadata['dimension']), dtype=np.float32), np.zeros(0, dtype=np.int64)
+        
+        # 압축 인덱스는 손실 복원이므로 원본 벡터 파일 사용
+        if self._is_compressed(metadata):
+            raw_vectors = self._open_raw_vectors(course_id, self._raw_vectors_dtype(metadata.get('index_type')),
+                                                 metadata['dimension'])
+            return np.array(raw_vectors[ids], dtype=np.float32), ids
+        
+        # ID 매핑 이전에 만든 IVF 인덱스는 위치 == ID 이므로 배열 direct map으로 충분
+        ivf_index = faiss.try_extract_index_ivf(index)
+        if ivf_index is not None and ivf_index.direct_map.type == faiss.DirectMap.NoMap:
+            ivf_index.make_direct_map()
         
-        return chunks
+        return index.reconstruct_batch(ids), ids
+    
+    def _ensure_chunk_ids(self, course_id: str, index: faiss.Index, metadata: Dict) -> faiss.Index:
+        """
+        청크 ID 매핑 이전에 만든 인덱스를 ID 매핑 인덱스로 변환 (위치를 ID로 사용)
+        Args:
+            course_id: 강의 ID
+            index: FAISS 인덱스
+            metadata: 메타데이터
+        Returns:
+            청크 ID로 추가/삭제 가능한 인덱스
+        """
+        if metadata.get('chunk_ids'):
+            return index
+        
+        metadata['next_chunk_id'] = index.ntotal
+        
+        # 압축 인덱스(IVF)는 이미 위치를 ID로 저장하고 있으므로 그대로 사용
+        if not self._is_compressed(metadata):
+            vectors, ids = self._reconstruct_vectors(course_id, index, metadata)
+            index_type = metadata.get('index_type', 'flat')
+            index, params = self._build_index(index_type, vectors, ids)
+            metadata['index_params'] = params
+        
+        metadata['chunk_ids'] = True
+        logger.info(f"청크 ID 인덱스로 변환: {course_id}, 벡터 수: {index.ntotal}")
+        return index
+    
+    def _count_documents(self, chunk_store: ChunkMetadataStore, metadata: Dict) -> int:
+        """삭제되지 않은 청크가 남아 있는 문서 수"""
+        live_ids = chunk_store.live_ids(metadata.get('next_chunk_id'))
+        return len(np.unique(chunk_store.document_ids()[live_ids]))
+    
+    def _maybe_migrate_index(self, course_id: str, index: faiss.Index, metadata: Dict) -> faiss.Index:
+        """
+        청크 수가 기준을 넘으면 인덱스 타입 전환 (메타데이터도 갱신)
+        Args:
+            course_id: 강의 ID
+            index: 현재 FAISS 인덱스
+            metadata: 메타데이터
+        Returns:
+            전환된 (또는 기존) 인덱스
+        """
+        current_type = metadata.get('index_type', 'flat')
+        # 한 번 압축된 강의는 매니저 설정과 관계없이 압축 상태 유지
+        compression = self.compression or metadata.get('compression')
+        target_type = self._select_index_type(index.ntotal, compression)
+        
+        # IVF는 학습 시점보다 4배 이상 커지면 클러스터를 다시 학습
+        trained_ntotal = metadata.get('index_params', {}).get('trained_ntotal', 0)
+        needs_retrain = current_type in ('ivf', 'ivfpq', 'opq', 'binary_ivf') and index.ntotal > 4 * trained_ntotal
+        reduce = self._should_reduce(metadata, index.ntotal)
+        
+        if target_type == current_type and not needs_retrain and not reduce:
+            return index
+        
+        start_time = time.time()
+        vectors, ids = self._reconstruct_vectors(course_id, index, metadata)
+        
+        # 차원 축소는 인덱스를 다시 만들 때 한 번만 적용 (이후 추가/검색은 메타데이터의 투영 사용)
+        if reduce:
+            projection = self._load_or_train_projection(vectors)
+            vectors = projection.apply(vectors)
+            metadata['projection'] = {
+                'method': projection.method,
+                'dimension': projection.output_dimension,
+                'file': DimensionProjection.file_name(self.embedding_model_key, projection.method,
+                                                      projection.output_dimension),
+                'explained_variance': projection.explained_variance
+            }
+            metadata['dimension'] = projection.output_dimension
+            logger.info(f"임베딩 차원 축소: {course_id}, {projection.input_dimension} -> "
+                        f"{projection.output_dimension} ({projection.method})")
+        
+        new_index, params = self._build_index(target_type, vectors, ids)
+        
+        # 비압축 -> 압축 전환 (또는 PQ <-> 이진 전환, 차원 축소) 시 재정렬용 원본 벡터 파일 생성
+        raw_dtype = self._raw_vectors_dtype(target_type)
+        if target_type in self.COMPRESSED_INDEX_TYPES and (
+                current_type not in self.COMPRESSED_INDEX_TYPES or self._raw_vectors_dtype(current_type) != raw_dtype
+                or reduce):
+            self._write_raw_vectors(course_id, vectors, ids, metadata['next_chunk_id'], raw_dtype)
+            metadata['compression'] = compression
+        
+        metadata['index_type'] = target_type
+        metadata['index_params'] = params
+        
+        logger.info(f"인덱스 타입 전환: {course_id}, {current_type} -> {target_type}, "
+                    f"벡터 수: {new_index.ntotal}, 소요 시간: {time.time() - start_time:.2f}초")
+        return new_index
+    
+    def _is_compressed(self, metadata: Dict) -> bool:
+        """압축(PQ, 이진) 인덱스 여부 (원본 벡터 파일로 재정렬)"""
+        return metadata.get('index_type') in self.COMPRESSED_INDEX_TYPES
+    
+    def _raw_vectors_dtype(self, index_type: str) -> np.dtype:
+        """재정렬용 원본 벡터 자료형 (이진 인덱스는 float16, PQ는 float32)"""
+        return np.dtype(np.float16) if index_type in self.BINARY_INDEX_TYPES else np.dtype(np.float32)
+    
+    def _rerank_factor(self, metadata: Dict) -> int:
+        """압축 인덱스에서 재정렬할 후보 배수"""
+        if metadata.get('index_type') in self.BINARY_INDEX_TYPES:
+            return self.binary_rerank_factor
+        return self.rerank_factor
+    
+    def _should_reduce(self, metadata: Dict, ntotal: int) -> bool:
+        """차원 축소를 적용할지 (설정되어 있고, 아직 축소하지 않았고, 청크 수가 기준 이상)"""
+        return (bool(self.reduced_dimension) and not metadata.get('projection')
+                and self.reduced_dimension < metadata.get('dimension', 0) and ntotal >= self.reduction_threshold)
+    
+    def _projection(self, metadata: Dict) -> Optional[DimensionProjection]:
+        """강의 메타데이터에 기록된 차원 축소 투영 (축소하지 않은 강의는 None)"""
+        info = metadata.get('projection')
+        if not info:
+            return None
+        
+        projection = self._projections.get(info['file'])
+        if projection is None:
+            projection = DimensionProjection.read(self.base_path / "projections" / info['file'])
+            self._projections[info['file']] = projection
+        return projection
+    
+    def _project(self, metadata: Dict, vectors: np.ndarray) -> np.ndarray:
+        """
+        임베딩을 강의 인덱스 차원으로 투영
+        Args:
+            metadata: 메타데이터
+            vectors: (N, 모델 차원) 정규화된 임베딩
+        Returns:
+            (N, 인덱스 차원) 정규화된 임베딩 (축소하지 않은 강의는 그대로)
+        """
+        projection = self._projection(metadata)
+        if projection is None or vectors.shape[1] == projection.output_dimension:
+            return vectors
+        return projection.apply(vectors)
+    
+    def _load_or_train_projection(self, vectors: np.ndarray) -> DimensionProjection:
+        """
+        모델별 투영 로드 (없으면 주어진 벡터로 학습해서 저장)
+        같은 모델의 강의는 모두 같은 투영을 공유하고, 한 번 만든 투영 파일은 덮어쓰지 않음
+        Args:
+            vectors: 학습용 정규화된 임베딩 (모델 차원)
+        Returns:
+            차원 축소 투영
+        """
+        file_name = DimensionProjection.file_name(self.embedding_model_key, self.reduction_method,
+                                                  self.reduced_dimension)
+        path = self.base_path / "projections" / file_name
+        
+        if file_name not in self._projections:
+            if path.exists():
+                self._projections[file_name] = DimensionProjection.read(path)
+            else:
+                start_time = time.time()
+                projection = DimensionProjection.train(vectors, self.reduced_dimension, self.reduction_method)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._write_atomic(path, projection.write)
+                self._projections[file_name] = projection
+                logger.info(f"차원 축소 투영 학습 완료: {file_name}, 벡터 수: {len(vectors)}, "
+                            f"보존 비율: {projection.explained_variance}, 소요 시간: {time.time() - start_time:.2f}초")
+        
+        return self._projections[file_name]
+    
+    def _select_pq_m(self, pq_m: int, dimension: int) -> int:
+        """
+        차원을 나누어 떨어지게 하는 PQ 서브 벡터 수 선택
+        Args:
+            pq_m: 희망 서브 벡터 수
+            dimension: 벡터 차원
+        Returns:
+            차원의 약수 중 pq_m 이하의 최댓값
+        """
+        for m in range(min(pq_m, dimension), 0, -1):
+            if dimension % m == 0:
+                return m
+        return 1
+    
+    def _raw_vectors_path(self, course_id: str, dtype: np.dtype = np.float32) -> Path:
+        """재정렬용 원본 벡터 파일 경로 (자료형별로 .f32 / .f16)"""
+        return self.base_path / f"course_{course_id}_vectors.f{np.dtype(dtype).itemsize * 8}"
+    
+    def _open_raw_vectors(self, course_id: str, dtype: np.dtype = np.float32,
+                          dimension: int = None) -> np.ndarray:
+        """
+        원본 벡터 파일을 메모리 맵으로 열기 (필요한 행만 디스크에서 읽음)
+        Args:
+            course_id: 강의 ID
+            dtype: 저장 자료형 (float32 또는 float16)
+            dimension: 벡터 차원 (None이면 모델 차원, 차원 축소된 강의는 인덱스 차원)
+        Returns:
+            (N, dimension) 메모리 맵 배열
+        """
+        dimension = dimension or self.dimension
+        path = self._raw_vectors_path(course_id, dtype)
+        if not path.exists() or path.stat().st_size == 0:
+            return np.zeros((0, dimension), dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r').reshape(-1, dimension)
+    
+    def _append_raw_vectors(self, course_id: str, vectors: np.ndarray, offset: int,
+                            dtype: np.dtype = np.float32):
+        """
+        원본 벡터 파일에 벡터 추가
+        Args:
+            course_id: 강의 ID
+            vectors: 추가할 정규화된 임베딩
+            offset: 추가를 시작할 행 위치 (이후 내용은 잘라냄)
+            dtype: 저장 자료형 (float32 또는 float16)
+        """
+        row_bytes = vectors.shape[1] * np.dtype(dtype).itemsize
+        path = self._raw_vectors_path(course_id, dtype)
+        
+        with open(path, 'ab') as f:
+            # 이전 쓰기가 중간에 실패해 남은 행이 있으면 잘라냄
+            f.truncate(offset * row_bytes)
+            f.write(np.ascontiguousarray(vectors, dtype=dtype).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _write_raw_vectors(self, course_id: str, vectors: np.ndarray, ids: np.ndarray, next_chunk_id: int,
+                           dtype: np.dtype = np.float32):
+        """
+        원본 벡터 파일을 청크 ID 위치에 맞춰 새로 작성 (삭제된 ID 자리는 0)
+        Args:
+            course_id: 강의 ID
+            vectors: 정규화된 임베딩
+            ids: 벡터별 청크 ID
+            next_chunk_id: 다음에 부여할 청크 ID (파일 행 수)
+            dtype: 저장 자료형 (float32 또는 float16)
+        """
+        full = np.zeros((next_chunk_id, vectors.shape[1]), dtype=dtype)
+        full[ids] = vectors
+        self._append_raw_vectors(course_id, full, 0, dtype)
+    
+    def _rerank_exact(self, course_id: str, query_embeddings: np.ndarray, candidates: np.ndarray,
+                      top_k: int, dtype: np.dtype = np.float32) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        압축 인덱스 후보를 원본 벡터로 정확히 재정렬
+        Args:
+            course_id: 강의 ID
+            query_embeddings: (쿼리 수, dimension) 정규화된 쿼리 임베딩
+            candidates: (쿼리 수, k) 후보 청크 ID
+            top_k: 반환할 결과 수
+            dtype: 원본 벡터 저장 자료형 (float32 또는 float16)
+        Returns:
+            index.search와 같은 형태의 (유사도, 청크 ID) 배열 (빈 자리는 -inf, -1)
+        """
+        raw_vectors = self._open_raw_vectors(course_id, dtype, query_embeddings.shape[1])
+        similarities = np.full((len(query_embeddings), top_k), -np.inf, dtype=np.float32)
+        indices = np.full((len(query_embeddings), top_k), -1, dtype=np.int64)
+        
+        for row, (query_embedding, ids) in enumerate(zip(query_embeddings, candidates)):
+            ids = ids[(ids >= 0) & (ids < len(raw_vectors))]
+            if len(ids) == 0:
+                continue
+            
+            # 정렬된 ID로 읽어야 메모리 맵 접근이 순차적
+            ids = np.sort(ids)
+            scores = np.asarray(raw_vectors[ids], dtype=np.float32) @ query_embedding
+            order = np.argsort(-scores)[:top_k]
+            
+            similarities[row, :len(order)] = scores[order]
+            indices[row, :len(order)] = ids[order]
+        
+        return similarities, indices
+    
+    def compress_course_index(self, course_id: str, compression: str = 'pq') -> bool:
+        """
+        기존 강의 인덱스를 압축(PQ/OPQ) 또는 이진 인덱스로 변환하여 제자리 저장
+        Args:
+            course_id: 강의 ID
+            compression: 압축 모드 ('pq', 'opq', 'binary')
+        Returns:
+            변환 여부 (벡터 수가 학습에 부족하거나 공유 버킷에 있는 작은 강의면 False)
+        """
+        if self._course_location(course_id)[1] is not None:
+            logger.info(f"공유 버킷에 있는 강의는 압축하지 않습니다: {course_id}")
+            return False
+        
+        with get_course_lock(course_id):
+            index, metadata = self.load_course_index(course_id)
+            
+            if self._is_compressed(metadata):
+                logger.info(f"이미 압축된 인덱스: {course_id}")
+                return False
+            
+            index = self._ensure_chunk_ids(course_id, index, metadata)
+            
+            # 이진 인덱스는 학습이 필요 없으므로 벡터 수 제한 없음
+            if compression != 'binary' and index.ntotal < 2 ** self.pq_nbits:
+                logger.info(f"압축하기에 벡터 수가 부족합니다: {course_id}, 벡터 수: {index.ntotal}")
+                return False
+            
+            vectors, ids = self._reconstruct_vectors(course_id, index, metadata)
+            if compression == 'binary':
+                target_type = self._select_index_type(index.ntotal, compression)
+            else:
+                target_type = 'opq' if compression == 'opq' else 'ivfpq'
+            new_index, params = self._build_index(target_type, vectors, ids)
+            
+            self._write_raw_vectors(course_id, vectors, ids, metadata['next_chunk_id'],
+                                    self._raw_vectors_dtype(target_type))
+            metadata['compression'] = compression
+            metadata['index_type'] = target_type
+            metadata['index_params'] = params
+            metadata['chunk_count'] = new_index.ntotal
+            
+            self.save_course_index(course_id, new_index, metadata)
+        logger.info(f"인덱스 압축 완료: {course_id}, {target_type}, 벡터 수: {new_index.ntotal}")
+        return True
     
     def get_course_index_stats(self, course_id: str) -> Dict:
         """
@@ -301,28 +1910,211 @@ class FAISSVectorManager:
             인덱스 통계 정보
         """
         try:
-            index, metadata = self.load_course_index(course_id)
+            storage_key, label = self._course_location(course_id)
+            if label is not None:
+                return self._bucket_course_stats(course_id, storage_key, label)
+            
+            index, metadata = self.load_course_segments(course_id)
             
             return {
                 'course_id': course_id,
                 'embedding_model': metadata.get('embedding_model', ''),
+                'embedding_backend': metadata.get('embedding_backend', 'torch'),
                 'dimension': metadata.get('dimension', 0),
                 'document_count': metadata.get('document_count', 0),
                 'chunk_count': index.ntotal,
+                'index_type': metadata.get('index_type', 'flat'),
+                'index_params': metadata.get('index_params', {}),
+                'compression': metadata.get('compression'),
+                'projection': metadata.get('projection'),
                 'index_size_mb': os.path.getsize(self.base_path / f"course_{course_id}.faiss") / (1024 * 1024),
-                'metadata_size_mb': os.path.getsize(self.base_path / f"course_{course_id}_metadata.pkl") / (1024 * 1024)
+                'metadata_size_mb': (os.path.getsize(self.base_path / f"course_{course_id}_metadata.pkl")
+                                     + self._chunk_store(course_id).disk_size()) / (1024 * 1024),
+                'log_size_mb': self._vector_log(course_id, metadata).size() / (1024 * 1024),
+                'delta_count': index.delta.ntotal,
+                'tombstone_count': len(index.tombstones),
+                'dedup_skipped_chunks': metadata.get('dedup_skipped', 0),
+                'dedup_saved_mb': metadata.get('dedup_skipped', 0) * self._vector_bytes() / (1024 * 1024),
+                'shared_bucket': None
             }
         except FileNotFoundError:
             return {
                 'course_id': course_id,
                 'embedding_model': '',
+                'embedding_backend': '',
                 'dimension': 0,
                 'document_count': 0,
                 'chunk_count': 0,
+                'index_type': '',
+                'index_params': {},
+                'compression': None,
+                'projection': None,
                 'index_size_mb': 0,
-                'metadata_size_mb': 0
+                'metadata_size_mb': 0,
+                'log_size_mb': 0,
+                'delta_count': 0,
+                'tombstone_count': 0,
+                'dedup_skipped_chunks': 0,
+                'dedup_saved_mb': 0,
+                'shared_bucket': None
             }
     
+    def _bucket_course_stats(self, course_id: str, bucket_key: str, label: int) -> Dict:
+        """
+        공유 버킷에 있는 강의의 통계 (파일 크기는 버킷에서 차지하는 청크 비율만큼 계산)
+        Args:
+            course_id: 강의 ID
+            bucket_key: 버킷 키
+            label: 강의 라벨
+        Returns:
+            인덱스 통계 정보
+        """
+        index, metadata = self.load_course_segments(bucket_key)
+        chunk_store = self._chunk_store(bucket_key)
+        chunk_ids = chunk_store.live_ids(metadata.get('next_chunk_id', index.ntotal), label)
+        vector_count = len(np.unique(chunk_store.vector_ids(chunk_ids)))
+        share = vector_count / max(index.ntotal, 1)
+        dedup_skipped = metadata.get('dedup_skipped_labels', {}).get(label, 0)
+        bucket_stats = self.get_course_index_stats(bucket_key)
+        
+        return {
+            **bucket_stats,
+            'course_id': course_id,
+            'document_count': len(np.unique(chunk_store.document_ids()[chunk_ids])),
+            'chunk_count': vector_count,
+            'index_size_mb': bucket_stats['index_size_mb'] * share,
+            'metadata_size_mb': bucket_stats['metadata_size_mb'] * share,
+            'log_size_mb': bucket_stats['log_size_mb'] * share,
+            'delta_count': 0,
+            'tombstone_count': 0,
+            'dedup_skipped_chunks': dedup_skipped,
+            'dedup_saved_mb': dedup_skipped * self._vector_bytes() / (1024 * 1024),
+            'shared_bucket': bucket_key
+        }
+    
+    def _maybe_promote_course(self, course_id: str, bucket_key: str, label: int) -> bool:
+        """
+        공유 버킷 강의의 청크 수가 기준을 넘었으면 전용 인덱스로 옮김
+        Args:
+            course_id: 강의 ID
+            bucket_key: 버킷 키
+            label: 강의 라벨
+        Returns:
+            옮겼는지 여부
+        """
+        with get_course_lock(bucket_key):
+            metadata = self._load_metadata(bucket_key)
+            chunk_count = len(self._chunk_store(bucket_key).live_ids(metadata['next_chunk_id'], label))
+        if chunk_count < self.bucket_promote_chunks:
+            return False
+        return self._promote_course(course_id, bucket_key, label)
+    
+    def _promote_course(self, course_id: str, bucket_key: str, label: int) -> bool:
+        """
+        공유 버킷의 강의 청크를 전용 인덱스로 옮김 (재임베딩 없이 벡터와 청크 메타데이터를 복사)
+        강의 안에서의 청크 ID를 그대로 전용 인덱스의 청크 ID로 쓰므로 document_chunks의 vector_index가 유지된다.
+        전용 인덱스 메타데이터 파일을 쓰는 순간부터 검색이 전용 인덱스로 바뀌고, 그 뒤에 버킷의 청크를 삭제 표시한다.
+        Args:
+            course_id: 강의 ID
+            bucket_key: 버킷 키
+            label: 강의 라벨
+        Returns:
+            옮겼는지 여부
+        """
+        try:
+            with get_course_lock(bucket_key), get_course_lock(course_id):
+                if self.bucket_registry.get(course_id) != (bucket_key, label):
+                    return False
+                
+                segments, bucket_metadata = self.load_course_segments(bucket_key)
+                limit = bucket_metadata['next_chunk_id']
+                bucket_store = self._chunk_store(bucket_key)
+                bucket_ids = bucket_store.live_ids(limit, label)
+                bucket_vector_ids = bucket_store.vector_ids(bucket_ids)
+                vector_ids = np.unique(bucket_vector_ids)
+                
+                # 버킷 벡터 복원 (압축 버킷은 재정렬용 원본 벡터 파일에서 읽음)
+                if self._is_compressed(bucket_metadata):
+                    raw_vectors = self._open_raw_vectors(bucket_key,
+                                                         self._raw_vectors_dtype(bucket_metadata.get('index_type')),
+                                                         bucket_metadata['dimension'])
+                    vectors = np.asarray(raw_vectors[vector_ids], dtype=np.float32)
+                else:
+                    vectors = segments.reconstruct_batch(vector_ids)
+                
+                # 강의 청크 ID 순서로 청크 메타데이터 행 구성 (삭제된 청크 자리는 삭제 표시한 빈 행,
+                # 근사 중복 청크의 별칭도 강의 청크 ID로 변환)
+                local_ids = bucket_store.local_ids(bucket_ids)
+                local_vector_ids = bucket_store.local_ids(vector_ids)
+                row_vector_ids = bucket_store.local_ids(bucket_vector_ids)
+                next_chunk_id = bucket_store.next_local_id(label, limit)
+                rows = [{'document_id': '', 'chunk_index': 0, 'text': ''} for _ in range(next_chunk_id)]
+                for local_id, vector_id, row in zip(local_ids, row_vector_ids,
+                                                    bucket_store.get_many(bucket_ids, limit, full_text=True)):
+                    rows[local_id] = row if vector_id == local_id else dict(row, alias=int(vector_id))
+                gaps = np.setdiff1d(np.arange(next_chunk_id, dtype=np.int64), local_ids)
+                
+                chunk_store = self._chunk_store(course_id)
+                chunk_store.delete()
+                chunk_store.append(rows, 0)
+                chunk_store.update_successors(local_vector_ids, gaps, next_chunk_id)
+                if len(gaps):
+                    chunk_store.mark_deleted(gaps)
+                if self.dedup_chunks:
+                    # 벡터를 가진 청크가 삭제된 자리는 그 벡터를 쓰는 청크의 텍스트로 시그니처 계산
+                    texts = [row.get('full_text', row['text']) for row in rows]
+                    for vector_id, local_id in zip(row_vector_ids, local_ids):
+                        if not texts[vector_id]:
+                            texts[vector_id] = texts[local_id]
+                    deduplicator = self._chunk_deduplicator(course_id)
+                    deduplicator.append(deduplicator.signatures(texts), 0)
+                
+                # 전용 인덱스 구성 (버킷의 차원 축소/압축 설정을 그대로 이어받음)
+                compression = self.compression or bucket_metadata.get('compression')
+                index_type = self._select_index_type(len(local_vector_ids), compression)
+                index, params = self._build_index(index_type, vectors, local_vector_ids)
+                if index_type in self.COMPRESSED_INDEX_TYPES:
+                    self._write_raw_vectors(course_id, vectors, local_vector_ids, next_chunk_id,
+                                            self._raw_vectors_dtype(index_type))
+                
+                metadata = {
+                    'course_id': course_id,
+                    'embedding_model': bucket_metadata.get('embedding_model', self.embedding_model_name),
+                    'embedding_backend': bucket_metadata.get('embedding_backend', 'torch'),
+                    'dimension': vectors.shape[1],
+                    'projection': bucket_metadata.get('projection'),
+                    'document_count': len(np.unique(bucket_store.document_ids()[bucket_ids])),
+                    'chunk_count': len(local_vector_ids),
+                    'index_type': index_type,
+                    'index_params': params,
+                    'compression': compression,
+                    'chunk_ids': True,
+                    'next_chunk_id': next_chunk_id,
+                    'log_generation': 0,
+                    # 버킷에 있는 동안 제외한 중복 청크 수를 이어받음
+                    'dedup_skipped': bucket_metadata.get('dedup_skipped_labels', {}).get(label, 0),
+                    # 강의 청크 ID를 그대로 쓰므로 청크 ID 세대도 이어받음
+                    'index_generation': self.bucket_registry.generation(course_id)
+                }
+                self.index_cache.invalidate(course_id)
+                self._delete_vector_logs(course_id)
+                self.save_course_index(course_id, index, metadata)
+                
+                # 버킷에서 강의 청크 삭제 표시 후 배치 기록 삭제
+                bucket_metadata = self._load_metadata(bucket_key)
+                bucket_metadata.get('dedup_skipped_labels', {}).pop(label, None)
+                self._remove_chunks(bucket_key, bucket_metadata, bucket_store, bucket_ids)
+                self.bucket_registry.remove(course_id)
+            
+            self._schedule_compaction(bucket_key, bucket_metadata)
+            
+            logger.info(f"공유 버킷 강의를 전용 인덱스로 이동: {course_id} ({bucket_key}), 청크 수: {len(local_ids)}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"전용 인덱스 이동 중 오류 발생: {str(e)}")
+            raise
+    
     def delete_course_index(self, course_id: str) -> bool:
         """
         강의 인덱스 삭제
@@ -332,18 +2124,32 @@ class FAISSVectorManager:
             삭제 성공 여부
         """
         try:
-            index_path = self.base_path / f"course_{course_id}.faiss"
-            metadata_path = self.base_path / f"course_{course_id}_metadata.pkl"
+            # 공유 버킷에 있는 강의는 버킷에서 강의 청크만 삭제 표시
+            deleted = self._delete_from_bucket(course_id)
             
-            deleted = False
-            
-            if index_path.exists():
-                os.remove(index_path)
-                deleted = True
-            
-            if metadata_path.exists():
-                os.remove(metadata_path)
-                deleted = True
+            with get_course_lock(course_id):
+                index_path = self.base_path / f"course_{course_id}.faiss"
+                metadata_path = self.base_path / f"course_{course_id}_metadata.pkl"
+                raw_vectors_paths = [self._raw_vectors_path(course_id, dtype) for dtype in (np.float32, np.float16)]
+                
+                self.index_cache.invalidate(course_id)
+                
+                if index_path.exists():
+                    os.remove(index_path)
+                    deleted = True
+                
+                for raw_vectors_path in raw_vectors_paths:
+                    if raw_vectors_path.exists():
+                        os.remove(raw_vectors_path)
+                
+                self._delete_vector_logs(course_id)
+                
+                if self._chunk_store(course_id).delete():
+                    deleted = True
+                
+                if metadata_path.exists():
+                    os.remove(metadata_path)
+                    deleted = True
             
             if deleted:
                 logger.info(f"인덱스 삭제 완료: {course_id}")
@@ -354,6 +2160,39 @@ class FAISSVectorManager:
             logger.error(f"인덱스 삭제 중 오류 발생: {str(e)}")
             return False
     
+    def _delete_from_bucket(self, course_id: str) -> bool:
+        """
+        공유 버킷에서 강의 청크를 삭제 표시하고 배치 기록 삭제
+        Args:
+            course_id: 강의 ID
+        Returns:
+            버킷에 있던 강의인지 여부
+        """
+        placement = self.bucket_registry.get(course_id)
+        if placement is None:
+            return False
+        
+        bucket_key, label = placement
+        with get_course_lock(bucket_key):
+            try:
+                metadata = self._prepare_write(bucket_key, create=False)
+            except FileNotFoundError:
+                metadata = None
+            
+            if metadata is not None:
+                metadata.get('dedup_skipped_labels', {}).pop(label, None)
+                chunk_store = self._chunk_store(bucket_key)
+                chunk_ids = chunk_store.live_ids(metadata['next_chunk_id'], label)
+                if len(chunk_ids):
+                    self._remove_chunks(bucket_key, metadata, chunk_store, chunk_ids)
+                else:
+                    self._commit_metadata(bucket_key, metadata)
+            self.bucket_registry.remove(course_id)
+        
+        if metadata is not None:
+            self._schedule_compaction(bucket_key, metadata)
+        return True
+    
     def rebuild_course_index(self, course_id: str, documents: List[Dict]) -> bool:
         """
         강의 인덱스 재구축
@@ -367,10 +2206,7 @@ class FAISSVectorManager:
             # 기존 인덱스 삭제
             self.delete_course_index(course_id)
             
-            # 새 인덱스 생성
-            self.create_course_index(course_id)
-            
-            # 문서 추가
+            # 문서 추가 (인덱스는 청크 수에 맞게 공유 버킷 또는 전용 인덱스로 새로 생성)
             chunk_count = self.add_documents_to_index(course_id, documents)
             
             logger.info(f"인덱스 재구축 완료: {course_id}, 청크 수: {chunk_count}")
@@ -0,0 +1,176 @@
+import threading
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Any
+
+logger = logging.getLogger(__name__)
+
+# 기본 캐시 메모리 예산 (512MB)
+DEFAULT_CACHE_BYTES = 512 * 1024 * 1024
+
+
+class CourseIndexCache:
+    """프로세스 전역 강의 인덱스 캐시 (메모리 예산 기반 LRU)"""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        초기화
+        Args:
+            max_bytes: 캐시에 보관할 최대 바이트 수
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def file_signature(*paths: Path) -> Optional[Tuple]:
+        """
+        파일 변경 감지용 시그니처 (mtime, 크기)
+        Args:
+            paths: 대상 파일 경로들
+        Returns:
+            시그니처 튜플 (파일이 하나라도 없으면 None)
+        """
+        signature = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return None
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def get(self, key: str, signature: Tuple) -> Optional[Tuple[Any, Dict]]:
+        """
+        캐시 조회
+        Args:
+            key: 캐시 키 (강의 ID)
+            signature: 현재 파일 시그니처
+        Returns:
+            (인덱스, 메타데이터) 또는 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            # 파일이 바뀌었으면 무효화
+            if entry['signature'] != signature:
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['index'], entry['metadata']
+
+    def peek(self, key: str) -> Optional[Tuple[Any, Dict]]:
+        """
+        시그니처 확인 없이 캐시 항목 조회 (파일이 바뀐 뒤 이전 항목을 재사용할 때)
+        Args:
+            key: 캐시 키 (강의 ID)
+        Returns:
+            (인덱스, 메타데이터) 또는 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return entry['index'], entry['metadata']
+
+    def put(self, key: str, signature: Tuple, index: Any, metadata: Dict, size_bytes: int):
+        """
+        캐시 저장
+        Args:
+            key: 캐시 키 (강의 ID)
+            signature: 파일 시그니처
+            index: FAISS 인덱스
+            metadata: 메타데이터
+            size_bytes: 메모리 사용량 추정치
+        """
+        if size_bytes > self.max_bytes:
+            logger.info(f"캐시 예산 초과로 캐시하지 않음: {key} ({size_bytes} bytes)")
+            return
+
+        version = metadata.get('version', 0)
+
+        with self._lock:
+            existing = self._entries.get(key)
+            # 더 새로운 버전이 이미 캐시되어 있으면 덮어쓰지 않음
+            if existing is not None and existing['version'] > version:
+                return
+            if existing is not None:
+                self._remove(key)
+
+            self._entries[key] = {
+                'signature': signature,
+                'version': version,
+                'index': index,
+                'metadata': metadata,
+                'size_bytes': size_bytes
+            }
+            self._current_bytes += size_bytes
+            self._evict()
+
+    def invalidate(self, key: str):
+        """
+        캐시 항목 무효화
+        Args:
+            key: 캐시 키 (강의 ID)
+        """
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """캐시 전체 비우기"""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """캐시 통계 조회"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'current_mb': self._current_bytes / (1024 * 1024),
+                'max_mb': self.max_bytes / (1024 * 1024),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0
+            }
+
+    def _remove(self, key: str):
+        """항목 제거 (락을 잡은 상태에서 호출)"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._current_bytes -= entry['size_bytes']
+
+    def _evict(self):
+        """메모리 예산을 넘으면 오래된 항목부터 제거 (락을 잡은 상태에서 호출)"""
+        while self._current_bytes > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            self._current_bytes -= entry['size_bytes']
+            self.evictions += 1
+            logger.info(f"인덱스 캐시 제거: {key}")
+
+
+_shared_cache: Optional[CourseIndexCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_course_index_cache() -> CourseIndexCache:
+    """프로세스 전역 공유 캐시 인스턴스 반환"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = CourseIndexCache()
+    return _shared_cache
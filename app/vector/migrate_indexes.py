@@ -0,0 +1,52 @@
+"""
+기존 강의 인덱스(.faiss)를 압축(PQ/OPQ) 또는 이진 인덱스로 제자리 변환하는 스크립트
+
+사용법 (저장소 루트에서 실행):
+    python app/vector/migrate_indexes.py --compression opq
+    python app/vector/migrate_indexes.py --compression binary
+    python app/vector/migrate_indexes.py --compression pq --course-id <강의 ID>
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# 현재 디렉토리를 sys.path에 추가
+current_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(current_dir))
+
+from vector.faiss_manager import FAISSVectorManager
+
+logger = logging.getLogger(__name__)
+
+
+def find_course_ids(base_path: Path) -> list:
+    """인덱스 디렉토리에서 강의 ID 목록 추출"""
+    return sorted(path.stem[len("course_"):] for path in base_path.glob("course_*.faiss"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="강의 인덱스 압축 변환")
+    parser.add_argument('--compression', choices=['pq', 'opq', 'binary'], default='pq', help="압축 모드")
+    parser.add_argument('--course-id', help="변환할 강의 ID (생략하면 전체)")
+    parser.add_argument('--pq-m', type=int, default=48, help="PQ 서브 벡터 수")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    manager = FAISSVectorManager(compression=args.compression, pq_m=args.pq_m)
+    course_ids = [args.course_id] if args.course_id else find_course_ids(manager.base_path)
+
+    converted = 0
+    for course_id in course_ids:
+        try:
+            if manager.compress_course_index(course_id, args.compression):
+                converted += 1
+        except Exception as e:
+            logger.error(f"인덱스 변환 중 오류 발생: {course_id} - {str(e)}")
+
+    logger.info(f"인덱스 변환 완료: {converted}/{len(course_ids)}개")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import re
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# sentence-transformers는 모델을 실제로 로드할 때만 필요 (인코딩을 주입한 레지스트리는 없어도 동작)
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SentenceTransformer = None
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+# ONNX int8 백엔드 (선택)
+try:
+    import onnxruntime  # noqa: F401
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# 지원하는 임베딩 백엔드
+EMBEDDING_BACKENDS = ('torch', 'onnx-int8')
+
+
+class EmbeddingModelRegistry:
+    """
+    프로세스 전역 임베딩 모델 레지스트리
+
+    모델은 (이름, 백엔드)별로 한 번만, 실제로 인코딩하거나 차원이 필요할 때 로드한다.
+    토크나이저는 동시 호출에 안전하지 않으므로 모델별 락으로 인코딩을 직렬화한다.
+        torch     : PyTorch SentenceTransformer
+        onnx-int8 : ONNX로 내보낸 뒤 동적 int8 양자화한 모델 (onnxruntime 필요)
+    """
+
+    def __init__(self, onnx_dir: Path = None, onnx_quantization: str = 'avx2'):
+        """
+        초기화
+        Args:
+            onnx_dir: 양자화한 ONNX 모델을 저장할 디렉토리
+            onnx_quantization: 동적 양자화 설정 ('arm64', 'avx2', 'avx512', 'avx512_vnni')
+        """
+        self.onnx_dir = Path(onnx_dir or "app/vector/data/onnx_models")
+        self.onnx_quantization = onnx_quantization
+        self._models: Dict[str, SentenceTransformer] = {}
+        self._model_locks: Dict[str, threading.Lock] = {}
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def model_key(model_name: str, backend: str = 'torch') -> str:
+        """
+        모델 식별 키 (캐시 키로도 사용)
+        Args:
+            model_name: 임베딩 모델명
+            backend: 임베딩 백엔드
+        Returns:
+            torch 백엔드는 모델명, 그 외는 '모델명@백엔드'
+        """
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"지원되지 않는 임베딩 백엔드: {backend}")
+        return model_name if backend == 'torch' else f"{model_name}@{backend}"
+
+    def _model_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            if key not in self._model_locks:
+                self._model_locks[key] = threading.Lock()
+            return self._model_locks[key]
+
+    def get(self, model_name: str, backend: str = 'torch') -> SentenceTransformer:
+        """
+        모델 반환 (처음 호출할 때 로드)
+        Args:
+            model_name: 임베딩 모델명
+            backend: 임베딩 백엔드
+        Returns:
+            SentenceTransformer 모델
+        """
+        key = self.model_key(model_name, backend)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise ImportError("sentence-transformers 라이브러리가 설치되지 않았습니다.")
+
+        with self._model_lock(key):
+            # 다른 스레드가 먼저 로드했으면 그대로 사용
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            logger.info(f"임베딩 모델 로드 시작: {key}")
+            start_time = time.time()
+            if backend == 'onnx-int8':
+                model = self._load_onnx_int8(model_name)
+            else:
+                model = SentenceTransformer(model_name)
+            load_time = time.time() - start_time
+
+            memory_bytes = self._model_memory_bytes(model)
+
+            with self._lock:
+                self._stats[key] = {
+                    'backend': backend,
+                    'load_time': load_time,
+                    'memory_mb': memory_bytes / (1024 * 1024),
+                    'dimension': model.get_sentence_embedding_dimension(),
+                    'encode_calls': 0,
+                    'encoded_texts': 0
+                }
+                self._models[key] = model
+
+            logger.info(f"임베딩 모델 로드 완료: {key}, "
+                        f"{load_time:.2f}초, {memory_bytes / (1024 * 1024):.1f}MB")
+            return model
+
+    def _load_onnx_int8(self, model_name: str) -> SentenceTransformer:
+        """
+        동적 int8 양자화 ONNX 모델 로드 (처음이면 내보내고 양자화해서 저장)
+        Args:
+            model_name: 임베딩 모델명
+        Returns:
+            ONNX 백엔드 SentenceTransformer 모델
+        """
+        if not ONNX_AVAILABLE:
+            raise ImportError("ONNX 백엔드 라이브러리가 설치되지 않았습니다. (sentence-transformers[onnx])")
+
+        model_dir = self.onnx_dir / re.sub(r'[^A-Za-z0-9._-]', '_', model_name)
+        file_name = f"onnx/model_qint8_{self.onnx_quantization}.onnx"
+
+        if not (model_dir / file_name).exists():
+            logger.info(f"ONNX 모델 내보내기 및 int8 양자화: {model_name} -> {model_dir}")
+            onnx_model = SentenceTransformer(model_name, backend='onnx')
+            onnx_model.save_pretrained(str(model_dir))
+            export_dynamic_quantized_onnx_model(onnx_model, self.onnx_quantization, str(model_dir))
+
+        return SentenceTransformer(str(model_dir), backend='onnx', model_kwargs={'file_name': file_name})
+
+    @staticmethod
+    def _model_memory_bytes(model) -> int:
+        """모델 파라미터와 버퍼의 메모리 사용량 (torch 모듈이 아니면 0)"""
+        if not hasattr(model, 'parameters'):
+            return 0
+        tensors = list(model.parameters()) + list(model.buffers())
+        return sum(tensor.numel() * tensor.element_size() for tensor in tensors)
+
+    def is_loaded(self, model_name: str, backend: str = 'torch') -> bool:
+        """모델 로드 여부"""
+        return self.model_key(model_name, backend) in self._models
+
+    def get_dimension(self, model_name: str, backend: str = 'torch') -> int:
+        """
+        임베딩 차원 조회
+        Args:
+            model_name: 임베딩 모델명
+            backend: 임베딩 백엔드
+        Returns:
+            임베딩 차원
+        """
+        return self.get(model_name, backend).get_sentence_embedding_dimension()
+
+    def encode(self, model_name: str, texts: List[str], backend: str = 'torch', **kwargs) -> np.ndarray:
+        """
+        텍스트 인코딩 (모델별로 직렬화)
+        Args:
+            model_name: 임베딩 모델명
+            texts: 인코딩할 텍스트 리스트
+            backend: 임베딩 백엔드
+            kwargs: SentenceTransformer.encode 인자
+        Returns:
+            임베딩 행렬
+        """
+        key = self.model_key(model_name, backend)
+        model = self.get(model_name, backend)
+        kwargs.setdefault('convert_to_tensor', False)
+
+        with self._model_lock(key):
+            embeddings = model.encode(texts, **kwargs)
+
+        with self._lock:
+            self._stats[key]['encode_calls'] += 1
+            self._stats[key]['encoded_texts'] += len(texts)
+
+        return embeddings
+
+    def get_stats(self, key: str = None) -> Dict:
+        """
+        로드된 모델 통계 (로드 시간, 메모리, 인코딩 횟수)
+        Args:
+            key: 모델 키 (None이면 전체)
+        Returns:
+            모델 키별 통계
+        """
+        with self._lock:
+            if key is not None:
+                return dict(self._stats.get(key, {}))
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+_shared_registry: Optional[EmbeddingModelRegistry] = None
+_shared_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> EmbeddingModelRegistry:
+    """프로세스 전역 모델 레지스트리 인스턴스 반환"""
+    global _shared_registry
+    if _shared_registry is None:
+        with _shared_registry_lock:
+            if _shared_registry is None:
+                _shared_registry = EmbeddingModelRegistry()
+    return _shared_registry
@@ -0,0 +1,106 @@
+import re
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+
+class DimensionProjection:
+    """
+    임베딩 차원 축소 투영 (PCA 또는 Matryoshka 앞부분 자르기)
+
+    투영 후 다시 정규화하므로 축소된 벡터끼리의 내적이 원래 코사인 유사도의 근사값이 된다.
+    PCA는 평균을 빼지 않는 주성분(2차 모멘트 행렬의 고유벡터)을 써서 내적 자체를 가장 잘 보존하도록 한다
+    (평균을 빼면 유사도 값이 전체적으로 낮아져 min_similarity 기준이 달라짐).
+    Matryoshka 방식은 앞쪽 차원에 정보가 모이도록 학습된 모델에서만 의미가 있다.
+    """
+
+    METHODS = ('pca', 'matryoshka')
+
+    # PCA 학습에 쓰는 최대 벡터 수
+    TRAIN_SAMPLE = 100000
+
+    def __init__(self, matrix: np.ndarray, method: str = 'pca', explained_variance: float = None):
+        """
+        초기화
+        Args:
+            matrix: (원래 차원, 축소 차원) 투영 행렬
+            method: 투영 방식 ('pca' 또는 'matryoshka')
+            explained_variance: 축소 후 남는 2차 모멘트 비율 (PCA만)
+        """
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.method = method
+        self.explained_variance = explained_variance
+
+    @property
+    def input_dimension(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def output_dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, dimension: int, method: str = 'pca',
+              seed: int = 0) -> "DimensionProjection":
+        """
+        투영 학습
+        Args:
+            vectors: 정규화된 임베딩 행렬
+            dimension: 축소 차원
+            method: 투영 방식 ('pca' 또는 'matryoshka')
+            seed: 학습 표본 추출 시드
+        Returns:
+            차원 축소 투영
+        """
+        if method not in cls.METHODS:
+            raise ValueError(f"지원되지 않는 차원 축소 방식: {method}")
+        input_dimension = vectors.shape[1]
+        if not 0 < dimension < input_dimension:
+            raise ValueError(f"축소 차원은 1 이상 {input_dimension} 미만이어야 합니다: {dimension}")
+
+        if method == 'matryoshka':
+            return cls(np.eye(input_dimension, dimension, dtype=np.float32), method)
+
+        if len(vectors) < dimension:
+            raise ValueError(f"PCA 학습에 벡터 수가 부족합니다: {len(vectors)} < {dimension}")
+        if len(vectors) > cls.TRAIN_SAMPLE:
+            rng = np.random.RandomState(seed)
+            vectors = vectors[np.sort(rng.choice(len(vectors), cls.TRAIN_SAMPLE, replace=False))]
+
+        sample = np.asarray(vectors, dtype=np.float64)
+        moment = sample.T @ sample / len(sample)
+        eigenvalues, eigenvectors = np.linalg.eigh(moment)
+        order = np.argsort(eigenvalues)[::-1][:dimension]
+        explained = float(eigenvalues[order].sum() / max(eigenvalues.sum(), 1e-12))
+        return cls(eigenvectors[:, order], method, explained)
+
+    def apply(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        벡터 투영 후 정규화
+        Args:
+            vectors: (N, 원래 차원) 정규화된 임베딩
+        Returns:
+            (N, 축소 차원) 정규화된 float32 임베딩
+        """
+        projected = np.asarray(vectors, dtype=np.float32) @ self.matrix
+        norms = np.linalg.norm(projected, axis=1, keepdims=True)
+        return np.ascontiguousarray(projected / np.maximum(norms, 1e-12), dtype=np.float32)
+
+    @staticmethod
+    def file_name(model_key: str, method: str, dimension: int) -> str:
+        """모델별 투영 파일 이름"""
+        return re.sub(r'[^A-Za-z0-9._@-]', '_', f"{model_key}_{method}{dimension}") + ".npz"
+
+    def write(self, path: Path):
+        """투영 파일 저장"""
+        with open(path, 'wb') as f:
+            np.savez(f, matrix=self.matrix, method=self.method,
+                     explained_variance=np.nan if self.explained_variance is None else self.explained_variance)
+
+    @classmethod
+    def read(cls, path: Path) -> "DimensionProjection":
+        """투영 파일 읽기"""
+        with np.load(path) as data:
+            explained: Optional[float] = float(data['explained_variance'])
+            return cls(data['matrix'], str(data['method']), None if np.isnan(explained) else explained)
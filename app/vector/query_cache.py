@@ -0,0 +1,102 @@
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 기본 최대 쿼리 수 (384차원 float32 기준 약 6MB)
+DEFAULT_MAX_QUERIES = 4096
+
+
+class QueryEmbeddingCache:
+    """프로세스 전역 쿼리 임베딩 캐시 (쿼리 수 기반 LRU)"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_QUERIES):
+        """
+        초기화
+        Args:
+            max_entries: 캐시에 보관할 최대 쿼리 수
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_name: str, query: str) -> Optional[np.ndarray]:
+        """
+        캐시 조회
+        Args:
+            model_name: 임베딩 모델명
+            query: 정규화된 쿼리
+        Returns:
+            정규화된 임베딩 (읽기 전용) 또는 None
+        """
+        key = (model_name, query)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, model_name: str, query: str, embedding: np.ndarray):
+        """
+        캐시 저장
+        Args:
+            model_name: 임베딩 모델명
+            query: 정규화된 쿼리
+            embedding: 정규화된 임베딩
+        """
+        if self.max_entries <= 0:
+            return
+
+        # 여러 호출자가 공유하므로 수정할 수 없게 복사본 저장
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+
+        with self._lock:
+            self._entries[(model_name, query)] = embedding
+            self._entries.move_to_end((model_name, query))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """캐시 전체 비우기"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """캐시 통계 조회"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0
+            }
+
+
+_shared_cache: Optional[QueryEmbeddingCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """프로세스 전역 공유 쿼리 캐시 인스턴스 반환"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = QueryEmbeddingCache()
+    return _shared_cache
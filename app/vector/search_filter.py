@@ -0,0 +1,125 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 검색 필터 키 (청크 메타데이터 컬럼 기준)
+FILTER_KEYS = ('file_type', 'uploader', 'uploaded_after', 'uploaded_before')
+
+# 확장자가 없는 메타데이터용 MIME 타입 -> 파일 형식
+MIME_FILE_TYPES = {
+    'application/pdf': 'pdf',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
+    'application/msword': 'doc',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation': 'pptx',
+    'application/vnd.ms-powerpoint': 'ppt',
+    'text/plain': 'txt',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
+    'text/csv': 'csv',
+    'text/markdown': 'md',
+    'text/html': 'html'
+}
+
+
+def normalize_filters(filters: Optional[Dict]) -> Optional[Dict]:
+    """
+    검색 필터 정규화
+    Args:
+        filters: {'file_type': str 또는 리스트, 'uploader': str 또는 리스트,
+                  'uploaded_after': 날짜 (포함), 'uploaded_before': 날짜 (미포함)}
+    Returns:
+        정규화된 필터 (조건이 없으면 None)
+    """
+    if not filters:
+        return None
+
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"지원되지 않는 검색 필터: {', '.join(sorted(unknown))}")
+
+    normalized = {}
+    for key in ('file_type', 'uploader'):
+        values = filters.get(key)
+        if values:
+            if isinstance(values, str):
+                values = [values]
+            values = [str(value).strip() for value in values if str(value).strip()]
+            if key == 'file_type':
+                values = [value.lower().lstrip('.') for value in values]
+            if values:
+                normalized[key] = frozenset(values)
+
+    for key in ('uploaded_after', 'uploaded_before'):
+        if filters.get(key):
+            normalized[key] = _normalize_timestamp(filters[key])
+
+    return normalized or None
+
+
+def _normalize_timestamp(value) -> str:
+    """날짜/시각을 'YYYY-MM-DD HH:MM:SS' 형태의 비교 가능한 문자열로 변환 (SQLite CURRENT_TIMESTAMP 형식)"""
+    return str(value).strip().replace('T', ' ')
+
+
+def document_file_type(metadata: Dict) -> Optional[str]:
+    """
+    문서 메타데이터의 파일 형식 (pdf, docx, ...)
+    Args:
+        metadata: 문서 메타데이터 (filename, file_type)
+    Returns:
+        파일 형식 (알 수 없으면 None)
+    """
+    file_type = metadata.get('file_type')
+    if file_type and '/' not in str(file_type):
+        return str(file_type).lower().lstrip('.')
+
+    suffix = Path(str(metadata.get('filename') or '')).suffix.lower()
+    if suffix:
+        return suffix.lstrip('.')
+
+    return MIME_FILE_TYPES.get(file_type)
+
+
+def matches_filters(metadata: Dict, filters: Optional[Dict]) -> bool:
+    """
+    문서 메타데이터가 필터 조건을 모두 만족하는지 확인 (필터에 필요한 값이 없으면 제외)
+    Args:
+        metadata: 청크의 문서 메타데이터 또는 DB 문서 행
+        filters: normalize_filters로 정규화한 필터
+    Returns:
+        조건 만족 여부
+    """
+    if not filters:
+        return True
+
+    if 'file_type' in filters and document_file_type(metadata) not in filters['file_type']:
+        return False
+
+    if 'uploader' in filters:
+        uploader = metadata.get('uploader') or metadata.get('uploader_name')
+        if uploader not in filters['uploader']:
+            return False
+
+    if 'uploaded_after' in filters or 'uploaded_before' in filters:
+        uploaded_at = metadata.get('uploaded_at')
+        if not uploaded_at:
+            return False
+        uploaded_at = _normalize_timestamp(uploaded_at)
+        if 'uploaded_after' in filters and uploaded_at < filters['uploaded_after']:
+            return False
+        if 'uploaded_before' in filters and uploaded_at >= filters['uploaded_before']:
+            return False
+
+    return True
+
+
+def filter_documents(documents: List[Dict], filters: Optional[Dict]) -> List[Dict]:
+    """
+    DB 문서 목록에 필터 적용 (키워드 검색용)
+    Args:
+        documents: 강의 문서 목록
+        filters: normalize_filters로 정규화한 필터
+    Returns:
+        조건을 만족하는 문서 목록
+    """
+    if not filters:
+        return documents
+    return [doc for doc in documents if matches_filters(doc, filters)]
@@ -0,0 +1,326 @@
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from vector.vector_log import VectorLog
+from vector.binary_index import BinaryQuantizedIndex
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentedIndex:
+    """
+    검색용 강의 인덱스 (기본 세그먼트 + 델타 세그먼트)
+
+    기본 세그먼트는 마지막 체크포인트(.faiss)로 변경하지 않고, 그 이후 벡터 로그에 기록된
+    추가는 작은 Flat 델타 세그먼트에, 삭제는 기본 세그먼트용 삭제 표시(tombstone)에 반영한다.
+    검색은 두 세그먼트를 모두 검색해서 점수순으로 병합한다.
+    """
+
+    def __init__(self, base: faiss.Index, dimension: int, base_signature: Tuple = None):
+        """
+        초기화
+        Args:
+            base: 기본 세그먼트 (체크포인트 인덱스, 수정하지 않음)
+            dimension: 벡터 차원
+            base_signature: 기본 세그먼트 파일 시그니처 (재사용 여부 판단용)
+        """
+        self.base = base
+        self.dimension = dimension
+        self.base_signature = base_signature
+        self.delta = faiss.IndexIDMap2(faiss.IndexFlatIP(dimension))
+        self.tombstones = np.zeros(0, dtype=np.int64)
+        self.log_generation = None
+        self.log_end = 0
+
+    @property
+    def ntotal(self) -> int:
+        """검색 가능한 벡터 수"""
+        return self.base.ntotal - len(self.tombstones) + self.delta.ntotal
+
+    def clone(self) -> "SegmentedIndex":
+        """기본 세그먼트는 공유하고 델타와 삭제 표시만 복사"""
+        segments = SegmentedIndex(self.base, self.dimension, self.base_signature)
+        segments.delta = faiss.clone_index(self.delta)
+        segments.tombstones = self.tombstones.copy()
+        segments.log_generation = self.log_generation
+        segments.log_end = self.log_end
+        return segments
+
+    def replay(self, log: VectorLog, offset: int, base_ids: np.ndarray = None) -> int:
+        """
+        로그 레코드를 델타 세그먼트와 삭제 표시에 적용
+        Args:
+            log: 벡터 로그
+            offset: 읽기 시작 위치
+            base_ids: 기본 세그먼트의 ID 목록 (체크포인트와 로그가 겹칠 수 있을 때만 전달)
+        Returns:
+            적용한 레코드 수
+        """
+        replayed = 0
+        tombstones = [self.tombstones]
+        self.log_end = offset
+
+        for op, ids, vectors, end in log.records(offset):
+            if op == VectorLog.OP_ADD:
+                new = np.ones(len(ids), dtype=bool)
+                if base_ids is not None:
+                    new = ~np.isin(ids, base_ids)
+                if new.any():
+                    self.delta.add_with_ids(np.ascontiguousarray(vectors[new]), np.ascontiguousarray(ids[new]))
+            else:
+                # 델타에 있는 벡터는 바로 지우고, 나머지는 기본 세그먼트의 삭제 표시로 남김
+                in_delta = np.zeros(len(ids), dtype=bool)
+                if self.delta.ntotal > 0:
+                    in_delta = np.isin(ids, faiss.vector_to_array(self.delta.id_map))
+                    if in_delta.any():
+                        self.delta.remove_ids(np.ascontiguousarray(ids[in_delta]))
+                tombstones.append(ids[~in_delta])
+            self.log_end = end
+            replayed += 1
+
+        self.tombstones = np.unique(np.concatenate(tombstones)).astype(np.int64)
+        return replayed
+
+    def search(self, queries: np.ndarray, k: int,
+               selector: faiss.IDSelector = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        두 세그먼트를 검색해서 상위 k개 병합
+        Args:
+            queries: (쿼리 수, dimension) 정규화된 임베딩
+            k: 쿼리별 결과 수
+            selector: 검색할 청크 ID 선택자 (None이면 전체)
+        Returns:
+            (유사도, 청크 ID) 배열, 결과가 모자라면 ID는 -1
+        """
+        parts = []
+
+        if self.base.ntotal > 0:
+            # 삭제 표시된 벡터가 걸러져도 k개가 남도록 더 많이 검색
+            base_k = min(self.base.ntotal, k + len(self.tombstones))
+            if selector is None:
+                similarities, ids = self.base.search(queries, base_k)
+            else:
+                similarities, ids = self.base.search(queries, base_k, params=self._search_params(selector))
+            if len(self.tombstones):
+                deleted = np.isin(ids, self.tombstones)
+                similarities[deleted] = -np.inf
+                ids[deleted] = -1
+            parts.append((similarities, ids))
+
+        if self.delta.ntotal > 0:
+            delta_k = min(k, self.delta.ntotal)
+            if selector is None:
+                parts.append(self.delta.search(queries, delta_k))
+            else:
+                parts.append(self.delta.search(queries, delta_k, params=faiss.SearchParameters(sel=selector)))
+
+        if not parts:
+            return (np.full((len(queries), k), -np.inf, dtype=np.float32),
+                    np.full((len(queries), k), -1, dtype=np.int64))
+
+        similarities = np.concatenate([part[0] for part in parts], axis=1)
+        ids = np.concatenate([part[1] for part in parts], axis=1)
+        similarities[ids < 0] = -np.inf
+
+        if similarities.shape[1] < k:
+            pad = k - similarities.shape[1]
+            similarities = np.pad(similarities, ((0, 0), (0, pad)), constant_values=-np.inf)
+            ids = np.pad(ids, ((0, 0), (0, pad)), constant_values=-1)
+
+        order = np.argsort(-similarities, axis=1, kind='stable')[:, :k]
+        return np.take_along_axis(similarities, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+    def range_search(self, queries: np.ndarray, threshold: float,
+                     max_results: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        유사도가 threshold 이상인 청크를 쿼리마다 최대 max_results개 검색 (두 세그먼트 병합)
+        Args:
+            queries: (쿼리 수, dimension) 정규화된 임베딩
+            threshold: 최소 유사도
+            max_results: 쿼리별 최대 결과 수
+        Returns:
+            쿼리 순서대로 유사도 내림차순 (유사도, 청크 ID) 배열 쌍 (기준을 넘는 청크가 없으면 빈 배열)
+        """
+        # FAISS 내적 range_search는 radius보다 큰 결과만 반환하므로 기준값과 같은 유사도도 포함되도록 조정
+        radius = float(np.nextafter(np.float32(threshold), np.float32(-np.inf)))
+
+        parts = []
+        if self.base.ntotal > 0:
+            parts.append((self._range_search_segment(self.base, queries, radius, max_results + len(self.tombstones)),
+                          len(self.tombstones) > 0))
+        if self.delta.ntotal > 0:
+            parts.append((self._range_search_segment(self.delta, queries, radius, max_results), False))
+
+        results = []
+        for row in range(len(queries)):
+            similarities = [np.zeros(0, dtype=np.float32)]
+            ids = [np.zeros(0, dtype=np.int64)]
+            for (lims, part_similarities, part_ids), has_tombstones in parts:
+                row_similarities = part_similarities[lims[row]:lims[row + 1]]
+                row_ids = part_ids[lims[row]:lims[row + 1]]
+                if has_tombstones:
+                    live = ~np.isin(row_ids, self.tombstones)
+                    row_similarities, row_ids = row_similarities[live], row_ids[live]
+                similarities.append(row_similarities)
+                ids.append(row_ids)
+
+            similarities = np.concatenate(similarities)
+            ids = np.concatenate(ids)
+            order = np.argsort(-similarities, kind='stable')[:max_results]
+            results.append((similarities[order], ids[order]))
+
+        return results
+
+    def _range_search_segment(self, index, queries: np.ndarray, radius: float,
+                              fallback_k: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        한 세그먼트 range_search (지원하지 않는 인덱스는 상위 fallback_k개 검색 결과를 기준으로 자름)
+        Args:
+            index: 세그먼트 인덱스
+            queries: (쿼리 수, dimension) 정규화된 임베딩
+            radius: 이 값보다 유사도가 큰 결과만 반환
+            fallback_k: range_search를 지원하지 않을 때 검색할 후보 수
+        Returns:
+            FAISS range_search 형식의 (lims, 유사도, 청크 ID)
+        """
+        if not isinstance(index, BinaryQuantizedIndex):
+            try:
+                return index.range_search(queries, radius)
+            except RuntimeError as e:
+                logger.debug(f"range_search 미지원 인덱스, 상위 k 검색으로 대체: {str(e)}")
+
+        similarities, ids = index.search(queries, min(index.ntotal, fallback_k))
+        keep = (ids >= 0) & (similarities > radius)
+        lims = np.concatenate([[0], np.cumsum(keep.sum(axis=1))]).astype(np.int64)
+        return lims, similarities[keep], ids[keep]
+
+    def _search_params(self, selector: faiss.IDSelector) -> faiss.SearchParameters:
+        """
+        기본 세그먼트 검색 파라미터 (선택자와 함께 넘기면 인덱스의 nprobe/efSearch 대신 쓰이므로 현재 값을 복사)
+        Args:
+            selector: 청크 ID 선택자
+        Returns:
+            인덱스 타입에 맞는 검색 파라미터
+        """
+        if isinstance(self.base, BinaryQuantizedIndex):
+            return self.base.search_params(selector)
+
+        ivf_index = faiss.try_extract_index_ivf(self.base)
+        if ivf_index is not None:
+            return faiss.SearchParametersIVF(sel=selector, nprobe=ivf_index.nprobe)
+
+        index = faiss.downcast_index(self.base)
+        if isinstance(index, faiss.IndexIDMap2):
+            index = faiss.downcast_index(index.index)
+        if hasattr(index, 'hnsw'):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+
+        return faiss.SearchParameters(sel=selector)
+
+    def reconstruct_batch(self, ids: np.ndarray) -> np.ndarray:
+        """
+        청크 ID의 벡터 복원 (델타에 있으면 델타, 나머지는 기본 세그먼트에서)
+        Args:
+            ids: 청크 ID 배열 (삭제되지 않은 ID)
+        Returns:
+            (ID 수, dimension) 벡터
+        """
+        ids = np.ascontiguousarray(ids, dtype=np.int64)
+        vectors = np.zeros((len(ids), self.dimension), dtype=np.float32)
+
+        in_delta = np.zeros(len(ids), dtype=bool)
+        if self.delta.ntotal > 0:
+            in_delta = np.isin(ids, faiss.vector_to_array(self.delta.id_map))
+            if in_delta.any():
+                vectors[in_delta] = self.delta.reconstruct_batch(np.ascontiguousarray(ids[in_delta]))
+        if (~in_delta).any():
+            vectors[~in_delta] = self.base.reconstruct_batch(np.ascontiguousarray(ids[~in_delta]))
+        return vectors
+
+    def memory_bytes(self) -> int:
+        """델타 세그먼트와 삭제 표시의 메모리 사용량"""
+        return self.delta.ntotal * (self.dimension * 4 + 8) + self.tombstones.nbytes
+
+
+_course_locks: Dict[str, threading.RLock] = {}
+_course_locks_lock = threading.Lock()
+
+
+def get_course_lock(course_id: str) -> threading.RLock:
+    """
+    강의별 쓰기 락 (프로세스 내 모든 매니저가 공유)
+    문서 추가/삭제와 세그먼트 병합(compaction)이 같은 강의의 로그와 메타데이터를 동시에 바꾸지 않도록 한다.
+    """
+    with _course_locks_lock:
+        if course_id not in _course_locks:
+            _course_locks[course_id] = threading.RLock()
+        return _course_locks[course_id]
+
+
+class CompactionScheduler:
+    """백그라운드 세그먼트 병합 작업자 (강의별로 한 번에 하나만 예약)"""
+
+    def __init__(self):
+        """초기화"""
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, course_id: str, compact_fn: Callable[[str], bool]) -> bool:
+        """
+        병합 예약
+        Args:
+            course_id: 강의 ID
+            compact_fn: 강의 ID를 받아 병합하는 함수
+        Returns:
+            새로 예약했는지 여부 (이미 예약되어 있으면 False)
+        """
+        with self._lock:
+            if course_id in self._pending:
+                return False
+            self._pending.add(course_id)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="index-compaction")
+
+        def run():
+            try:
+                compact_fn(course_id)
+            except Exception as e:
+                logger.error(f"세그먼트 병합 중 오류 발생: {course_id} - {str(e)}")
+            finally:
+                with self._lock:
+                    self._pending.discard(course_id)
+
+        self._executor.submit(run)
+        return True
+
+    def is_pending(self, course_id: str) -> bool:
+        """병합 예약 여부"""
+        with self._lock:
+            return course_id in self._pending
+
+    def wait(self):
+        """예약된 병합이 모두 끝날 때까지 대기"""
+        with self._lock:
+            executor = self._executor
+        if executor is not None:
+            executor.submit(lambda: None).result()
+
+
+_shared_scheduler: Optional[CompactionScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_compaction_scheduler() -> CompactionScheduler:
+    """프로세스 전역 병합 작업자 반환"""
+    global _shared_scheduler
+    if _shared_scheduler is None:
+        with _shared_scheduler_lock:
+            if _shared_scheduler is None:
+                _shared_scheduler = CompactionScheduler()
+    return _shared_scheduler
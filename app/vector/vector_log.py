@@ -0,0 +1,176 @@
+import os
+import struct
+import zlib
+import logging
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VectorLog:
+    """
+    강의 인덱스 변경 로그 (추가만 하는 파일)
+
+    마지막 체크포인트(.faiss) 이후의 벡터 추가/삭제를 레코드 단위로 기록한다.
+    레코드마다 fsync하고, 로드할 때 체크포인트 위에 순서대로 재생한다.
+    레코드 형식:
+        헤더   : 매직(4) + 연산(1) + 개수(4) + 페이로드 CRC32(4)
+        페이로드: 청크 ID (int64 x 개수) [+ 벡터 (float32 x 개수 x dimension)]
+    끝이 잘리거나 CRC가 맞지 않는 레코드부터는 무시하고, 다음 추가 때 잘라낸다.
+    레코드를 쓴 뒤 메타데이터에 확정된 끝 위치(committed_end)를 저장하므로, 기록 후 확정 전에
+    중단된 레코드(청크 ID가 아직 next_chunk_id에 반영되지 않음)도 재생하지 않고 다음 추가 때 잘라낸다.
+    """
+
+    MAGIC = b'VLOG'
+    HEADER = struct.Struct('<4sBII')
+
+    OP_ADD = 1
+    OP_REMOVE = 2
+
+    def __init__(self, path: Path, dimension: int, committed_end: int = None):
+        """
+        초기화
+        Args:
+            path: 로그 파일 경로
+            dimension: 벡터 차원
+            committed_end: 메타데이터에 확정된 로그 끝 위치 (None이면 파일의 온전한 레코드 전체를 사용, 예전 메타데이터)
+        """
+        self.path = Path(path)
+        self.dimension = dimension
+        self.committed_end = committed_end
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def size(self) -> int:
+        """로그 파일 크기 (바이트)"""
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def end(self) -> int:
+        """재생할 로그의 끝 위치 (확정된 끝 위치, 없으면 파일 크기)"""
+        if self.committed_end is not None:
+            return min(self.committed_end, self.size())
+        return self.size()
+
+    def append_add(self, ids: np.ndarray, vectors: np.ndarray) -> int:
+        """
+        벡터 추가 레코드 기록
+        Args:
+            ids: 청크 ID 배열
+            vectors: 정규화된 임베딩 행렬
+        Returns:
+            레코드 끝 위치 (메타데이터의 확정된 끝 위치로 저장)
+        """
+        payload = np.ascontiguousarray(ids, dtype=np.int64).tobytes() + \
+            np.ascontiguousarray(vectors, dtype=np.float32).tobytes()
+        return self._append(self.OP_ADD, len(ids), payload)
+
+    def append_remove(self, ids: np.ndarray) -> int:
+        """
+        벡터 삭제 레코드 기록
+        Args:
+            ids: 삭제할 청크 ID 배열
+        Returns:
+            레코드 끝 위치 (메타데이터의 확정된 끝 위치로 저장)
+        """
+        payload = np.ascontiguousarray(ids, dtype=np.int64).tobytes()
+        return self._append(self.OP_REMOVE, len(ids), payload)
+
+    def _append(self, op: int, count: int, payload: bytes) -> int:
+        """레코드 기록 (앞선 쓰기가 중간에 끊겼거나 확정되지 않았으면 확정된 끝에서 잘라낸 뒤 기록)"""
+        end = self.valid_end()
+        if self.committed_end is not None:
+            end = min(end, self.committed_end)
+        header = self.HEADER.pack(self.MAGIC, op, count, zlib.crc32(payload))
+        with open(self.path, 'ab') as f:
+            if f.tell() != end:
+                f.truncate(end)
+            f.write(header + payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self.committed_end = end + len(header) + len(payload)
+        return self.committed_end
+
+    def _payload_size(self, op: int, count: int) -> int:
+        size = count * 8
+        if op == self.OP_ADD:
+            size += count * self.dimension * 4
+        return size
+
+    def records(self, offset: int = 0) -> Iterator[Tuple[int, np.ndarray, Optional[np.ndarray], int]]:
+        """
+        레코드 읽기 (확정된 끝 위치까지만)
+        Args:
+            offset: 읽기 시작 위치 (바이트)
+        Returns:
+            (연산, 청크 ID, 벡터 또는 None, 레코드 끝 위치) 이터레이터
+        """
+        if not self.path.exists():
+            return
+
+        end = self.end()
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            position = offset
+            while position < end:
+                header = f.read(self.HEADER.size)
+                if len(header) < self.HEADER.size:
+                    break
+                magic, op, count, crc = self.HEADER.unpack(header)
+                if magic != self.MAGIC or op not in (self.OP_ADD, self.OP_REMOVE):
+                    logger.warning(f"벡터 로그 손상 레코드 무시: {self.path} @ {position}")
+                    break
+
+                payload = f.read(self._payload_size(op, count))
+                if len(payload) < self._payload_size(op, count) or zlib.crc32(payload) != crc:
+                    logger.warning(f"벡터 로그 미완료 레코드 무시: {self.path} @ {position}")
+                    break
+
+                ids = np.frombuffer(payload, dtype=np.int64, count=count)
+                vectors = None
+                if op == self.OP_ADD:
+                    vectors = np.frombuffer(payload, dtype=np.float32, offset=count * 8)
+                    vectors = vectors.reshape(count, self.dimension)
+
+                position += self.HEADER.size + len(payload)
+                yield op, ids, vectors, position
+
+    def valid_end(self) -> int:
+        """
+        마지막 온전한 레코드의 끝 위치
+        기록은 항상 끝에만 하므로 헤더만 따라가고 CRC는 마지막 레코드만 확인
+        """
+        size = self.size()
+        if size == 0:
+            return 0
+
+        with open(self.path, 'rb') as f:
+            position = 0
+            last = None
+            while position + self.HEADER.size <= size:
+                f.seek(position)
+                magic, op, count, crc = self.HEADER.unpack(f.read(self.HEADER.size))
+                if magic != self.MAGIC or op not in (self.OP_ADD, self.OP_REMOVE):
+                    break
+                end = position + self.HEADER.size + self._payload_size(op, count)
+                if end > size:
+                    break
+                last = (position, end, op, count, crc)
+                position = end
+
+            if last is not None:
+                start, end, op, count, crc = last
+                f.seek(start + self.HEADER.size)
+                if zlib.crc32(f.read(end - start - self.HEADER.size)) != crc:
+                    return start
+        return position
+
+    def delete(self) -> bool:
+        """로그 파일 삭제"""
+        if not self.path.exists():
+            return False
+        os.remove(self.path)
+        return True
@@ -0,0 +1,59 @@
+"""
+테스트 공용 픽스처
+
+실행 (저장소 루트에서):
+    python -m pytest -q tests
+"""
+import hashlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+
+# app 디렉토리를 sys.path에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from vector.faiss_manager import FAISSVectorManager
+from vector.index_cache import CourseIndexCache
+from vector.model_registry import EmbeddingModelRegistry
+
+
+class HashingModelRegistry(EmbeddingModelRegistry):
+    """모델을 로드하지 않고 단어 해시로 임베딩하는 테스트용 레지스트리"""
+
+    DIMENSION = 64
+
+    def get_dimension(self, model_name: str, backend: str = 'torch') -> int:
+        return self.DIMENSION
+
+    def encode(self, model_name, texts, backend='torch', **kwargs) -> np.ndarray:
+        embeddings = np.full((len(texts), self.DIMENSION), 0.01, dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split():
+                embeddings[row, int(hashlib.md5(word.encode('utf-8')).hexdigest(), 16) % self.DIMENSION] += 1
+        return embeddings
+
+
+def make_document(document_id: str, texts):
+    """청크를 미리 나눈 문서"""
+    return {
+        'id': document_id,
+        'text': ' '.join(texts),
+        'metadata': {'filename': f"{document_id}.pdf"},
+        'chunks': [{'document_id': document_id, 'chunk_index': i, 'text': text} for i, text in enumerate(texts)]
+    }
+
+
+@pytest.fixture
+def make_manager(tmp_path, monkeypatch):
+    """임시 디렉토리를 데이터 경로로 쓰는 매니저 생성 함수 (호출할 때마다 새 캐시 = 재시작)"""
+    monkeypatch.chdir(tmp_path)
+
+    def factory(**kwargs):
+        return FAISSVectorManager(embedding_model="hashing-test-model", index_cache=CourseIndexCache(),
+                                  model_registry=HashingModelRegistry(), use_embedding_cache=False,
+                                  background_compaction=False, **kwargs)
+    return factory
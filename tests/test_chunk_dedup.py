@@ -0,0 +1,70 @@
+"""
+근사 중복 청크 제외와 문서 삭제 상호작용 테스트
+"""
+import pytest
+
+from conftest import make_document
+
+BOILERPLATE = "본 강의 자료의 저작권은 강사에게 있으며 무단 복제 및 배포를 금지합니다. All rights reserved."
+
+
+@pytest.mark.parametrize("shared_buckets", [False, True])
+def test_remove_document_keeps_duplicate_content_of_other_documents(make_manager, shared_buckets):
+    manager = make_manager(shared_buckets=shared_buckets)
+    manager.add_documents_to_index('course', [make_document('doc-a', ["딥러닝 개요와 퍼셉트론 학습 규칙", BOILERPLATE])])
+    manager.add_documents_to_index('course', [make_document('doc-b', ["합성곱 신경망과 풀링 계층 구조", BOILERPLATE])])
+
+    assert manager.get_course_index_stats('course')['dedup_skipped_chunks'] == 1
+
+    assert manager.remove_document('course', 'doc-a') == 2
+
+    # 문서 A의 벡터를 함께 쓰던 문서 B의 청크가 검색 결과로 보임
+    results = manager.search_course_documents('course', BOILERPLATE, top_k=5, min_similarity=0.9)
+    assert [(result['document_id'], result['chunk_index']) for result in results] == [('doc-b', 1)]
+    assert manager.get_course_index_stats('course')['chunk_count'] == 2
+
+    assert manager.remove_document('course', 'doc-b') == 2
+    assert manager.search_course_documents('course', BOILERPLATE, top_k=5, min_similarity=0.0) == []
+    assert manager.get_course_index_stats('course')['chunk_count'] == 0
+
+
+@pytest.mark.parametrize("shared_buckets", [False, True])
+def test_boilerplate_shared_across_documents_is_embedded_once(make_manager, shared_buckets):
+    manager = make_manager(shared_buckets=shared_buckets)
+    documents = [make_document(f"doc-{i}", [f"강의 {i}주차 주제 설명 {'가나다라마바사'[i]}" * 3, BOILERPLATE])
+                 for i in range(4)]
+    for i, document in enumerate(documents):
+        document['metadata']['uploader'] = f"user-{i}"
+        manager.add_documents_to_index('course', [document])
+
+    stats = manager.get_course_index_stats('course')
+    assert stats['chunk_count'] == 5
+    assert stats['dedup_skipped_chunks'] == 3
+    assert stats['document_count'] == 4
+
+    # 별칭 청크도 자기 청크 ID를 받고, 필터 검색은 조건을 만족하는 문서의 청크를 보여줌
+    vector_ids = [document['chunks'][1]['vector_id'] for document in documents]
+    assert len(set(vector_ids)) == 4 and None not in vector_ids
+    results = manager.search_course_documents('course', BOILERPLATE, top_k=5, min_similarity=0.9,
+                                              filters={'uploader': 'user-2'})
+    assert [(result['document_id'], result['vector_id']) for result in results] == [('doc-2', vector_ids[2])]
+
+    # 벡터를 가진 문서부터 지워도 마지막 문서가 남아 있는 동안 공유 벡터 유지
+    for i in range(3):
+        manager.remove_document('course', f"doc-{i}")
+        results = manager.search_course_documents('course', BOILERPLATE, top_k=5, min_similarity=0.9)
+        assert [result['document_id'] for result in results] == [f"doc-{i + 1}"]
+    assert manager.get_course_index_stats('course')['chunk_count'] == 2
+
+
+@pytest.mark.parametrize("shared_buckets", [False, True])
+def test_repeated_chunks_within_document_are_skipped_and_removed_together(make_manager, shared_buckets):
+    manager = make_manager(shared_buckets=shared_buckets)
+    document = make_document('doc-a', [BOILERPLATE, "역전파 알고리즘과 경사 하강법", BOILERPLATE])
+
+    assert manager.add_documents_to_index('course', [document]) == 2
+    assert [chunk['vector_id'] for chunk in document['chunks']] == [0, 1, 2]
+    assert manager.get_course_index_stats('course')['dedup_skipped_chunks'] == 1
+
+    assert manager.remove_document('course', 'doc-a') == 3
+    assert manager.search_course_documents('course', BOILERPLATE, top_k=5, min_similarity=0.0) == []
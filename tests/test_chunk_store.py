@@ -0,0 +1,45 @@
+"""
+청크 메타데이터 저장소 읽기 테스트
+"""
+import tracemalloc
+
+import numpy as np
+
+from vector.chunk_store import ChunkMetadataStore
+
+ROW_COUNT = 200000
+
+
+def make_store(path, count=ROW_COUNT):
+    store = ChunkMetadataStore(path)
+    store.append([{'document_id': f"doc-{i // 100}", 'chunk_index': i % 100, 'text': f"청크 {i}",
+                   'original_metadata': {'filename': f"doc-{i // 100}.pdf"}} for i in range(count)], 0)
+    return store
+
+
+def test_lookup_reads_only_requested_rows(tmp_path):
+    store = make_store(tmp_path / "chunks")
+    store.mark_deleted(np.array([5], dtype=np.int64))
+    chunk_ids = np.array([0, 5, 123456, ROW_COUNT - 1, ROW_COUNT, -1], dtype=np.int64)
+
+    # 오프셋/삭제 컬럼 전체(행당 8바이트, 1바이트)를 메모리에 올리지 않아야 함
+    tracemalloc.start()
+    infos = store.get_many(chunk_ids, limit=ROW_COUNT, full_text=True)
+    texts = store.get_texts(chunk_ids, limit=ROW_COUNT)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < ROW_COUNT // 2
+
+    assert [info and info['text'] for info in infos] == ["청크 0", None, "청크 123456", f"청크 {ROW_COUNT - 1}",
+                                                         None, None]
+    assert infos[2]['document_id'] == "doc-1234"
+    assert infos[2]['full_text'] == "청크 123456"
+    assert texts == ["청크 0", None, "청크 123456", f"청크 {ROW_COUNT - 1}", None, None]
+
+
+def test_lookup_respects_limit_and_missing_deleted_column(tmp_path):
+    store = make_store(tmp_path / "chunks", 10)
+    (tmp_path / "chunks" / "deleted.bin").unlink()
+
+    assert [info and info['chunk_index'] for info in store.get_many([0, 9], limit=5)] == [0, None]
+    assert store.get_texts([3, 7], limit=5) == ["청크 3", None]
@@ -0,0 +1,37 @@
+"""
+텍스트 청크 분할 테스트
+"""
+from vector.chunker import TextChunker
+
+
+def assert_overlapping(chunks, text):
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk['start'] < previous['end']
+        assert chunk['end'] > previous['end']
+    assert chunks[0]['start'] == 0
+    assert chunks[-1]['end'] == len(text)
+
+
+def test_long_text_without_sentence_punctuation_keeps_overlap():
+    chunker = TextChunker(max_tokens=40, overlap_tokens=10, count_tokens=lambda text: len(text.split()))
+    text = ' '.join(f"word{i}" for i in range(200))
+
+    chunks = list(chunker.iter_chunks(text, 'doc'))
+
+    assert len(chunks) > 1
+    assert_overlapping(chunks, text)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        # 다음 조각은 직전 조각의 마지막 overlap_tokens 단어부터 시작
+        assert text[chunk['start']:previous['end']].split() == text[previous['start']:previous['end']].split()[-10:]
+    assert all(chunk['token_count'] <= 40 for chunk in chunks)
+
+
+def test_long_word_without_spaces_keeps_overlap():
+    chunker = TextChunker(max_tokens=40, overlap_tokens=10, count_tokens=len)
+    text = "가" * 500
+
+    chunks = list(chunker.iter_chunks(text, 'doc'))
+
+    assert len(chunks) > 1
+    assert_overlapping(chunks, text)
+    assert all(len(chunk['text']) <= 40 for chunk in chunks)
@@ -0,0 +1,44 @@
+"""
+document_chunks 기본 키와 인덱스 재생성 테스트
+"""
+import sqlite3
+
+import pytest
+
+from conftest import make_document
+from database.models import DatabaseManager
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    return DatabaseManager(str(tmp_path / "test.db"))
+
+
+@pytest.mark.parametrize("shared_buckets", [False, True])
+def test_recreated_index_does_not_overwrite_chunks_of_other_documents(make_manager, db_manager, shared_buckets):
+    manager = make_manager(shared_buckets=shared_buckets)
+    first = make_document('doc-a', ["딥러닝 개요와 퍼셉트론 학습 규칙"])
+    manager.add_documents_to_index('course', [first])
+    db_manager.create_document_chunks('course', 'doc-a', first['chunks'])
+
+    # 인덱스를 지우고 다시 만들면 청크 ID가 0부터 다시 시작
+    manager.delete_course_index('course')
+    second = make_document('doc-b', ["합성곱 신경망과 풀링 계층 구조"])
+    manager.add_documents_to_index('course', [second])
+    assert second['chunks'][0]['vector_id'] == first['chunks'][0]['vector_id']
+    db_manager.create_document_chunks('course', 'doc-b', second['chunks'])
+
+    assert [chunk['chunk_text'] for chunk in db_manager.get_document_chunks('doc-a')] == ["딥러닝 개요와 퍼셉트론 학습 규칙"]
+    result = manager.search_course_documents('course', "합성곱 신경망과 풀링 계층 구조", top_k=1)[0]
+    chunk_id = db_manager.document_chunk_id('course', result['vector_id'], manager.index_generation('course'))
+    assert db_manager.get_document_chunk(chunk_id)['document_id'] == 'doc-b'
+
+
+def test_key_collision_fails_without_replacing(db_manager):
+    chunks = [{'chunk_index': 0, 'text': "첫 문서 청크", 'vector_id': 0, 'index_generation': 'gen'}]
+    db_manager.create_document_chunks('course', 'doc-a', chunks)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        db_manager.create_document_chunks('course', 'doc-b', [dict(chunks[0], text="다른 문서 청크")])
+
+    assert db_manager.get_document_chunk('course:gen:0')['document_id'] == 'doc-a'
@@ -0,0 +1,23 @@
+"""
+임베딩 캐시 영구 저장 테스트
+"""
+import numpy as np
+
+from vector.embedding_cache import EmbeddingCache
+
+
+def test_hash_ending_with_nul_byte_hits_after_restart(tmp_path):
+    cache = EmbeddingCache(tmp_path, "test-model", 4)
+    texts = [text for text in (f"청크 {i}" for i in range(5000)) if cache.text_hash(text).endswith(b'\0')][:2]
+    texts.append("일반 청크")
+    embeddings = np.arange(len(texts) * 4, dtype=np.float32).reshape(len(texts), 4)
+    cache.put_many(texts, embeddings)
+
+    # 재시작 후 파일에서 해시 색인을 다시 만들어도 같은 키로 찾아야 함
+    restarted = EmbeddingCache(tmp_path, "test-model", 4)
+    found, missing = restarted.get_many(texts)
+    assert missing == []
+    np.testing.assert_array_equal(found, embeddings)
+
+    restarted.put_many(texts, embeddings)
+    assert len(restarted) == len(texts)
@@ -0,0 +1,55 @@
+"""
+전체 강의 검색 제한 시간 테스트
+"""
+import time
+
+import numpy as np
+
+from ai.search_engine import AISearchEngine, get_course_search_thread_pool
+from database.models import DatabaseManager
+
+
+class SleepingVectorManager:
+    """강의별로 정해진 시간만큼 걸리는 벡터 검색"""
+
+    def __init__(self, durations):
+        self.durations = durations
+
+    def encode_queries(self, queries):
+        return np.zeros((len(queries), 4), dtype=np.float32)
+
+    def search_course_embeddings(self, course_id, query_embeddings, top_k, min_similarity):
+        time.sleep(self.durations[course_id])
+        return [[] for _ in range(len(query_embeddings))]
+
+
+def make_engine(tmp_path, durations, search_workers):
+    return AISearchEngine(DatabaseManager(str(tmp_path / "test.db")), SleepingVectorManager(durations),
+                          search_workers=search_workers)
+
+
+def test_course_timeout_counts_from_search_start(tmp_path):
+    engine = make_engine(tmp_path, {'slow': 1.0, 'fast-1': 0.3, 'fast-2': 0.3}, search_workers=2)
+    courses = [{'id': course_id, 'name': course_id} for course_id in ('slow', 'fast-1', 'fast-2')]
+
+    # fast-2는 fast-1이 끝난 뒤에 시작하므로 전체 대기 시간이 제한 시간을 넘어도 결과에 포함
+    result = engine.search_across_courses(courses, "질문", course_timeout=0.45)
+    assert result['success']
+    assert result['timed_out_courses'] == ['slow']
+    assert result['search_time'] < 1.0
+
+
+def test_course_that_cannot_start_in_time_is_cancelled(tmp_path):
+    engine = make_engine(tmp_path, {'slow': 0.6, 'queued': 0.1}, search_workers=1)
+    courses = [{'id': 'slow', 'name': 'slow'}, {'id': 'queued', 'name': 'queued'}]
+
+    result = engine.search_across_courses(courses, "질문", course_timeout=0.2)
+    assert sorted(result['timed_out_courses']) == ['queued', 'slow']
+
+
+def test_engines_share_search_thread_pool(tmp_path):
+    durations = {}
+    first = make_engine(tmp_path, durations, search_workers=3)
+    second = make_engine(tmp_path, durations, search_workers=3)
+    assert first.search_workers == second.search_workers == 3
+    assert get_course_search_thread_pool(3) is get_course_search_thread_pool(second.search_workers)
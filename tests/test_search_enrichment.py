@@ -0,0 +1,39 @@
+"""
+검색 결과 메타데이터 보강 테스트
+"""
+import tracemalloc
+
+import pytest
+
+from conftest import make_document
+
+CHUNK_COUNT = 20000
+
+
+@pytest.mark.parametrize("search", ["top_k", "range"])
+def test_result_enrichment_does_not_load_full_columns(make_manager, search):
+    manager = make_manager(dedup_chunks=False)
+    manager.add_documents_to_index('course', [
+        make_document(f"doc-{j}", [f"청크 {j * 1000 + i} 내용 {i}" for i in range(1000)])
+        for j in range(CHUNK_COUNT // 1000)
+    ])
+    query = "청크 12345 내용 345"
+
+    def run():
+        if search == "top_k":
+            return manager.search_course_documents('course', query, top_k=5)
+        return manager.search_course_documents_range('course', query, min_similarity=0.9)
+
+    run()
+    tracemalloc.start()
+    results = run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # 청크 수에 비례하는 오프셋(행당 8바이트)/삭제(행당 1바이트) 컬럼 전체를 쿼리마다 올리지 않아야 함
+    assert peak < CHUNK_COUNT * 4
+    assert results
+    for result in results:
+        number = int(result['text'].split()[1])
+        assert result['document_id'] == f"doc-{number // 1000}"
+        assert result['chunk_index'] == number % 1000
@@ -0,0 +1,35 @@
+"""
+벡터 로그 기록과 메타데이터 확정 사이 중단 복구 테스트
+"""
+import pytest
+
+from conftest import make_document
+
+
+@pytest.mark.parametrize("shared_buckets", [False, True])
+def test_add_interrupted_before_metadata_commit_is_discarded(make_manager, shared_buckets):
+    manager = make_manager(shared_buckets=shared_buckets)
+    manager.add_documents_to_index('course', [make_document('doc-a', ["딥러닝 개요와 퍼셉트론 학습 규칙"])])
+
+    # 로그 fsync 직후, 메타데이터 저장 전에 프로세스가 죽은 상황
+    def crash(course_id, metadata):
+        raise RuntimeError("메타데이터 저장 전 중단")
+
+    manager._commit_metadata = crash
+    with pytest.raises(RuntimeError):
+        manager.add_documents_to_index('course', [make_document('doc-b', ["합성곱 신경망과 풀링 계층 구조"])])
+
+    # 재시작 후 같은 청크 ID로 다른 문서 추가
+    manager = make_manager(shared_buckets=shared_buckets)
+    manager.add_documents_to_index('course', [make_document('doc-c', ["순환 신경망과 장단기 기억 셀"])])
+
+    results = manager.search_course_documents('course', "합성곱 신경망과 풀링 계층 구조", top_k=5, min_similarity=0.9)
+    assert results == []
+    results = manager.search_course_documents('course', "순환 신경망과 장단기 기억 셀", top_k=5, min_similarity=0.9)
+    assert [result['document_id'] for result in results] == ['doc-c']
+    assert manager.get_course_index_stats('course')['chunk_count'] == 2
+
+    # 다시 재시작해도 확정된 내용만 보임
+    manager = make_manager(shared_buckets=shared_buckets)
+    results = manager.search_course_documents('course', "딥러닝 개요와 퍼셉트론 학습 규칙", top_k=5, min_similarity=0.0)
+    assert sorted(result['document_id'] for result in results) == ['doc-a', 'doc-c']